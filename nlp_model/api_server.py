@@ -1,24 +1,255 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Origine du rapport de démarrage : avant les imports des dépendances
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
+import json
 import logging
-import uvicorn
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
 
+# Imports légers uniquement : sklearn, pandas et firebase_admin sont chargés
+# en arrière-plan après le démarrage, pour que le serveur écoute immédiatement
 from config import Config
-from ticket_classifier import TicketClassifier
-from firebase_connector import FirebaseConnector
+from executors import run_inference, run_storage, shutdown_executors, ExecutorSaturatedError
+from micro_batcher import MicroBatcher
+from training_jobs import get_reclassification_job_manager, get_training_job_manager
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Composants construits au démarrage (lifespan) ; None tant qu'ils ne sont pas prêts
+classifier = None
+firebase_connector = None
+training_jobs = None
+reclassification_jobs = None
+
+micro_batcher = None
+model_watcher_task = None
+components_task = None
+deep_health_task = None
+ticket_sync_task = None
+
+# Durées du démarrage, exposées par /startup
+startup_report = {
+    "import_seconds": round(time.perf_counter() - _IMPORT_STARTED, 3),
+    "serving_after_seconds": None,
+    "storage_ready_after_seconds": None,
+    "model_ready_after_seconds": None,
+    "steps": {},
+    "error": None
+}
+
+@contextmanager
+def _timed(step: str):
+    """Mesure la durée d'une étape du démarrage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_report["steps"][step] = round(time.perf_counter() - started, 3)
+
+def _since_import() -> float:
+    return round(time.perf_counter() - _IMPORT_STARTED, 3)
+
+# Dernier résultat de la vérification approfondie, rafraîchi en arrière-plan
+deep_health = {
+    "storage_backend": Config.STORAGE_BACKEND,
+    "firebase_connected": None,
+    "tickets_count": None,
+    "latency_ms": None,
+    "checked_at": None,
+    "error": None
+}
+
+def _check_firebase() -> Dict[str, Any]:
+    """Vérifie la connexion Firestore (bloquant, exécuté dans le pool de stockage)"""
+    started = time.monotonic()
+    tickets_count = firebase_connector.get_tickets_count()
+    return {
+        "firebase_connected": firebase_connector.connected and tickets_count >= 0,
+        "tickets_count": tickets_count,
+        "latency_ms": round((time.monotonic() - started) * 1000, 1),
+        "checked_at": datetime.now().isoformat(),
+        "error": None
+    }
+
+async def refresh_deep_health():
+    """Rafraîchit périodiquement l'état de Firestore, hors du chemin des sondes"""
+    while True:
+        try:
+            deep_health.update(await run_storage(_check_firebase))
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification de Firestore: {e}")
+            deep_health.update({
+                "firebase_connected": False,
+                "checked_at": datetime.now().isoformat(),
+                "error": str(e)
+            })
+        await asyncio.sleep(Config.HEALTH_CHECK_INTERVAL)
+
+async def refresh_ticket_store():
+    """Tient à jour la copie locale des tickets en arrière-plan : /tickets et les
+    jobs la lisent sans attendre de synchronisation"""
+    while True:
+        try:
+            await run_storage(firebase_connector.sync_ticket_store)
+        except Exception as e:
+            logger.error(f"Erreur lors de la synchronisation des tickets: {e}")
+        await asyncio.sleep(Config.TICKET_STORE_SYNC_INTERVAL)
+
+async def _flush_pending_writes():
+    """Envoie les feedbacks et corrections en attente avant un job qui lit le stockage"""
+    if firebase_connector is None:
+        return
+    try:
+        await run_storage(firebase_connector.flush_writes)
+    except Exception as e:
+        logger.warning(f"Écritures différées non envoyées avant le job: {e}")
+
+def _model_ready() -> bool:
+    return classifier is not None and classifier.ready
+
+def _ensure_model_ready():
+    """Refuse les prédictions tant que le modèle n'est pas chargé"""
+    if not _model_ready():
+        raise HTTPException(status_code=503, detail="Modèle en cours de chargement")
+
+def _ensure_model_loaded():
+    """Refuse les opérations sur le modèle tant que le classifieur n'est pas construit"""
+    if classifier is None:
+        raise HTTPException(status_code=503, detail="Modèle en cours de chargement")
+
+def _ensure_storage_ready():
+    """Refuse les accès au stockage tant que la connexion n'est pas initialisée"""
+    if firebase_connector is None:
+        raise HTTPException(status_code=503, detail="Connexion au stockage en cours d'initialisation")
+
+# Dernière version du manifeste dont le chargement a été tenté par la surveillance
+last_manifest_version = None
+
+async def check_model_update() -> bool:
+    """Recharge le modèle si le manifeste annonce une version nouvelle.
+
+    Une version déjà tentée n'est pas rechargée à nouveau : un modèle rejeté
+    (préchauffage ou lecture en échec) n'est pas désérialisé à chaque intervalle,
+    seul un nouveau manifeste déclenche un nouvel essai.
+    """
+    global last_manifest_version
+    from model_bundle import read_manifest
+    manifest = await run_storage(read_manifest)
+    version = manifest.get('version') if manifest else None
+    if not version or version in (classifier.model_version, last_manifest_version):
+        return False
+    last_manifest_version = version
+    return await run_inference(classifier.reload_model)
+
+async def watch_model_updates():
+    """Recharge le modèle quand un entraînement d'un autre processus en publie un nouveau"""
+    while True:
+        await asyncio.sleep(Config.MODEL_RELOAD_INTERVAL)
+        try:
+            await check_model_update()
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification du modèle: {e}")
+
+def _build_firebase_connector():
+    from registry import get_firebase_connector
+    return get_firebase_connector()
+
+def _build_classifier():
+    # Import de sklearn et pandas dans le pool, hors de la boucle d'événements ;
+    # le classifieur partage le client de stockage du registre
+    from registry import get_classifier
+    return get_classifier(auto_load=False)
+
+def _predict_many(texts: List[str]) -> List[Dict[str, Any]]:
+    return classifier.predict_many(texts)
+
+def _on_model_trained(job: Dict[str, Any]):
+    """Charge le nouveau modèle dès qu'un réentraînement de ce processus se termine
+    (y compris quand le service n'est pas prêt : le nouveau modèle le rétablit)"""
+    if classifier is not None:
+        classifier.reload_model()
+
+async def _initialize_storage():
+    global firebase_connector, deep_health_task, ticket_sync_task
+    with _timed("storage"):
+        firebase_connector = await run_storage(_build_firebase_connector)
+    startup_report["storage_ready_after_seconds"] = _since_import()
+    deep_health_task = asyncio.create_task(refresh_deep_health())
+    if firebase_connector.ticket_store:
+        ticket_sync_task = asyncio.create_task(refresh_ticket_store())
+
+async def _initialize_model():
+    global classifier, model_watcher_task
+    with _timed("model_import"):
+        new_classifier = await run_inference(_build_classifier)
+    classifier = new_classifier
+    with _timed("model_load"):
+        await run_inference(classifier.load_or_create_model)
+    startup_report["model_ready_after_seconds"] = _since_import()
+    
+    if Config.MODEL_RELOAD_INTERVAL > 0:
+        model_watcher_task = asyncio.create_task(watch_model_updates())
+
+async def initialize_components():
+    """Construit en parallèle la connexion au stockage et le modèle (chargé ou entraîné, puis préchauffé)"""
+    results = await asyncio.gather(_initialize_storage(), _initialize_model(), return_exceptions=True)
+    errors = [str(result) for result in results if isinstance(result, Exception)]
+    if errors:
+        startup_report["error"] = "; ".join(errors)
+        logger.error(f"Erreur lors de l'initialisation des composants: {startup_report['error']}")
+    
+    logger.info(f"Rapport de démarrage: {startup_report}")
+
+async def start_components():
+    """Démarre le serveur sans attendre le modèle : les sondes répondent pendant le chargement"""
+    global training_jobs, reclassification_jobs, micro_batcher, components_task
+    training_jobs = get_training_job_manager()
+    reclassification_jobs = get_reclassification_job_manager()
+    training_jobs.add_listener(_on_model_trained)
+    
+    if Config.MICRO_BATCH_ENABLED:
+        micro_batcher = MicroBatcher(_predict_many)
+        await micro_batcher.start()
+    
+    components_task = asyncio.create_task(initialize_components())
+    startup_report["serving_after_seconds"] = _since_import()
+    logger.info(f"Serveur prêt à écouter après {startup_report['serving_after_seconds']}s")
+
+async def stop_components():
+    """Termine les lots en cours et libère les pools d'exécution à l'arrêt du serveur"""
+    for task in (components_task, model_watcher_task, deep_health_task, ticket_sync_task):
+        if task:
+            task.cancel()
+    if micro_batcher:
+        await micro_batcher.stop()
+    if firebase_connector:
+        # Dernier envoi des écritures différées avant l'arrêt des pools
+        await run_storage(firebase_connector.close)
+    shutdown_executors()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_components()
+    yield
+    await stop_components()
+
 # Initialisation de l'application FastAPI
 app = FastAPI(
     title="API de Classification de Tickets",
     description="API pour classifier automatiquement les tickets utilisateur avec apprentissage continu",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuration CORS
@@ -30,10 +261,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialisation des composants
-classifier = TicketClassifier()
-firebase_connector = FirebaseConnector()
-
 # Modèles Pydantic pour les requêtes/réponses
 class TicketRequest(BaseModel):
     titre: str
@@ -47,6 +274,13 @@ class PredictionResponse(BaseModel):
     needs_human_review: bool
     keywords: List[str]
 
+class BatchTicketRequest(BaseModel):
+    tickets: List[TicketRequest]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    count: int
+
 class FeedbackRequest(BaseModel):
     ticket_id: str
     predicted_category: str
@@ -59,6 +293,7 @@ class ModelInfoResponse(BaseModel):
     categories: List[str]
     total_tickets: int
     model_path: str
+    model_version: Optional[str] = None
 
 @app.get("/")
 async def root():
@@ -73,33 +308,71 @@ async def root():
 async def predict_ticket_category(request: TicketRequest):
     """Prédit la catégorie d'un ticket"""
     try:
+        _ensure_model_ready()
+        
         # Combiner titre et description
         text = f"{request.titre} {request.description}"
         
-        # Faire la prédiction
-        prediction = classifier.predict(text)
-        
-        # Extraire les mots-clés
-        from text_preprocessor import TextPreprocessor
-        preprocessor = TextPreprocessor()
-        keywords = preprocessor.extract_keywords(text, top_k=5)
-        
-        # Ajouter les mots-clés à la réponse
-        prediction['keywords'] = keywords
+        # Faire la prédiction (mots-clés inclus) hors de la boucle d'événements,
+        # regroupée avec les requêtes concurrentes si le micro-batching est actif
+        if micro_batcher:
+            prediction = await micro_batcher.submit(text)
+        else:
+            prediction = (await run_inference(classifier.predict_many, [text]))[0]
         
         logger.info(f"Prédiction effectuée: {prediction['predicted_category']} (confiance: {prediction['confidence']:.2f})")
         
         return PredictionResponse(**prediction)
         
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Prédiction refusée: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors de la prédiction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_ticket_categories(request: BatchTicketRequest):
+    """Prédit la catégorie d'un lot de tickets en un seul appel"""
+    if len(request.tickets) > Config.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux: {len(request.tickets)} tickets (max {Config.MAX_BATCH_SIZE})"
+        )
+    
+    _ensure_model_ready()
+    
+    try:
+        # Combiner titre et description pour chaque ticket
+        texts = [f"{ticket.titre} {ticket.description}" for ticket in request.tickets]
+        
+        # Une seule vectorisation et une seule passe du modèle pour tout le lot
+        predictions = await run_inference(classifier.predict_many, texts)
+        
+        logger.info(f"Prédiction par lot effectuée: {len(predictions)} tickets")
+        
+        return BatchPredictionResponse(
+            predictions=[PredictionResponse(**prediction) for prediction in predictions],
+            count=len(predictions)
+        )
+        
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Prédiction par lot refusée: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction par lot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/feedback")
 async def save_prediction_feedback(request: FeedbackRequest):
     """Sauvegarde le feedback sur une prédiction"""
+    _ensure_storage_ready()
+    
     try:
-        firebase_connector.save_prediction_feedback(
+        await run_storage(
+            firebase_connector.save_prediction_feedback,
             ticket_id=request.ticket_id,
             predicted_category=request.predicted_category,
             actual_category=request.actual_category,
@@ -110,46 +383,153 @@ async def save_prediction_feedback(request: FeedbackRequest):
         
         return {"message": "Feedback sauvegardé avec succès"}
         
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Feedback refusé: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors de la sauvegarde du feedback: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/retrain")
+@app.post("/retrain", status_code=202)
 async def retrain_model():
-    """Réentraîne le modèle avec les nouvelles données"""
+    """Lance le réentraînement dans un processus séparé et retourne l'identifiant du job"""
+    await _flush_pending_writes()
+    try:
+        job = training_jobs.submit()
+        
+        return {
+            "message": "Réentraînement lancé",
+            "job_id": job["job_id"],
+            "status": job["status"]
+        }
+        
+    except Exception as e:
+        logger.error(f"Erreur lors du lancement du réentraînement: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/retrain/{job_id}")
+async def get_retrain_status(job_id: str):
+    """Retourne l'avancement et la durée d'un réentraînement"""
+    job = training_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job de réentraînement inconnu: {job_id}")
+    return job
+
+@app.post("/reclassify", status_code=202)
+async def reclassify_tickets():
+    """Lance la reclassification des tickets stockés avec le modèle sauvegardé"""
+    # Les corrections manuelles en attente doivent être visibles pour ne pas être écrasées
+    await _flush_pending_writes()
     try:
-        classifier.retrain_with_new_data()
+        job = reclassification_jobs.submit()
         
         return {
-            "message": "Modèle réentraîné avec succès",
-            "training_count": classifier.training_count
+            "message": "Reclassification lancée",
+            "job_id": job["job_id"],
+            "status": job["status"]
         }
         
     except Exception as e:
-        logger.error(f"Erreur lors du réentraînement: {e}")
+        logger.error(f"Erreur lors du lancement de la reclassification: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/reclassify/{job_id}")
+async def get_reclassify_status(job_id: str):
+    """Retourne l'avancement d'une reclassification"""
+    job = reclassification_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job de reclassification inconnu: {job_id}")
+    return job
+
+@app.post("/model/reload")
+async def reload_model():
+    """Recharge le modèle sauvegardé sur disque sans redémarrer le serveur.
+    
+    Accepté même quand le service n'est pas prêt : c'est ainsi qu'il se rétablit
+    après un modèle inutilisable.
+    """
+    _ensure_model_loaded()
+    
+    try:
+        reloaded = await run_inference(classifier.reload_model)
+        
+        return {
+            "message": "Modèle rechargé" if reloaded else (
+                "Modèle déjà à jour" if classifier.ready else "Modèle sauvegardé inutilisable, aucun modèle prêt"
+            ),
+            "reloaded": reloaded,
+            "ready": classifier.ready,
+            "model_version": classifier.model_version
+        }
+        
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Rechargement refusé: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors du rechargement du modèle: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/model-info", response_model=ModelInfoResponse)
 async def get_model_info():
     """Retourne les informations sur le modèle"""
+    _ensure_model_ready()
+    
     try:
-        info = classifier.get_model_info()
+        info = await run_storage(classifier.get_model_info)
         return ModelInfoResponse(**info)
         
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des infos du modèle: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Retourne les statistiques du cache de prédictions"""
+    _ensure_model_ready()
+    return classifier.prediction_cache.get_stats()
+
+@app.get("/batcher/stats")
+async def get_batcher_stats():
+    """Retourne les statistiques du micro-batching des prédictions (MICRO_BATCH_ENABLED)"""
+    if micro_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **micro_batcher.get_stats()}
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Convertit le paramètre `fields` ("titre,description") en liste de champs"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()] or None
+
+def _ndjson_lines(tickets):
+    """Sérialise les tickets une ligne JSON à la fois, au rythme de la lecture Firestore"""
+    for ticket in tickets:
+        yield json.dumps(jsonable_encoder(ticket), ensure_ascii=False) + "\n"
+
 @app.get("/tickets")
-async def get_tickets():
-    """Récupère tous les tickets depuis Firebase"""
+async def get_tickets(limit: int = Query(Config.TICKETS_PAGE_SIZE, ge=1, le=Config.TICKETS_MAX_PAGE_SIZE),
+                      start_after: Optional[str] = None,
+                      fields: Optional[str] = None,
+                      stream: bool = False):
+    """Récupère les tickets depuis Firebase, page par page ou en flux NDJSON (stream=true)"""
+    _ensure_storage_ready()
+    field_list = _parse_fields(fields)
+    
+    if stream:
+        # Starlette consomme le générateur dans un thread : la boucle d'événements n'est pas bloquée
+        return StreamingResponse(
+            _ndjson_lines(firebase_connector.iter_tickets(field_list)),
+            media_type="application/x-ndjson"
+        )
+    
     try:
-        tickets = firebase_connector.get_all_tickets()
-        return {
-            "tickets": tickets,
-            "count": len(tickets)
-        }
+        return await run_storage(
+            firebase_connector.get_tickets_page, limit, start_after, field_list
+        )
         
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Récupération des tickets refusée: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des tickets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -161,34 +541,64 @@ async def get_categories():
         "categories": Config.TICKET_CATEGORIES
     }
 
+@app.get("/writes/stats")
+async def get_write_buffer_stats():
+    """Retourne l'état des écritures Firestore différées"""
+    _ensure_storage_ready()
+    if not firebase_connector.write_buffer:
+        return {"enabled": False}
+    stats = await run_storage(firebase_connector.write_buffer.get_stats)
+    return {"enabled": True, **stats}
+
+@app.get("/livez")
+async def liveness_probe():
+    """Sonde de vivacité : répond dès que le processus sert des requêtes, sans dépendance externe"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/readyz")
+async def readiness_probe():
+    """Sonde de disponibilité : prêt quand le modèle est chargé et préchauffé"""
+    ready = _model_ready()
+    body = {
+        "status": "ready" if ready else "loading",
+        "model_loaded": classifier is not None and classifier.bundle is not None,
+        "model_version": classifier.model_version if classifier else None,
+        "timestamp": datetime.now().isoformat()
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+@app.get("/health/deep")
+async def deep_health_check():
+    """État détaillé : modèle et dernier résultat de la vérification Firestore (faite en arrière-plan)"""
+    ready = _model_ready()
+    return {
+        "status": "healthy" if ready and deep_health["firebase_connected"] else "degraded",
+        "model_ready": ready,
+        "model_version": classifier.model_version if classifier else None,
+        "firebase": dict(deep_health),
+        "startup": startup_report,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/startup")
+async def get_startup_report():
+    """Durées du démarrage : imports, écoute, stockage, chargement du modèle"""
+    return startup_report
+
 @app.get("/health")
 async def health_check():
-    """Vérification de l'état de santé de l'API"""
-    try:
-        # Vérifier que le modèle est chargé
-        model_loaded = (classifier.classifier is not None and 
-                       classifier.vectorizer is not None and 
-                       classifier.label_encoder is not None)
-        
-        # Vérifier la connexion Firebase
-        tickets_count = firebase_connector.get_tickets_count()
-        
-        return {
-            "status": "healthy" if model_loaded else "unhealthy",
-            "model_loaded": model_loaded,
-            "firebase_connected": tickets_count >= 0,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Erreur lors du health check: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+    """Vérification de l'état de santé de l'API (sans appel à Firestore, voir /health/deep)"""
+    model_loaded = _model_ready()
+    
+    return {
+        "status": "healthy" if model_loaded else "unhealthy",
+        "model_loaded": model_loaded,
+        "firebase_connected": bool(deep_health["firebase_connected"]),
+        "timestamp": datetime.now().isoformat()
+    }
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "api_server:app",
         host=Config.API_HOST,
@@ -0,0 +1,220 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from config import Config
+from synthetic_data import generate_corpus
+
+logger = logging.getLogger(__name__)
+
+# Tailles de corpus prévues ; 1M demande plusieurs minutes et quelques Go de mémoire
+CORPUS_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Textes mesurés un par un (prétraitement, prédiction unitaire)
+LATENCY_SAMPLES = 500
+PREDICT_BATCH_SIZE = 1000
+MODEL_LOAD_REPEAT = 5
+
+def _latency_stage(fn: Callable[[Any], Any], items: List[Any]) -> Dict[str, Any]:
+    """Durée de fn pour chaque élément : médiane (seconds), p50/p99 en ms"""
+    durations = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        durations.append(time.perf_counter() - started)
+    return {
+        'seconds': float(np.median(durations)),
+        'p50_ms': round(float(np.percentile(durations, 50)) * 1000, 3),
+        'p99_ms': round(float(np.percentile(durations, 99)) * 1000, 3),
+        'calls': len(durations)
+    }
+
+def _throughput_stage(fn: Callable[[], Any], items: int) -> Dict[str, Any]:
+    """Durée totale d'un traitement de items éléments et débit correspondant"""
+    started = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - started
+    return {
+        'seconds': seconds,
+        'items': items,
+        'per_second': round(items / seconds, 1) if seconds else None
+    }
+
+def _peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus depuis son démarrage"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Ko sous Linux, octets sous macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def benchmark_size(size: int, seed: int = 42) -> Dict[str, Any]:
+    """Mesure chaque étape du pipeline sur un corpus synthétique de size tickets.
+
+    À appeler depuis un répertoire de travail jetable : train_model y écrit
+    le modèle (models/) que l'étape model_load relit ensuite.
+    """
+    from memory_connector import InMemoryConnector
+    from model_bundle import load_bundle, read_manifest
+    from text_preprocessor import TextPreprocessor
+    from ticket_classifier import TicketClassifier, make_vectorizer
+
+    started = time.perf_counter()
+    corpus = generate_corpus(size, seed)
+    stages = {'generate': {'seconds': time.perf_counter() - started, 'items': size}}
+    texts = corpus['text'].tolist()
+    # Textes jamais vus à l'entraînement pour les prédictions
+    unseen = generate_corpus(max(LATENCY_SAMPLES, PREDICT_BATCH_SIZE), seed + 1)['text'].tolist()
+
+    preprocessor = TextPreprocessor()
+    stages['preprocess'] = _latency_stage(preprocessor.preprocess, texts[:LATENCY_SAMPLES])
+    processed = []
+    stages['preprocess_batch'] = _throughput_stage(
+        lambda: processed.extend(preprocessor.preprocess_batch(texts)), size
+    )
+
+    vectorizer = make_vectorizer()
+    stages['vectorizer_fit'] = _throughput_stage(lambda: vectorizer.fit(processed), size)
+    stages['vectorizer_transform'] = _throughput_stage(lambda: vectorizer.transform(processed), size)
+    del processed
+
+    # Stockage en mémoire vide : aucune connexion Firebase pendant la mesure
+    classifier = TicketClassifier(auto_load=False, firebase_connector=InMemoryConnector(n_tickets=0))
+    stages['train_model'] = _throughput_stage(lambda: classifier.train_model(corpus), size)
+    if classifier.bundle is None:
+        raise RuntimeError(f"Échec de l'entraînement sur {size} tickets")
+    del corpus
+
+    manifest = read_manifest()
+    loaded = []
+    stages['model_load'] = _latency_stage(lambda _: loaded.append(load_bundle()), range(MODEL_LOAD_REPEAT))
+    stages['model_load']['file_bytes'] = os.path.getsize(
+        os.path.join(Config.BUNDLE_DIR, manifest['bundle_file'])
+    ) if manifest and manifest.get('bundle_file') else None
+
+    # Modèle relu depuis le disque, comme celui servi par l'API ; prétraitement
+    # compris, sans le cache de prédictions
+    engine = loaded[-1].engine
+    del loaded[:-1]
+    stages['predict_single'] = _latency_stage(
+        lambda text: engine.predict(preprocessor.preprocess_batch([text])), unseen[:LATENCY_SAMPLES]
+    )
+    batch = unseen[:PREDICT_BATCH_SIZE]
+    stages['predict_batch'] = _throughput_stage(
+        lambda: engine.predict(preprocessor.preprocess_batch(batch)), len(batch)
+    )
+
+    for name, stage in stages.items():
+        logger.info(f"{size} tickets - {name}: {stage['seconds']:.4f}s")
+    return {'size': size, 'stages': stages, 'peak_rss_mb': _peak_rss_mb()}
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed: int = 42) -> Dict[str, Any]:
+    """Exécute le benchmark pour chaque taille dans un répertoire temporaire"""
+    import sklearn
+    import pandas as pd
+
+    results = {
+        'created_at': datetime.now().isoformat(),
+        'seed': seed,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scikit-learn': sklearn.__version__
+        },
+        'config': {
+            'MODEL_MODE': Config.MODEL_MODE,
+            'ESTIMATOR_BACKEND': Config.ESTIMATOR_BACKEND,
+            'COMPACT_MODEL': Config.COMPACT_MODEL,
+            'MAX_FEATURES': Config.MAX_FEATURES,
+            'N_GRAM_RANGE': list(Config.N_GRAM_RANGE),
+            'TRAINING_N_JOBS': Config.TRAINING_N_JOBS
+        },
+        'results': []
+    }
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='nlp-benchmark-') as work_dir:
+        os.chdir(work_dir)
+        try:
+            for size in sizes:
+                results['results'].append(benchmark_size(size, seed))
+        finally:
+            os.chdir(cwd)
+    return results
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Compare deux exécutions étape par étape ; retourne les étapes plus lentes que la tolérance"""
+    baseline_sizes = {result['size']: result['stages'] for result in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        previous_stages = baseline_sizes.get(result['size'], {})
+        for name, stage in result['stages'].items():
+            previous = previous_stages.get(name)
+            if not previous or not previous.get('seconds'):
+                continue
+            ratio = stage['seconds'] / previous['seconds']
+            if ratio > 1 + tolerance:
+                regressions.append({'size': result['size'], 'stage': name, 'ratio': round(ratio, 2),
+                                    'seconds': stage['seconds'], 'baseline_seconds': previous['seconds']})
+    return regressions
+
+def main():
+    """Benchmark hors ligne du pipeline NLP sur des corpus synthétiques français / anglais"""
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline NLP (hors ligne)")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help=f"Tailles de corpus séparées par des virgules (prévues: "
+                             f"{','.join(str(size) for size in CORPUS_SIZES)})")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du corpus synthétique")
+    parser.add_argument('--output', default=f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', help="Résultats JSON d'une exécution précédente à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Ralentissement toléré par rapport à la référence (0.2 = 20%%)")
+    parser.add_argument('--verbose', action='store_true', help="Affiche les logs du pipeline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run_benchmarks(sizes, args.seed)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    stage_names = list(results['results'][0]['stages']) if results['results'] else []
+    print(f"{'étape':<22}" + ''.join(f"{size:>14,}" for size in sizes))
+    for name in stage_names:
+        # Étapes unitaires en ms (médiane), étapes globales en secondes
+        print(f"{name:<22}" + ''.join(
+            f"{result['stages'][name]['p50_ms']:>12.3f}ms" if 'p50_ms' in result['stages'][name]
+            else f"{result['stages'][name]['seconds']:>13.3f}s"
+            for result in results['results']
+        ))
+    print(f"Résultats enregistrés dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Régression {regression['stage']} ({regression['size']:,} tickets): "
+                  f"x{regression['ratio']} ({regression['baseline_seconds']:.4f}s -> {regression['seconds']:.4f}s)")
+        if regressions:
+            sys.exit(1)
+        print("Aucune régression par rapport à la référence")
+
+if __name__ == "__main__":
+    main()
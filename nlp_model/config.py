@@ -8,10 +8,43 @@ class Config:
     FIREBASE_CREDENTIALS_PATH = os.getenv('FIREBASE_CREDENTIALS_PATH', 'firebase-credentials.json')
     FIREBASE_PROJECT_ID = os.getenv('FIREBASE_PROJECT_ID', 'asten-tickets')
     
+    # Stockage des tickets : 'firebase', 'sqlite' (disque local, sans Firebase)
+    # ou 'memory' (tickets synthétiques, tests de charge)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'firebase')
+    SQLITE_STORAGE_PATH = os.getenv('SQLITE_STORAGE_PATH', 'data/storage.db')
+    MEMORY_STORE_TICKETS = int(os.getenv('MEMORY_STORE_TICKETS', 1000))  # Tickets générés au démarrage
+    MEMORY_STORE_READ_LATENCY_MS = float(os.getenv('MEMORY_STORE_READ_LATENCY_MS', 0))
+    MEMORY_STORE_WRITE_LATENCY_MS = float(os.getenv('MEMORY_STORE_WRITE_LATENCY_MS', 0))
+    
+    # Copie locale des tickets (SQLite), synchronisée par incréments depuis Firestore
+    TICKET_STORE_ENABLED = os.getenv('TICKET_STORE_ENABLED', 'true').lower() == 'true'
+    TICKET_STORE_PATH = os.getenv('TICKET_STORE_PATH', 'data/tickets.db')
+    TICKET_STORE_SYNC_INTERVAL = float(os.getenv('TICKET_STORE_SYNC_INTERVAL', 30))  # Secondes
+    TICKET_STORE_FULL_SYNC_HOURS = float(os.getenv('TICKET_STORE_FULL_SYNC_HOURS', 24))
+    COUNT_CACHE_TTL = float(os.getenv('COUNT_CACHE_TTL', 60))  # Secondes de cache du nombre de tickets
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 30))  # Vérification Firestore en arrière-plan
+    
+    # Écritures différées (feedback, corrections de catégorie) envoyées par lots à Firestore
+    WRITE_BUFFER_ENABLED = os.getenv('WRITE_BUFFER_ENABLED', 'true').lower() == 'true'
+    WRITE_BUFFER_PATH = os.getenv('WRITE_BUFFER_PATH', 'data/write_buffer.db')
+    WRITE_BUFFER_MAX_BATCH = int(os.getenv('WRITE_BUFFER_MAX_BATCH', 200))  # Écritures par commit (max 500)
+    WRITE_BUFFER_FLUSH_INTERVAL = float(os.getenv('WRITE_BUFFER_FLUSH_INTERVAL', 2))  # Secondes
+    
+    # Reclassification des tickets stockés après chaque réentraînement
+    RECLASSIFY_AFTER_RETRAIN = os.getenv('RECLASSIFY_AFTER_RETRAIN', 'true').lower() == 'true'
+    RECLASSIFY_CHUNK_SIZE = int(os.getenv('RECLASSIFY_CHUNK_SIZE', 200))  # Tickets par lot (max 500 écritures)
+    RECLASSIFY_MAX_OPS_PER_SECOND = float(os.getenv('RECLASSIFY_MAX_OPS_PER_SECOND', 50))  # Lectures + écritures
+    RECLASSIFY_CHECKPOINT_PATH = os.getenv('RECLASSIFY_CHECKPOINT_PATH', 'data/reclassification_checkpoint.json')
+    
     # Configuration du modèle NLP
     MODEL_PATH = os.getenv('MODEL_PATH', 'models/ticket_classifier.joblib')
     VECTORIZER_PATH = os.getenv('VECTORIZER_PATH', 'models/tfidf_vectorizer.joblib')
     ENCODER_PATH = os.getenv('ENCODER_PATH', 'models/label_encoder.joblib')
+    MANIFEST_PATH = os.getenv('MANIFEST_PATH', 'models/manifest.json')
+    BUNDLE_DIR = os.getenv('BUNDLE_DIR', 'models/bundles')  # Un fichier par version de modèle
+    BUNDLE_KEEP_VERSIONS = int(os.getenv('BUNDLE_KEEP_VERSIONS', 3))
+    # SHA-256 relu à chaque chargement (la taille du fichier est toujours vérifiée)
+    BUNDLE_VERIFY_CHECKSUM = os.getenv('BUNDLE_VERIFY_CHECKSUM', 'false').lower() == 'true'
     
     # Catégories de tickets
     TICKET_CATEGORIES = [
@@ -28,12 +61,56 @@ class Config:
     # Configuration de l'API
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', 8000))
+    MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 1000))  # Tickets max par appel /predict/batch
+    TICKETS_PAGE_SIZE = int(os.getenv('TICKETS_PAGE_SIZE', 100))  # Tickets par page de /tickets
+    TICKETS_MAX_PAGE_SIZE = int(os.getenv('TICKETS_MAX_PAGE_SIZE', 1000))
+    
+    # Pools d'exécution (inférence et stockage hors de la boucle d'événements)
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 2))
+    STORAGE_WORKERS = int(os.getenv('STORAGE_WORKERS', 8))
+    EXECUTOR_QUEUE_FACTOR = int(os.getenv('EXECUTOR_QUEUE_FACTOR', 32))  # Tâches en attente max par worker
+    
+    # Micro-batching des requêtes /predict concurrentes (optionnel)
+    MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'false').lower() == 'true'
+    MICRO_BATCH_WINDOW_MS = float(os.getenv('MICRO_BATCH_WINDOW_MS', 5))  # Fenêtre de collecte
+    MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', 64))  # Taille max d'un lot
+    
+    # Réentraînement dans un processus séparé
+    TRAINING_N_JOBS = int(os.getenv('TRAINING_N_JOBS', -1))  # Cœurs utilisés par la forêt
+    TRAINING_NICE = int(os.getenv('TRAINING_NICE', 10))  # Priorité abaissée du processus d'entraînement
+    TRAINING_JOBS_HISTORY = 20  # Nombre de jobs conservés pour /retrain/{job_id}
+    TRAINING_JOB_TIMEOUT = float(os.getenv('TRAINING_JOB_TIMEOUT', 3600))  # Secondes avant arrêt du processus, 0 pour désactiver
+    MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', 60))  # Secondes, 0 pour désactiver
+    
+    # Cache des prédictions (indexé par texte prétraité et version du modèle)
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 10000))  # 0 pour désactiver
+    PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 3600))  # Secondes
     
     # Configuration du modèle
     MIN_CONFIDENCE_THRESHOLD = 0.6
     RETRAIN_THRESHOLD = 10  # Nombre de nouveaux tickets avant réentraînement
+    MIN_TRAINING_SAMPLES = 10  # Minimum de tickets pour lancer un réentraînement
     MAX_FEATURES = 5000
+    KEYWORDS_TOP_K = 5  # Mots-clés renvoyés par prédiction
     N_GRAM_RANGE = (1, 2)
+    # Estimateur du mode 'batch' : 'random_forest', 'logistic_regression' ou 'linear_svm'
+    # (comparaison sur vos données : python estimators.py)
+    ESTIMATOR_BACKEND = os.getenv('ESTIMATOR_BACKEND', 'random_forest')
+    LINEAR_C = float(os.getenv('LINEAR_C', 10.0))  # Régularisation des modèles linéaires
+    # Mode compact : arbres bornés en feuilles, forêt plate en int32 / float32 ; les
+    # prédictions peuvent différer du mode normal (rapport : python estimators.py --compact-report)
+    COMPACT_MODEL = os.getenv('COMPACT_MODEL', 'false').lower() == 'true'
+    COMPACT_MAX_LEAF_NODES = int(os.getenv('COMPACT_MAX_LEAF_NODES', 512))  # Feuilles par arbre
+    
+    # Mode du modèle : 'batch' (TF-IDF + forêt réentraînée from scratch) ou
+    # 'incremental' (hachage + SGD mis à jour avec les nouvelles données seulement)
+    MODEL_MODE = os.getenv('MODEL_MODE', 'batch')
+    INCREMENTAL_N_FEATURES = 2 ** 18
+    INCREMENTAL_ALPHA = 1e-5
+    INCREMENTAL_BATCH_SIZE = 256
+    INCREMENTAL_BOOTSTRAP_EPOCHS = 5
+    FEEDBACK_SAMPLE_WEIGHT = 2.0  # Poids des corrections humaines
+    INCREMENTAL_STATE_PATH = 'data/incremental_state.json'
     
     # Configuration des données d'entraînement
     TRAINING_DATA_PATH = 'data/training_data.csv'
@@ -3,7 +3,7 @@ import pandas as pd
 import numpy as np
 from sklearn.metrics import classification_report
 import logging
-from ticket_classifier import TicketClassifier
+from registry import get_classifier
 from config import Config
 
 logging.basicConfig(level=logging.INFO)
@@ -15,7 +15,7 @@ def diagnose_model():
     print("=" * 50)
     
     # Charger le modèle
-    classifier = TicketClassifier()
+    classifier = get_classifier()
     
     # Vérifier les catégories disponibles
     print("\n📋 CATÉGORIES CONFIGURÉES:")
@@ -343,7 +343,7 @@ def retrain_model_with_better_data():
     training_data = create_better_training_data()
     
     # Réentraîner le modèle
-    classifier = TicketClassifier()
+    classifier = get_classifier()
     classifier.train_model(training_data)
     
     print("✅ Modèle réentraîné avec succès!")
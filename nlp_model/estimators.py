@@ -0,0 +1,255 @@
+import argparse
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def _random_forest(y: np.ndarray, compact: bool = False):
+    return RandomForestClassifier(
+        n_estimators=100,
+        # Sans limite, la taille des arbres croît avec le corpus
+        max_leaf_nodes=Config.COMPACT_MAX_LEAF_NODES if compact else None,
+        random_state=42,
+        n_jobs=Config.TRAINING_N_JOBS
+    )
+
+def _logistic_regression(y: np.ndarray, compact: bool = False):
+    return LogisticRegression(
+        C=Config.LINEAR_C,
+        max_iter=1000,
+        random_state=42
+    )
+
+def _linear_svm(y: np.ndarray, compact: bool = False):
+    # LinearSVC n'a pas de predict_proba : calibration par validation croisée,
+    # limitée par l'effectif de la plus petite catégorie
+    folds = min(3, int(np.bincount(y).min()))
+    if folds < 2:
+        logger.warning("Catégorie à un seul exemple : régression logistique à la place du SVM calibré")
+        return _logistic_regression(y)
+    return CalibratedClassifierCV(
+        LinearSVC(C=Config.LINEAR_C, random_state=42),
+        cv=folds
+    )
+
+# Estimateurs disponibles : tous exposent predict_proba et classes_, si bien que
+# InferenceEngine produit la même sortie quel que soit le choix. Les modèles
+# linéaires sont déjà compacts (un coefficient par feature et par catégorie)
+ESTIMATOR_BACKENDS: Dict[str, Callable[[np.ndarray, bool], Any]] = {
+    'random_forest': _random_forest,
+    'logistic_regression': _logistic_regression,
+    'linear_svm': _linear_svm
+}
+
+def make_estimator(y: np.ndarray, backend: Optional[str] = None, compact: bool = False):
+    """Crée l'estimateur (non entraîné) du backend choisi, Config.ESTIMATOR_BACKEND par défaut"""
+    backend = backend or Config.ESTIMATOR_BACKEND
+    if backend not in ESTIMATOR_BACKENDS:
+        raise ValueError(
+            f"Estimateur inconnu: {backend} (disponibles: {', '.join(ESTIMATOR_BACKENDS)})"
+        )
+    return ESTIMATOR_BACKENDS[backend](y, compact)
+
+def _percentile_ms(durations: List[float], q: float) -> float:
+    return round(float(np.percentile(durations, q)) * 1000, 3)
+
+def _split(training_data: pd.DataFrame, test_size: float):
+    """Découpage entraînement / test stratifié quand chaque catégorie a au moins deux tickets"""
+    from sklearn.model_selection import train_test_split
+
+    counts = training_data['category'].value_counts()
+    stratify = training_data['category'] if counts.min() >= 2 else None
+    return train_test_split(training_data, test_size=test_size, random_state=42, stratify=stratify)
+
+def _served_bundle(bundle, compact: Optional[bool] = None):
+    """Modèle réellement servi (sauvegardé puis relu, forêt plate pour random_forest) et son fichier"""
+    from model_bundle import deserialize_bundle, serialize_bundle
+
+    serialized = serialize_bundle(bundle, compact)
+    return deserialize_bundle(serialized, bundle.version, bundle.trained_at), serialized
+
+def _measure(bundle, test_texts: List[str], test_categories: List[str],
+             latency_samples: int) -> Dict[str, Any]:
+    """Précision, latences unitaires et débit par lot d'un modèle (celui relu par _served_bundle)"""
+    # Les catégories absentes de l'entraînement comptent comme des erreurs
+    predictions = bundle.engine.predict(test_texts)
+    predicted = [prediction['predicted_category'] for prediction in predictions]
+    accuracy = float(np.mean([p == c for p, c in zip(predicted, test_categories)]))
+
+    latency_texts = test_texts[:latency_samples]
+    bundle.engine.predict(latency_texts[:1])
+    durations = []
+    for text in latency_texts:
+        started = time.perf_counter()
+        bundle.engine.predict([text])
+        durations.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    bundle.engine.predict(test_texts)
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        'accuracy': round(accuracy, 4),
+        'latency_p50_ms': _percentile_ms(durations, 50),
+        'latency_p99_ms': _percentile_ms(durations, 99),
+        'batch_throughput_per_second': round(len(test_texts) / batch_seconds, 1) if batch_seconds else None,
+        'predicted': predicted
+    }
+
+def compare_backends(training_data: pd.DataFrame, backends: Optional[List[str]] = None,
+                     test_size: float = 0.2, latency_samples: int = 200) -> List[Dict[str, Any]]:
+    """Compare les estimateurs sur le même découpage entraînement / test.
+
+    Pour chaque backend : durée d'entraînement, précision sur le jeu de test,
+    latence p50/p99 d'une prédiction unitaire (prétraitement exclu, mots-clés
+    inclus) et taille du modèle sauvegardé. Les mesures portent sur le modèle
+    relu depuis sa forme sauvegardée, celui que sert TicketClassifier.
+    """
+    from text_preprocessor import TextPreprocessor
+    from ticket_classifier import build_model_bundle
+
+    preprocessor = TextPreprocessor()
+    train, test = _split(training_data, test_size)
+    test_texts = list(preprocessor.preprocess_batch(test['text'].tolist()))
+
+    results = []
+    for backend in backends or list(ESTIMATOR_BACKENDS):
+        started = time.perf_counter()
+        bundle, _, _ = build_model_bundle(train.copy(), preprocessor, backend=backend)
+        train_seconds = time.perf_counter() - started
+
+        served, serialized = _served_bundle(bundle)
+        measures = _measure(served, test_texts, test['category'].tolist(), latency_samples)
+        measures.pop('predicted')
+        results.append({
+            'backend': backend,
+            'train_samples': len(train),
+            'test_samples': len(test),
+            **measures,
+            'model_size_bytes': len(serialized),
+            'train_seconds': round(train_seconds, 3)
+        })
+        logger.info(f"Backend {backend}: {results[-1]}")
+
+    return results
+
+def _loaded_memory(serialized: bytes) -> int:
+    """Mémoire allouée par le chargement d'un modèle sérialisé (sans projection mmap)"""
+    import io
+    import tracemalloc
+    import joblib
+
+    tracemalloc.start()
+    try:
+        payload = joblib.load(io.BytesIO(serialized))
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del payload
+    return allocated
+
+def compact_report(training_data: pd.DataFrame, backend: Optional[str] = None,
+                   test_size: float = 0.2, latency_samples: int = 200) -> Dict[str, Any]:
+    """Compare le modèle standard et le modèle compact sur le même découpage.
+
+    Rapporte pour chacun la taille du fichier, la mémoire allouée au chargement,
+    la taille de la matrice de features du jeu de test et la précision, puis
+    le gain mémoire et la précision perdue du mode compact. Comme pour
+    compare_backends, les mesures portent sur le modèle sauvegardé puis relu.
+    """
+    from text_preprocessor import TextPreprocessor
+    from ticket_classifier import build_model_bundle
+
+    preprocessor = TextPreprocessor()
+    train, test = _split(training_data, test_size)
+    test_texts = list(preprocessor.preprocess_batch(test['text'].tolist()))
+    test_categories = test['category'].tolist()
+
+    report = {'backend': backend or Config.ESTIMATOR_BACKEND, 'train_samples': len(train),
+              'test_samples': len(test)}
+    for mode, compact in (('standard', False), ('compact', True)):
+        bundle, _, _ = build_model_bundle(train.copy(), preprocessor, backend=backend, compact=compact)
+        served, serialized = _served_bundle(bundle, compact)
+        X = served.engine.transform(test_texts)
+        measures = _measure(served, test_texts, test_categories, latency_samples)
+        report[mode] = {
+            **measures,
+            'model_size_bytes': len(serialized),
+            'loaded_memory_bytes': _loaded_memory(serialized),
+            'feature_matrix_bytes': int(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes),
+            'vocabulary_size': len(getattr(served.vectorizer, 'vocabulary_', {}))
+        }
+        logger.info(f"Modèle {mode}: {report[mode]}")
+
+    standard, compact = report['standard'], report['compact']
+    report['agreement'] = round(float(np.mean([
+        a == b for a, b in zip(standard.pop('predicted'), compact.pop('predicted'))
+    ])), 4)
+    report['memory_saving_pct'] = round(
+        100 * (1 - compact['loaded_memory_bytes'] / standard['loaded_memory_bytes']), 1
+    ) if standard['loaded_memory_bytes'] else None
+    report['size_saving_pct'] = round(
+        100 * (1 - compact['model_size_bytes'] / standard['model_size_bytes']), 1
+    )
+    report['accuracy_lost'] = round(standard['accuracy'] - compact['accuracy'], 4)
+    return report
+
+def main():
+    """Compare les estimateurs (ou les modes standard et compact) sur les tickets du stockage ou un CSV"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Comparaison des estimateurs de classification")
+    parser.add_argument('--csv', help="Fichier CSV avec les colonnes text et category")
+    parser.add_argument('--backends', help="Backends à comparer, séparés par des virgules (tous par défaut ; "
+                                           "avec --compact-report, le premier seulement)")
+    parser.add_argument('--compact-report', action='store_true',
+                        help="Compare modèle standard et modèle compact (mémoire / précision)")
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    args = parser.parse_args()
+
+    if args.csv:
+        training_data = pd.read_csv(args.csv)
+    else:
+        from registry import get_firebase_connector
+        training_data = get_firebase_connector().get_tickets_for_training()
+
+    if len(training_data) <= Config.MIN_TRAINING_SAMPLES:
+        raise SystemExit(f"Pas assez de données pour comparer les estimateurs ({len(training_data)} tickets)")
+
+    if args.compact_report:
+        results = compact_report(training_data, args.backends.split(',')[0].strip() if args.backends else None)
+        print(f"{'mode':<12}{'précision':>10}{'fichier Ko':>12}{'mémoire Ko':>12}{'features Ko':>13}{'p50 ms':>10}")
+        for mode in ('standard', 'compact'):
+            result = results[mode]
+            print(f"{mode:<12}{result['accuracy']:>10.3f}{result['model_size_bytes'] / 1024:>12.1f}"
+                  f"{result['loaded_memory_bytes'] / 1024:>12.1f}{result['feature_matrix_bytes'] / 1024:>13.1f}"
+                  f"{result['latency_p50_ms']:>10.3f}")
+        print(f"Gain mémoire: {results['memory_saving_pct']}% - précision perdue: {results['accuracy_lost']:+.4f} "
+              f"- prédictions identiques: {results['agreement']:.1%}")
+    else:
+        backends = [name.strip() for name in args.backends.split(',')] if args.backends else None
+        results = compare_backends(training_data, backends)
+
+        print(f"{'backend':<22}{'précision':>10}{'p50 ms':>10}{'p99 ms':>10}{'taille Ko':>12}{'entraîn. s':>12}")
+        for result in results:
+            print(f"{result['backend']:<22}{result['accuracy']:>10.3f}{result['latency_p50_ms']:>10.3f}"
+                  f"{result['latency_p99_ms']:>10.3f}{result['model_size_bytes'] / 1024:>12.1f}"
+                  f"{result['train_seconds']:>12.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
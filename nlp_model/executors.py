@@ -0,0 +1,81 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ExecutorSaturatedError(RuntimeError):
+    """Levée quand la file d'attente d'un exécuteur est pleine"""
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        """Pool de threads borné : au plus max_pending tâches en cours ou en attente"""
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name
+        )
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Exécute une fonction bloquante dans le pool sans bloquer la boucle d'événements"""
+        # Le compteur n'est modifié que depuis la boucle d'événements, pas besoin de verrou
+        if self.pending >= self.max_pending:
+            raise ExecutorSaturatedError(
+                f"Exécuteur '{self.name}' saturé ({self.pending} tâches en attente)"
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self, wait: bool = True):
+        """Arrête le pool"""
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> dict:
+        """Retourne l'occupation du pool"""
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending
+        }
+
+# Pool pour l'inférence et l'entraînement (sklearn, CPU)
+inference_executor = BoundedExecutor(
+    'inference',
+    max_workers=Config.INFERENCE_WORKERS,
+    max_pending=Config.INFERENCE_WORKERS * Config.EXECUTOR_QUEUE_FACTOR
+)
+
+# Pool pour les entrées/sorties de stockage (Firestore)
+storage_executor = BoundedExecutor(
+    'storage',
+    max_workers=Config.STORAGE_WORKERS,
+    max_pending=Config.STORAGE_WORKERS * Config.EXECUTOR_QUEUE_FACTOR
+)
+
+async def run_inference(func: Callable, *args, **kwargs) -> Any:
+    """Exécute un appel au modèle hors de la boucle d'événements"""
+    return await inference_executor.run(func, *args, **kwargs)
+
+async def run_storage(func: Callable, *args, **kwargs) -> Any:
+    """Exécute un appel de stockage bloquant hors de la boucle d'événements"""
+    return await storage_executor.run(func, *args, **kwargs)
+
+def shutdown_executors():
+    """Arrête proprement les pools d'exécution"""
+    inference_executor.shutdown()
+    storage_executor.shutdown()
+    logger.info("Pools d'exécution arrêtés")
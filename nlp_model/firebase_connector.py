@@ -1,19 +1,29 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
+import time
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 import logging
 from config import Config
+from storage import TicketStorage
+from ticket_store import LocalTicketStore
+from write_buffer import SERVER_TIMESTAMP, WriteBehindBuffer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class FirebaseConnector:
-    def __init__(self):
-        """Initialise la connexion Firebase"""
+class FirebaseConnector(TicketStorage):
+    def __init__(self, buffered_writes: bool = True):
+        """Initialise la connexion Firebase (sans identifiants valides : mode local, tickets d'exemple).
+
+        buffered_writes=False : écritures directes, sans tampon d'écriture ni thread d'envoi.
+        """
         self.db = None
         self.connected = False
+        self.ticket_store = None
+        self.write_buffer = None
+        self._tickets_count_cache = (None, 0.0)
         try:
             # Vérifie si l'application n'a pas déjà été initialisée
             if not firebase_admin._apps:
@@ -27,6 +37,11 @@ class FirebaseConnector:
             self.db = firestore.client()
             self.connected = True
             logger.info("Connexion Firebase établie avec succès")
+            
+            if Config.TICKET_STORE_ENABLED:
+                self.ticket_store = LocalTicketStore()
+            if Config.WRITE_BUFFER_ENABLED and buffered_writes:
+                self.write_buffer = WriteBehindBuffer(self.db)
         except Exception as e:
             logger.warning(f"Erreur lors de l'initialisation Firebase: {e}")
             logger.info("Le système fonctionnera en mode local sans Firebase")
@@ -38,6 +53,12 @@ class FirebaseConnector:
             logger.warning("Firebase non connecté - retour de données d'exemple")
             return self._get_sample_tickets()
         
+        store = self._synced_ticket_store()
+        if store:
+            tickets = store.get_all_tickets()
+            logger.info(f"Récupération de {len(tickets)} tickets depuis la copie locale")
+            return tickets
+        
         try:
             tickets_ref = self.db.collection('tickets')
             tickets = []
@@ -53,6 +74,80 @@ class FirebaseConnector:
             logger.error(f"Erreur lors de la récupération des tickets: {e}")
             return self._get_sample_tickets()
     
+    def _synced_ticket_store(self) -> Optional[LocalTicketStore]:
+        """Copie locale des tickets, synchronisée si elle est périmée (None : lire Firestore)"""
+        if not self.ticket_store:
+            return None
+        try:
+            # Ne récupérer que les tickets modifiés depuis la dernière synchronisation
+            self.ticket_store.sync_if_stale(self.db)
+            return self.ticket_store
+        except Exception as e:
+            logger.error(f"Erreur lors de la synchronisation locale des tickets: {e}")
+            return None
+    
+    def _tickets_query(self, fields: Optional[List[str]] = None):
+        """Requête ordonnée par identifiant de document, avec projection éventuelle côté serveur"""
+        query = self.db.collection('tickets').order_by('__name__')
+        if fields:
+            query = query.select(fields)
+        return query
+    
+    def get_tickets_page(self, limit: int, start_after: Optional[str] = None,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Récupère une page de tickets ordonnée par identifiant (pagination par curseur).
+        
+        `next_start_after` est l'identifiant à passer pour obtenir la page suivante,
+        None quand la collection a été entièrement parcourue.
+        """
+        if not self.connected:
+            tickets = sorted(self._get_sample_tickets(), key=lambda ticket: ticket['id'])
+            if start_after:
+                tickets = [ticket for ticket in tickets if ticket['id'] > start_after]
+            page = [self._project(ticket, fields) for ticket in tickets[:limit + 1]]
+        elif self._synced_ticket_store():
+            return self.ticket_store.get_tickets_page(limit, start_after, fields)
+        else:
+            query = self._tickets_query(fields)
+            if start_after:
+                query = query.start_after({'__name__': self.db.collection('tickets').document(start_after)})
+            # Un document de plus que la page : indique s'il reste des tickets sans requête supplémentaire
+            page = []
+            for doc in query.limit(limit + 1).stream():
+                ticket_data = doc.to_dict()
+                ticket_data['id'] = doc.id
+                page.append(ticket_data)
+        
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {
+            'tickets': page,
+            'count': len(page),
+            'next_start_after': page[-1]['id'] if has_more else None
+        }
+    
+    def iter_tickets(self, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les tickets au fil de la lecture Firestore, sans les accumuler en mémoire"""
+        if not self.connected:
+            for ticket in self._get_sample_tickets():
+                yield self._project(ticket, fields)
+            return
+        
+        if self._synced_ticket_store():
+            # Pages de la copie locale : aucune lecture Firestore hors synchronisation
+            start_after = None
+            while True:
+                page = self.ticket_store.get_tickets_page(500, start_after, fields)
+                yield from page['tickets']
+                start_after = page['next_start_after']
+                if start_after is None:
+                    return
+        
+        for doc in self._tickets_query(fields).stream():
+            ticket_data = doc.to_dict()
+            ticket_data['id'] = doc.id
+            yield ticket_data
+    
     def _get_sample_tickets(self) -> List[Dict[str, Any]]:
         """Retourne des tickets d'exemple pour les tests"""
         return [
@@ -82,26 +177,69 @@ class FirebaseConnector:
             }
         ]
     
-    def get_tickets_for_training(self) -> pd.DataFrame:
-        """Récupère les tickets avec leurs catégories pour l'entraînement"""
-        tickets = self.get_all_tickets()
-        
-        training_data = []
-        for ticket in tickets:
-            if 'titre' in ticket and 'description' in ticket and 'categorie' in ticket:
-                # Combiner titre et description
-                text = f"{ticket['titre']} {ticket['description']}"
-                
-                training_data.append({
-                    'text': text,
-                    'category': ticket['categorie'],
-                    'ticket_id': ticket['id'],
-                    'date_created': ticket.get('dateSoumission', datetime.now())
-                })
+    def sync_ticket_store(self, force_full: bool = False) -> Dict[str, Any]:
+        """Force une synchronisation de la copie locale des tickets"""
+        if not self.connected or not self.ticket_store:
+            return {'full': False, 'changed': 0, 'high_water_mark': None}
+        return self.ticket_store.sync(self.db, force_full=force_full)
+    
+    def get_tickets_for_training_since(self, since: datetime) -> pd.DataFrame:
+        """Récupère uniquement les tickets soumis après une date pour l'entraînement incrémental"""
+        if not self.connected:
+            # Les tickets d'exemple ne changent pas : aucune nouvelle donnée en mode local
+            return self._tickets_to_training_frame([])
         
-        df = pd.DataFrame(training_data)
-        logger.info(f"Données d'entraînement préparées: {len(df)} échantillons")
-        return df
+        try:
+            query = self.db.collection('tickets').where('dateSoumission', '>', since)
+            tickets = []
+            for doc in query.stream():
+                ticket_data = doc.to_dict()
+                ticket_data['id'] = doc.id
+                tickets.append(ticket_data)
+            
+            df = self._tickets_to_training_frame(tickets)
+            logger.info(f"{len(df)} nouveaux tickets depuis {since.isoformat()}")
+            return df
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des nouveaux tickets: {e}")
+            return self._tickets_to_training_frame([])
+    
+    def get_feedback_corrections_since(self, since: datetime) -> pd.DataFrame:
+        """Récupère les feedbacks postérieurs à une date avec le texte des tickets concernés"""
+        columns = ['text', 'category', 'ticket_id', 'date_created']
+        if not self.connected:
+            return pd.DataFrame(columns=columns)
+        
+        try:
+            query = self.db.collection('prediction_feedback').where('feedback_date', '>', since)
+            feedbacks = [doc.to_dict() for doc in query.stream()]
+            if not feedbacks:
+                return pd.DataFrame(columns=columns)
+            
+            # Relire les tickets concernés en un seul appel groupé
+            tickets_ref = self.db.collection('tickets')
+            refs = [tickets_ref.document(fb['ticket_id']) for fb in feedbacks if fb.get('ticket_id')]
+            texts = {}
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    ticket = doc.to_dict()
+                    texts[doc.id] = f"{ticket.get('titre', '')} {ticket.get('description', '')}"
+            
+            corrections = [
+                {
+                    'text': texts[fb['ticket_id']],
+                    'category': fb['actual_category'],
+                    'ticket_id': fb['ticket_id'],
+                    'date_created': fb.get('feedback_date', datetime.now())
+                }
+                for fb in feedbacks
+                if fb.get('ticket_id') in texts and fb.get('actual_category')
+            ]
+            logger.info(f"{len(corrections)} feedbacks depuis {since.isoformat()}")
+            return pd.DataFrame(corrections, columns=columns)
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des feedbacks: {e}")
+            return pd.DataFrame(columns=columns)
     
     def save_prediction_feedback(self, ticket_id: str, predicted_category: str, 
                                 actual_category: str, confidence: float):
@@ -116,10 +254,16 @@ class FirebaseConnector:
                 'predicted_category': predicted_category,
                 'actual_category': actual_category,
                 'confidence': confidence,
-                'feedback_date': datetime.now(),
+                'feedback_date': SERVER_TIMESTAMP if self.write_buffer else datetime.now(),
                 'needs_retraining': predicted_category != actual_category
             }
             
+            if self.write_buffer:
+                # Regroupé avec les autres écritures dans un commit par lot
+                self.write_buffer.add('prediction_feedback', feedback_data)
+                logger.info(f"Feedback mis en file pour le ticket {ticket_id}")
+                return
+            
             self.db.collection('prediction_feedback').add(feedback_data)
             logger.info(f"Feedback sauvegardé pour le ticket {ticket_id}")
         except Exception as e:
@@ -132,6 +276,15 @@ class FirebaseConnector:
             return
         
         try:
+            if self.write_buffer:
+                self.write_buffer.update('tickets', ticket_id, {
+                    'categorie': new_category,
+                    'categorie_modifiee': True,
+                    'date_modification': SERVER_TIMESTAMP
+                })
+                logger.info(f"Mise à jour de catégorie mise en file pour le ticket {ticket_id}")
+                return
+            
             ticket_ref = self.db.collection('tickets').document(ticket_id)
             ticket_ref.update({
                 'categorie': new_category,
@@ -142,6 +295,37 @@ class FirebaseConnector:
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour de la catégorie: {e}")
     
+    def update_tickets(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Met à jour plusieurs tickets par commits groupés (reclassification) ; retourne le nombre écrit"""
+        if not self.connected:
+            logger.info(f"Mise à jour simulée de {len(updates)} tickets")
+            return 0
+        
+        tickets_ref = self.db.collection('tickets')
+        items = list(updates.items())
+        # Firestore limite un commit à 500 écritures
+        for start in range(0, len(items), 500):
+            batch = self.db.batch()
+            for ticket_id, fields in items[start:start + 500]:
+                batch.update(tickets_ref.document(ticket_id), {
+                    **fields,
+                    'date_reclassification': firestore.SERVER_TIMESTAMP
+                })
+            batch.commit()
+        logger.info(f"{len(items)} tickets mis à jour")
+        return len(items)
+    
+    def flush_writes(self) -> int:
+        """Envoie immédiatement les écritures différées en attente"""
+        if not self.write_buffer:
+            return 0
+        return self.write_buffer.flush()
+    
+    def close(self):
+        """Arrête l'envoi différé ; les écritures non envoyées restent sur disque"""
+        if self.write_buffer:
+            self.write_buffer.close()
+    
     def save_model_metadata(self, metadata: Dict[str, Any]):
         """Sauvegarde les métadonnées d'un modèle entraîné dans Firestore."""
         if not self.connected:
@@ -188,13 +372,40 @@ class FirebaseConnector:
             return pd.DataFrame()
     
     def get_tickets_count(self) -> int:
-        """Retourne le nombre total de tickets"""
+        """Retourne le nombre total de tickets (agrégation côté serveur, mise en cache)"""
         if not self.connected:
             return len(self._get_sample_tickets())
         
+        # Les sondes de santé appellent cette méthode en boucle : servir le cache tant qu'il est frais
+        cached_count, cached_at = self._tickets_count_cache
+        if cached_count is not None and time.monotonic() - cached_at < Config.COUNT_CACHE_TTL:
+            return cached_count
+        
         try:
-            tickets_ref = self.db.collection('tickets')
-            return len(list(tickets_ref.stream()))
+            # COUNT() côté serveur : aucun document n'est téléchargé
+            result = self.db.collection('tickets').count(alias='total').get()
+            count = int(result[0][0].value)
+            self._tickets_count_cache = (count, time.monotonic())
+            return count
         except Exception as e:
             logger.error(f"Erreur lors du comptage des tickets: {e}")
-            return len(self._get_sample_tickets()) 
\ No newline at end of file
+            if cached_count is not None:
+                return cached_count
+            if self.ticket_store:
+                return self.ticket_store.count()
+            return -1
+    
+    def count_tickets_since(self, since: datetime) -> int:
+        """Compte les tickets soumis après une date (agrégation côté serveur, -1 en cas d'erreur)"""
+        if not self.connected:
+            # Les tickets d'exemple ne changent pas : aucun nouveau ticket en mode local
+            return 0
+        
+        try:
+            # Le filtre et le COUNT() sont évalués par Firestore : le coût dépend des seuls nouveaux tickets
+            query = self.db.collection('tickets').where('dateSoumission', '>', since)
+            result = query.count(alias='total').get()
+            return int(result[0][0].value)
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des nouveaux tickets: {e}")
+            return -1
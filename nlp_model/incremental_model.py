@@ -0,0 +1,189 @@
+import copy
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from config import Config
+from model_bundle import ModelBundle
+from text_preprocessor import TextPreprocessor
+
+logger = logging.getLogger(__name__)
+
+def is_incremental_bundle(bundle: Optional[ModelBundle]) -> bool:
+    """Indique si un modèle peut être mis à jour par partial_fit"""
+    return (bundle is not None
+            and hasattr(bundle.classifier, 'partial_fit')
+            and not hasattr(bundle.vectorizer, 'vocabulary_'))
+
+def _make_vectorizer() -> HashingVectorizer:
+    """Vectoriseur sans état : les features ne dépendent pas du corpus vu"""
+    return HashingVectorizer(
+        n_features=Config.INCREMENTAL_N_FEATURES,
+        ngram_range=Config.N_GRAM_RANGE,
+        alternate_sign=False,
+        norm='l2'
+    )
+
+def _prepare(training_data: pd.DataFrame, vectorizer, label_encoder,
+             preprocessor: TextPreprocessor) -> Tuple[Any, np.ndarray]:
+    """Vectorise les textes et encode les catégories connues du modèle"""
+    # Les classes d'un modèle incrémental sont fixées à sa création
+    known = training_data['category'].isin(label_encoder.classes_)
+    if not known.all():
+        unknown = sorted(set(training_data.loc[~known, 'category']))
+        logger.warning(f"{(~known).sum()} échantillons ignorés (catégories inconnues: {unknown})")
+        training_data = training_data[known]
+
+    if training_data.empty:
+        return None, np.array([], dtype=int)
+
+    processed = preprocessor.preprocess_batch(training_data['text'])
+    X = vectorizer.transform(processed)
+    y = label_encoder.transform(training_data['category'])
+    return X, y
+
+def _partial_fit(classifier: SGDClassifier, X, y: np.ndarray, classes: np.ndarray,
+                 sample_weight: float = 1.0, epochs: int = 1):
+    """Applique les échantillons par mini-lots"""
+    batch_size = Config.INCREMENTAL_BATCH_SIZE
+    rng = np.random.RandomState(42)
+    for _ in range(epochs):
+        order = rng.permutation(X.shape[0])
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            classifier.partial_fit(
+                X[idx], y[idx], classes=classes,
+                sample_weight=np.full(len(idx), sample_weight)
+            )
+
+def build_incremental_bundle(training_data: pd.DataFrame,
+                             preprocessor: TextPreprocessor = None) -> Tuple[ModelBundle, Any, Any]:
+    """Crée un modèle incrémental (hachage + SGD) à partir d'un premier jeu de données"""
+    preprocessor = preprocessor or TextPreprocessor()
+
+    label_encoder = LabelEncoder().fit(Config.TICKET_CATEGORIES)
+    vectorizer = _make_vectorizer()
+    classifier = SGDClassifier(
+        loss='log_loss',
+        alpha=Config.INCREMENTAL_ALPHA,
+        random_state=42
+    )
+
+    X, y = _prepare(training_data, vectorizer, label_encoder, preprocessor)
+    if X is None:
+        raise ValueError("Aucun échantillon exploitable pour initialiser le modèle incrémental")
+
+    _partial_fit(classifier, X, y, np.arange(len(label_encoder.classes_)),
+                 epochs=Config.INCREMENTAL_BOOTSTRAP_EPOCHS)
+
+    return ModelBundle(vectorizer, classifier, label_encoder), X, y
+
+def update_incremental_bundle(bundle: ModelBundle, training_data: pd.DataFrame,
+                              sample_weight: float = 1.0,
+                              preprocessor: TextPreprocessor = None) -> Optional[ModelBundle]:
+    """Retourne un nouveau modèle mis à jour avec les échantillons fournis (le modèle d'origine reste intact)"""
+    preprocessor = preprocessor or TextPreprocessor()
+    X, y = _prepare(training_data, bundle.vectorizer, bundle.label_encoder, preprocessor)
+    if X is None:
+        return None
+
+    # Copie : le modèle actif est immuable et peut servir pendant la mise à jour
+    classifier = copy.deepcopy(bundle.classifier)
+    _partial_fit(classifier, X, y, classifier.classes_, sample_weight=sample_weight)
+
+    return ModelBundle(bundle.vectorizer, classifier, bundle.label_encoder)
+
+def load_incremental_state() -> Dict[str, Optional[datetime]]:
+    """Charge les dates des dernières données déjà appliquées au modèle"""
+    try:
+        with open(Config.INCREMENTAL_STATE_PATH, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        return {
+            key: datetime.fromisoformat(value) if value else None
+            for key, value in raw.items()
+        }
+    except FileNotFoundError:
+        return {'tickets_since': None, 'feedback_since': None}
+
+def save_incremental_state(state: Dict[str, Optional[datetime]]):
+    """Sauvegarde les dates des dernières données appliquées (écriture atomique)"""
+    os.makedirs(os.path.dirname(Config.INCREMENTAL_STATE_PATH) or '.', exist_ok=True)
+    tmp_path = f"{Config.INCREMENTAL_STATE_PATH}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            key: value.isoformat() if value else None
+            for key, value in state.items()
+        }, f)
+    os.replace(tmp_path, Config.INCREMENTAL_STATE_PATH)
+
+def _as_utc(value) -> Optional[datetime]:
+    """Date en UTC ; une date sans fuseau (tickets d'exemple, ancien état) est une heure locale"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(timezone.utc)
+
+def _latest_date(df: pd.DataFrame, default: datetime) -> datetime:
+    """Date la plus récente d'un lot d'échantillons (UTC), default pour un lot vide"""
+    dates = [date for date in (_as_utc(value) for value in df['date_created']) if date] if not df.empty else []
+    return max(dates) if dates else _as_utc(default)
+
+def run_incremental_update(connector, bundle: Optional[ModelBundle],
+                           preprocessor: TextPreprocessor = None
+                           ) -> Tuple[Optional[ModelBundle], Dict[str, Any], Dict[str, Optional[datetime]]]:
+    """Applique au modèle les nouveaux tickets et feedbacks depuis la dernière mise à jour.
+
+    Retourne le nouveau modèle (None si rien à appliquer), des statistiques et le
+    nouvel état, en UTC. L'état est à sauvegarder dans tous les cas : après
+    l'écriture du modèle s'il y en a un, directement sinon (données déjà lues
+    mais inutilisables, comme des catégories inconnues, à ne pas relire).
+    """
+    preprocessor = preprocessor or TextPreprocessor()
+    now = datetime.now(timezone.utc)
+
+    if not is_incremental_bundle(bundle):
+        # Premier passage en mode incrémental : initialisation sur tout l'historique, une seule fois
+        logger.info("Initialisation du modèle incrémental sur l'historique complet")
+        training_data = connector.get_tickets_for_training()
+        new_bundle, _, _ = build_incremental_bundle(training_data, preprocessor)
+        state = {'tickets_since': _latest_date(training_data, now), 'feedback_since': now}
+        return new_bundle, {'bootstrap': True, 'tickets': len(training_data), 'feedback': 0}, state
+
+    state = load_incremental_state()
+    trained_at = _as_utc(bundle.trained_at)
+    tickets_since = _as_utc(state.get('tickets_since')) or trained_at
+    feedback_since = _as_utc(state.get('feedback_since')) or trained_at
+
+    new_tickets = connector.get_tickets_for_training_since(tickets_since)
+    corrections = connector.get_feedback_corrections_since(feedback_since)
+
+    updated = bundle
+    if not new_tickets.empty:
+        updated = update_incremental_bundle(updated, new_tickets, preprocessor=preprocessor) or updated
+    if not corrections.empty:
+        # Les corrections humaines pèsent plus que les catégories prédites
+        updated = update_incremental_bundle(
+            updated, corrections,
+            sample_weight=Config.FEEDBACK_SAMPLE_WEIGHT,
+            preprocessor=preprocessor
+        ) or updated
+
+    stats = {'bootstrap': False, 'tickets': len(new_tickets), 'feedback': len(corrections)}
+    state = {
+        'tickets_since': _latest_date(new_tickets, tickets_since),
+        'feedback_since': _latest_date(corrections, feedback_since)
+    }
+    return (updated if updated is not bundle else None), stats, state
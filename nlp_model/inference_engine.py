@@ -0,0 +1,80 @@
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Any, Optional
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class InferenceEngine:
+    def __init__(self, vectorizer, classifier, label_encoder, top_k: int = 3,
+                 keywords_top_k: int = Config.KEYWORDS_TOP_K):
+        """Prépare l'inférence pour un modèle chargé (construit une fois par modèle)"""
+        self.vectorizer = vectorizer
+        self.classifier = classifier
+        self.top_k = top_k
+        self.keywords_top_k = keywords_top_k
+        self._feature_names = None
+        # Un vectoriseur par hachage (mode incrémental) n'a pas de vocabulaire
+        self.has_vocabulary = hasattr(vectorizer, 'vocabulary_')
+
+        # Noms des catégories dans l'ordre des colonnes de predict_proba,
+        # décodés une seule fois au lieu d'un inverse_transform par prédiction
+        self.class_names = [
+            str(name) for name in label_encoder.inverse_transform(classifier.classes_)
+        ]
+
+    @property
+    def feature_names(self):
+        """Noms des features TF-IDF, calculés à la première utilisation"""
+        if self._feature_names is None:
+            self._feature_names = self.vectorizer.get_feature_names_out()
+        return self._feature_names
+
+    def transform(self, processed_texts: List[str]):
+        """Vectorise un lot de textes déjà prétraités (matrice creuse CSR)"""
+        return self.vectorizer.transform(processed_texts)
+
+    def predict(self, processed_texts: List[str]) -> List[Dict[str, Any]]:
+        """Vectorise et prédit un lot de textes déjà prétraités"""
+        return self.predict_matrix(self.transform(processed_texts), processed_texts)
+
+    def keywords(self, X, row: int, processed_text: Optional[str] = None) -> List[str]:
+        """Mots-clés d'un ticket : ses features non nulles de plus fort poids TF-IDF"""
+        if not self.has_vocabulary:
+            # Features hachées : pas de nom à relire, on prend les tokens les plus fréquents
+            tokens = (processed_text or '').split()
+            return [word for word, _ in Counter(tokens).most_common(self.keywords_top_k)]
+
+        start, end = X.indptr[row], X.indptr[row + 1]
+        weights = X.data[start:end]
+        if not len(weights):
+            return []
+        best = np.argsort(-weights, kind='stable')[:self.keywords_top_k]
+        feature_names = self.feature_names
+        return [str(feature_names[X.indices[start + i]]) for i in best]
+
+    def predict_matrix(self, X, processed_texts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Calcule catégorie, confiance, top-k et mots-clés à partir d'une seule passe predict_proba"""
+        probabilities = self.classifier.predict_proba(X)
+
+        # Indices des top-k catégories, de la plus probable à la moins probable
+        # (tri stable : en cas d'égalité on garde le même gagnant que classifier.predict)
+        top_indices = np.argsort(-probabilities, axis=1, kind='stable')[:, :self.top_k]
+
+        predictions = []
+        for i, (row, indices) in enumerate(zip(probabilities, top_indices)):
+            confidence = float(row[indices[0]])
+            predictions.append({
+                'predicted_category': self.class_names[indices[0]],
+                'confidence': confidence,
+                'top_categories': [
+                    {'category': self.class_names[idx], 'confidence': float(row[idx])}
+                    for idx in indices
+                ],
+                'needs_human_review': confidence < Config.MIN_CONFIDENCE_THRESHOLD,
+                'keywords': self.keywords(X, i, processed_texts[i] if processed_texts else None)
+            })
+
+        return predictions
@@ -0,0 +1,234 @@
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from config import Config
+from synthetic_data import generate_tickets
+
+logger = logging.getLogger(__name__)
+
+# Répartition par défaut des requêtes (poids relatifs)
+DEFAULT_MIX = {'predict': 60, 'feedback': 15, 'tickets': 15, 'health': 10}
+
+class LoadGenerator:
+    def __init__(self, base_url: str, mix: Dict[str, float] = None, n_tickets: int = Config.MEMORY_STORE_TICKETS,
+                 seed: int = 42, timeout: float = 30.0):
+        """Génère un trafic mixte /predict, /feedback, /tickets et /health sur une API en cours d'exécution.
+
+        Les requêtes reprennent des tickets synthétiques (synthetic_data) ; avec
+        STORAGE_BACKEND=memory, les identifiants envoyés à /feedback et /tickets
+        existent côté serveur pour la même graine et le même nombre de tickets.
+        """
+        url = urlparse(base_url)
+        self.host = url.hostname or 'localhost'
+        self.port = url.port or 80
+        self.mix = mix or DEFAULT_MIX
+        self.seed = seed
+        self.timeout = timeout
+        self.tickets = generate_tickets(n_tickets, seed)
+        self.categories = list(Config.TICKET_CATEGORIES)
+
+    def _build_request(self, endpoint: str, rng: random.Random) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        ticket = rng.choice(self.tickets)
+        if endpoint == 'predict':
+            return 'POST', '/predict', {'titre': ticket['titre'], 'description': ticket['description']}
+        if endpoint == 'feedback':
+            return 'POST', '/feedback', {
+                'ticket_id': ticket['id'],
+                'predicted_category': ticket['categorie'],
+                'actual_category': rng.choice(self.categories),
+                'confidence': round(rng.random(), 3)
+            }
+        if endpoint == 'tickets':
+            return 'GET', f"/tickets?limit=50&start_after={ticket['id']}", None
+        return 'GET', '/health', None
+
+    def _send(self, connection: http.client.HTTPConnection, method: str, path: str,
+              body: Optional[Dict[str, Any]]) -> int:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def _worker(self, worker_id: int, warmup_until: float, stop_at: float,
+                records: List[Tuple[str, int, float]]):
+        """Boucle d'un client : une connexion persistante, requêtes enchaînées sans pause"""
+        rng = random.Random(self.seed + worker_id)
+        endpoints, weights = list(self.mix), list(self.mix.values())
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        while time.perf_counter() < stop_at:
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, path, body = self._build_request(endpoint, rng)
+            request_started = time.perf_counter()
+            try:
+                status = self._send(connection, method, path, body)
+            except Exception:
+                # Connexion rompue ou délai dépassé : compté en erreur (statut 0), nouvelle connexion
+                status = 0
+                connection.close()
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            if request_started >= warmup_until:
+                records.append((endpoint, status, time.perf_counter() - request_started))
+        connection.close()
+
+    def run(self, concurrency: int, duration: float, warmup: float = 2.0) -> Dict[str, Any]:
+        """Lance concurrency clients pendant warmup + duration secondes ; le préchauffage n'est pas mesuré"""
+        started = time.perf_counter()
+        warmup_until = started + warmup
+        stop_at = warmup_until + duration
+        per_worker = [[] for _ in range(concurrency)]
+        threads = [
+            threading.Thread(target=self._worker, args=(i, warmup_until, stop_at, per_worker[i]),
+                             name=f'load-{i}', daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        records = [record for worker_records in per_worker for record in worker_records]
+        return {
+            'created_at': datetime.now().isoformat(),
+            'target': f"http://{self.host}:{self.port}",
+            'concurrency': concurrency,
+            'duration_seconds': duration,
+            'mix': self.mix,
+            'overall': summarize(records, duration),
+            'endpoints': {
+                endpoint: summarize([record for record in records if record[0] == endpoint], duration)
+                for endpoint in self.mix
+            }
+        }
+
+def summarize(records: List[Tuple[str, int, float]], duration: float) -> Dict[str, Any]:
+    """Débit, taux d'erreur (statut 0 ou >= 400), répartition des statuts et percentiles de latence"""
+    if not records:
+        return {'requests': 0, 'throughput_per_second': 0.0, 'error_rate': 0.0, 'status_codes': {}}
+
+    durations = np.array([record[2] for record in records]) * 1000
+    statuses = {}
+    for _, status, _ in records:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status, _ in records if status == 0 or status >= 400)
+    return {
+        'requests': len(records),
+        'throughput_per_second': round(len(records) / duration, 1),
+        'error_rate': round(errors / len(records), 4),
+        'status_codes': statuses,
+        'latency_ms': {
+            'p50': round(float(np.percentile(durations, 50)), 2),
+            'p90': round(float(np.percentile(durations, 90)), 2),
+            'p99': round(float(np.percentile(durations, 99)), 2),
+            'max': round(float(durations.max()), 2)
+        }
+    }
+
+def wait_until_ready(base_url: str, timeout: float = 120.0, server: Optional[subprocess.Popen] = None) -> bool:
+    """Attend que /readyz réponde 200 (modèle chargé et préchauffé)"""
+    url = urlparse(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server and server.poll() is not None:
+            return False
+        try:
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=5)
+            connection.request('GET', '/readyz')
+            if connection.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+def start_server(port: int, n_tickets: int, read_latency_ms: float, write_latency_ms: float) -> subprocess.Popen:
+    """Démarre l'API sur le stockage en mémoire, dans un processus séparé"""
+    env = dict(os.environ,
+               STORAGE_BACKEND='memory',
+               MEMORY_STORE_TICKETS=str(n_tickets),
+               MEMORY_STORE_READ_LATENCY_MS=str(read_latency_ms),
+               MEMORY_STORE_WRITE_LATENCY_MS=str(write_latency_ms))
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api_server:app', '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    """Convertit "predict=60,health=10" en poids par point d'accès"""
+    mix = {}
+    for item in value.split(','):
+        endpoint, _, weight = item.partition('=')
+        endpoint = endpoint.strip()
+        if endpoint not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Point d'accès inconnu: {endpoint} (disponibles: {', '.join(DEFAULT_MIX)})")
+        mix[endpoint] = float(weight or 1)
+    return mix
+
+def main():
+    """Test de charge HTTP de l'API, optionnellement démarrée sur le stockage en mémoire"""
+    parser = argparse.ArgumentParser(description="Test de charge de l'API de classification")
+    parser.add_argument('--url', help="API déjà démarrée (par défaut : serveur lancé par le script)")
+    parser.add_argument('--port', type=int, default=8765, help="Port du serveur lancé par le script")
+    parser.add_argument('--concurrency', type=int, default=16, help="Clients simultanés")
+    parser.add_argument('--duration', type=float, default=30, help="Durée mesurée en secondes")
+    parser.add_argument('--warmup', type=float, default=2, help="Préchauffage non mesuré en secondes")
+    parser.add_argument('--mix', type=_parse_mix, default=DEFAULT_MIX,
+                        help="Poids des requêtes, ex. predict=60,feedback=15,tickets=15,health=10")
+    parser.add_argument('--tickets', type=int, default=Config.MEMORY_STORE_TICKETS,
+                        help="Tickets synthétiques du stockage en mémoire")
+    parser.add_argument('--read-latency-ms', type=float, default=Config.MEMORY_STORE_READ_LATENCY_MS,
+                        help="Latence simulée des lectures du stockage")
+    parser.add_argument('--write-latency-ms', type=float, default=Config.MEMORY_STORE_WRITE_LATENCY_MS,
+                        help="Latence simulée des écritures du stockage")
+    parser.add_argument('--output', help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args.port, args.tickets, args.read_latency_ms, args.write_latency_ms)
+    try:
+        if not wait_until_ready(base_url, server=server):
+            raise SystemExit(f"L'API {base_url} n'est pas prête")
+        logger.info(f"Test de charge sur {base_url}: {args.concurrency} clients pendant {args.duration}s")
+        results = LoadGenerator(base_url, args.mix, args.tickets).run(args.concurrency, args.duration, args.warmup)
+        if server:
+            results['server'] = {'storage_backend': 'memory', 'tickets': args.tickets,
+                                 'read_latency_ms': args.read_latency_ms, 'write_latency_ms': args.write_latency_ms}
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"{'point d accès':<14}{'requêtes':>10}{'req/s':>10}{'erreurs':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for name, summary in [*results['endpoints'].items(), ('total', results['overall'])]:
+        latency = summary.get('latency_ms', {})
+        print(f"{name:<14}{summary['requests']:>10}{summary['throughput_per_second']:>10.1f}"
+              f"{summary['error_rate']:>10.2%}{latency.get('p50', 0):>10.2f}"
+              f"{latency.get('p90', 0):>10.2f}{latency.get('p99', 0):>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import bisect
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from config import Config
+from storage import TRAINING_COLUMNS, TicketStorage
+from synthetic_data import generate_tickets
+
+logger = logging.getLogger(__name__)
+
+class InMemoryConnector(TicketStorage):
+    def __init__(self, n_tickets: int = Config.MEMORY_STORE_TICKETS,
+                 read_latency_ms: float = Config.MEMORY_STORE_READ_LATENCY_MS,
+                 write_latency_ms: float = Config.MEMORY_STORE_WRITE_LATENCY_MS,
+                 seed: int = 42):
+        """Remplaçant en mémoire de FirebaseConnector, pour les tests de charge et les benchmarks.
+
+        Les tickets sont générés par synthetic_data ; chaque lecture ou écriture
+        attend la latence configurée (± 20 %) pour simuler l'aller-retour réseau
+        de Firestore. Rien n'est conservé à l'arrêt du processus, et chaque
+        processus a son propre stockage : avec ce backend, réentraînement et
+        reclassification tournent dans un thread du serveur (TrainingJobManager)
+        pour voir les tickets et feedbacks reçus par l'API.
+        """
+        self.db = None
+        self.connected = True
+        self.ticket_store = None
+        self.write_buffer = None
+        self.read_latency_ms = read_latency_ms
+        self.write_latency_ms = write_latency_ms
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tickets = {ticket['id']: ticket for ticket in generate_tickets(n_tickets, seed)}
+        self._ids = sorted(self._tickets)
+        self._feedbacks = []
+        self._model_metadata = []
+        logger.info(f"Stockage en mémoire initialisé avec {n_tickets} tickets synthétiques")
+
+    def _wait(self, latency_ms: float):
+        if latency_ms > 0:
+            with self._lock:
+                jitter = self._random.uniform(0.8, 1.2)
+            time.sleep(latency_ms * jitter / 1000)
+
+    def _project(self, ticket: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        """Copie du ticket réduite aux champs demandés : l'appelant ne modifie pas le stockage"""
+        if not fields:
+            return dict(ticket)
+        projected = {field: ticket[field] for field in fields if field in ticket}
+        projected['id'] = ticket['id']
+        return projected
+
+    def get_all_tickets(self) -> List[Dict[str, Any]]:
+        """Retourne une copie de tous les tickets"""
+        self._wait(self.read_latency_ms)
+        with self._lock:
+            return [dict(self._tickets[ticket_id]) for ticket_id in self._ids]
+
+    def get_tickets_page(self, limit: int, start_after: Optional[str] = None,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Page de tickets ordonnée par identifiant, comme FirebaseConnector.get_tickets_page"""
+        self._wait(self.read_latency_ms)
+        with self._lock:
+            start = bisect.bisect_right(self._ids, start_after) if start_after else 0
+            ids = self._ids[start:start + limit + 1]
+            page = [self._project(self._tickets[ticket_id], fields) for ticket_id in ids]
+
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {
+            'tickets': page,
+            'count': len(page),
+            'next_start_after': page[-1]['id'] if has_more else None
+        }
+
+    def iter_tickets(self, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les tickets (une latence de lecture par tranche de 500, comme un flux Firestore)"""
+        start_after = None
+        while True:
+            page = self.get_tickets_page(500, start_after, fields)
+            yield from page['tickets']
+            start_after = page['next_start_after']
+            if start_after is None:
+                return
+
+    def get_tickets_for_training_since(self, since: datetime) -> pd.DataFrame:
+        """Tickets soumis après une date pour l'entraînement incrémental"""
+        return self._tickets_to_training_frame([
+            ticket for ticket in self.get_all_tickets()
+            if ticket.get('dateSoumission') and ticket['dateSoumission'] > since
+        ])
+
+    def get_feedback_corrections_since(self, since: datetime) -> pd.DataFrame:
+        """Feedbacks postérieurs à une date avec le texte des tickets concernés"""
+        self._wait(self.read_latency_ms)
+        with self._lock:
+            corrections = [
+                {
+                    'text': f"{self._tickets[fb['ticket_id']].get('titre', '')} "
+                            f"{self._tickets[fb['ticket_id']].get('description', '')}",
+                    'category': fb['actual_category'],
+                    'ticket_id': fb['ticket_id'],
+                    'date_created': fb['feedback_date']
+                }
+                for fb in self._feedbacks
+                if fb['feedback_date'] > since and fb['ticket_id'] in self._tickets and fb.get('actual_category')
+            ]
+        return pd.DataFrame(corrections, columns=TRAINING_COLUMNS)
+
+    def save_prediction_feedback(self, ticket_id: str, predicted_category: str,
+                                 actual_category: str, confidence: float):
+        """Enregistre le feedback d'une prédiction"""
+        self._wait(self.write_latency_ms)
+        with self._lock:
+            self._feedbacks.append({
+                'id': uuid.uuid4().hex,
+                'ticket_id': ticket_id,
+                'predicted_category': predicted_category,
+                'actual_category': actual_category,
+                'confidence': confidence,
+                'feedback_date': datetime.now(timezone.utc),
+                'needs_retraining': predicted_category != actual_category
+            })
+
+    def update_ticket_category(self, ticket_id: str, new_category: str):
+        """Met à jour la catégorie d'un ticket (ignoré si le ticket n'existe pas)"""
+        self._wait(self.write_latency_ms)
+        with self._lock:
+            ticket = self._tickets.get(ticket_id)
+            if ticket is None:
+                logger.error(f"Ticket {ticket_id} introuvable")
+                return
+            ticket.update({
+                'categorie': new_category,
+                'categorie_modifiee': True,
+                'date_modification': datetime.now(timezone.utc)
+            })
+
+    def update_tickets(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Met à jour plusieurs tickets ; une latence d'écriture par commit de 500"""
+        items = list(updates.items())
+        for start in range(0, len(items), 500):
+            self._wait(self.write_latency_ms)
+            with self._lock:
+                for ticket_id, fields in items[start:start + 500]:
+                    if ticket_id in self._tickets:
+                        self._tickets[ticket_id].update({**fields, 'date_reclassification': datetime.now(timezone.utc)})
+        return len(items)
+
+    def save_model_metadata(self, metadata: Dict[str, Any]):
+        """Conserve les métadonnées d'un modèle entraîné"""
+        self._wait(self.write_latency_ms)
+        with self._lock:
+            self._model_metadata.append(dict(metadata))
+
+    def get_prediction_feedback(self) -> pd.DataFrame:
+        """Feedbacks enregistrés"""
+        self._wait(self.read_latency_ms)
+        with self._lock:
+            return pd.DataFrame(list(self._feedbacks))
+
+    def get_tickets_count(self) -> int:
+        """Nombre total de tickets"""
+        self._wait(self.read_latency_ms)
+        return len(self._ids)
+
+    def count_tickets_since(self, since: datetime) -> int:
+        """Nombre de tickets soumis après une date"""
+        self._wait(self.read_latency_ms)
+        with self._lock:
+            return sum(
+                1 for ticket in self._tickets.values()
+                if ticket.get('dateSoumission') and ticket['dateSoumission'] > since
+            )
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from executors import run_inference
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    def __init__(self, predict_fn: Callable[[List[str]], List[Dict[str, Any]]],
+                 max_batch_size: int = Config.MICRO_BATCH_MAX_SIZE,
+                 window_ms: float = Config.MICRO_BATCH_WINDOW_MS):
+        """Regroupe les prédictions concurrentes en lots évalués en une seule passe du modèle"""
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000.0
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = set()
+
+        # Statistiques
+        self.batches_count = 0
+        self.requests_count = 0
+        self.fallbacks_count = 0
+
+    async def start(self):
+        """Démarre la boucle de collecte (à appeler depuis la boucle d'événements du serveur)"""
+        if self._task is not None:
+            return
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._collect_loop())
+        logger.info(f"Micro-batching actif (fenêtre: {self.window * 1000:.1f} ms, "
+                    f"lot max: {self.max_batch_size})")
+
+    async def stop(self):
+        """Arrête la collecte et termine les lots en cours"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+        # Les requêtes encore en file ne seront jamais traitées
+        while not self.queue.empty():
+            self._fail([self.queue.get_nowait()], RuntimeError("Micro-batcher arrêté"))
+
+    @staticmethod
+    def _fail(batch: List[tuple], error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def submit(self, text: str) -> Dict[str, Any]:
+        """Soumet un texte et attend sa propre prédiction"""
+        if self._task is None:
+            raise RuntimeError("Micro-batcher non démarré")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _collect_loop(self):
+        """Collecte les requêtes arrivées dans la fenêtre et les envoie par lots"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+
+            try:
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Arrêt pendant la collecte : ces requêtes ne sont plus dans la file
+                self._fail(batch, RuntimeError("Micro-batcher arrêté"))
+                raise
+
+            # Le lot est évalué en tâche de fond pour que la collecte du suivant continue
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[tuple]):
+        """Évalue un lot et renvoie à chaque appelant son résultat"""
+        texts = [text for text, _ in batch]
+        try:
+            predictions = await run_inference(self.predict_fn, texts)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            # Un texte en erreur ne doit pas faire échouer ses voisins de lot :
+            # chaque requête est réévaluée seule et reçoit sa propre erreur
+            logger.warning(f"Échec d'un lot de {len(batch)} prédictions, évaluation une par une: {e}")
+            self.fallbacks_count += 1
+            await asyncio.gather(*(self._dispatch([request]) for request in batch))
+            return
+
+        self.batches_count += 1
+        self.requests_count += len(batch)
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def get_stats(self) -> dict:
+        """Retourne les statistiques de regroupement"""
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch_size': self.max_batch_size,
+            'batches_count': self.batches_count,
+            'requests_count': self.requests_count,
+            'average_batch_size': (self.requests_count / self.batches_count
+                                   if self.batches_count else 0.0),
+            'fallbacks_count': self.fallbacks_count,
+            'queued': self.queue.qsize() if self.queue else 0,
+            'in_flight': len(self._in_flight)
+        }
@@ -0,0 +1,254 @@
+import hashlib
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import joblib
+
+from config import Config
+from flat_forest import FlatForest
+from inference_engine import InferenceEngine
+
+logger = logging.getLogger(__name__)
+
+# Version du format à fichier unique (manifeste + tableaux projetables en mémoire)
+BUNDLE_FORMAT_VERSION = 1
+
+class ModelBundleError(Exception):
+    """Levée quand les fichiers du modèle sont absents ou incohérents"""
+
+def new_model_version() -> str:
+    """Génère un identifiant de version de modèle"""
+    return datetime.now().strftime('%Y%m%d%H%M%S%f')
+
+class ModelBundle:
+    """Modèle complet et immuable : vectoriseur, classifieur, encodeur et moteur d'inférence.
+
+    Un nouveau modèle est toujours un nouvel objet ; le remplacer revient à
+    réassigner une seule référence, si bien qu'une prédiction voit soit
+    l'ancien modèle complet, soit le nouveau, jamais un mélange des deux.
+    """
+    __slots__ = ('vectorizer', 'classifier', 'label_encoder', 'version', 'trained_at', 'engine')
+
+    def __init__(self, vectorizer, classifier, label_encoder,
+                 version: Optional[str] = None, trained_at: Optional[str] = None):
+        set_attr = super().__setattr__
+        set_attr('vectorizer', vectorizer)
+        set_attr('classifier', classifier)
+        set_attr('label_encoder', label_encoder)
+        set_attr('version', version or new_model_version())
+        set_attr('trained_at', trained_at or datetime.now().isoformat())
+        set_attr('engine', InferenceEngine(vectorizer, classifier, label_encoder))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ModelBundle est immuable")
+
+    def get_manifest(self) -> Dict[str, Any]:
+        """Métadonnées du modèle"""
+        return {
+            'version': self.version,
+            'trained_at': self.trained_at,
+            'categories': list(self.engine.class_names),
+            'estimator': type(self.classifier).__name__
+        }
+
+def _file_checksum(path: str) -> str:
+    """Calcule le SHA-256 d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _atomic_write(path: str, write_fn):
+    """Écrit dans un fichier temporaire puis le renomme sur la cible"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _artifact_paths() -> Dict[str, str]:
+    """Fichiers de l'ancien format (un pickle par composant), encore lus au chargement"""
+    return {
+        'classifier': Config.MODEL_PATH,
+        'vectorizer': Config.VECTORIZER_PATH,
+        'label_encoder': Config.ENCODER_PATH
+    }
+
+def _storable_classifier(classifier, compact: bool = False):
+    """Forme sauvegardée du classifieur et son type : les forêts deviennent des tableaux plats"""
+    if isinstance(classifier, FlatForest):
+        return classifier, 'flat_forest'
+    # Import à la demande : lire le manifeste ne doit pas charger sklearn
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    if isinstance(classifier, (RandomForestClassifier, ExtraTreesClassifier)) and classifier.n_outputs_ == 1:
+        return FlatForest.from_forest(classifier, compact), 'flat_forest'
+    return classifier, 'pickle'
+
+def _bundle_payload(bundle: ModelBundle, compact: Optional[bool] = None):
+    """Contenu du fichier de modèle et type du classifieur sauvegardé (Config.COMPACT_MODEL par défaut)"""
+    compact = Config.COMPACT_MODEL if compact is None else compact
+    classifier, classifier_kind = _storable_classifier(bundle.classifier, compact)
+    return {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'vectorizer': bundle.vectorizer,
+        'classifier': classifier,
+        'label_encoder': bundle.label_encoder
+    }, classifier_kind
+
+def serialize_bundle(bundle: ModelBundle, compact: Optional[bool] = None) -> bytes:
+    """Contenu du fichier que produirait save_bundle"""
+    buffer = io.BytesIO()
+    joblib.dump(_bundle_payload(bundle, compact)[0], buffer)
+    return buffer.getvalue()
+
+def deserialize_bundle(serialized: bytes, version: Optional[str] = None,
+                       trained_at: Optional[str] = None) -> ModelBundle:
+    """Modèle tel que le relit load_bundle (forêt plate comprise), depuis serialize_bundle"""
+    data = joblib.load(io.BytesIO(serialized))
+    return ModelBundle(
+        vectorizer=data['vectorizer'],
+        classifier=data['classifier'],
+        label_encoder=data['label_encoder'],
+        version=version,
+        trained_at=trained_at
+    )
+
+def _prune_bundles(current: str):
+    """Supprime les plus anciennes versions au-delà de BUNDLE_KEEP_VERSIONS.
+
+    Un processus qui projette encore un fichier supprimé garde ses pages :
+    la suppression ne libère l'espace qu'à la fin de la projection.
+    """
+    files = [
+        os.path.join(Config.BUNDLE_DIR, name)
+        for name in os.listdir(Config.BUNDLE_DIR)
+        if name.endswith('.joblib')
+    ]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for path in files[max(Config.BUNDLE_KEEP_VERSIONS, 1):]:
+        if os.path.basename(path) != current:
+            os.remove(path)
+
+def save_bundle(bundle: ModelBundle) -> Dict[str, Any]:
+    """Sauvegarde le modèle dans un fichier unique versionné, puis le désigne dans le manifeste.
+
+    Le fichier est un pickle joblib non compressé : les tableaux numpy (arbres,
+    idf...) y sont stockés alignés et se chargent avec mmap_mode. Le manifeste,
+    remplacé en dernier, joue le rôle de pointeur vers la version courante ;
+    il est retourné.
+    """
+    # Chaque sauvegarde est un entraînement : le compteur suit le manifeste, quel
+    # que soit le processus qui a entraîné le modèle
+    previous = read_manifest() or {}
+    payload, classifier_kind = _bundle_payload(bundle)
+    filename = f"{bundle.version}.joblib"
+    path = os.path.join(Config.BUNDLE_DIR, filename)
+    _atomic_write(path, lambda f: joblib.dump(payload, f))
+
+    # Somme de contrôle calculée une fois, à l'écriture ; au chargement, seule la
+    # taille est comparée (un fichier tronqué est détecté sans relire le fichier),
+    # le SHA-256 n'étant recalculé qu'avec BUNDLE_VERIFY_CHECKSUM
+    manifest = bundle.get_manifest()
+    manifest.update({
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'bundle_file': filename,
+        'bundle_bytes': os.path.getsize(path),
+        'classifier_kind': classifier_kind,
+        'checksums': {'bundle': _file_checksum(path)},
+        'training_count': previous.get('training_count', 0) + 1
+    })
+    _atomic_write(
+        Config.MANIFEST_PATH,
+        lambda f: f.write(json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    )
+    _prune_bundles(filename)
+    logger.info(f"Modèle {bundle.version} sauvegardé ({classifier_kind})")
+    return manifest
+
+def read_manifest() -> Optional[Dict[str, Any]]:
+    """Lit le manifeste du modèle sauvegardé, s'il existe"""
+    try:
+        with open(Config.MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def bundle_exists() -> bool:
+    """Indique si un modèle sauvegardé est disponible"""
+    manifest = read_manifest()
+    if manifest and manifest.get('bundle_file'):
+        return os.path.exists(os.path.join(Config.BUNDLE_DIR, manifest['bundle_file']))
+    return all(os.path.exists(path) for path in _artifact_paths().values())
+
+def _load_single_file(manifest: Dict[str, Any]) -> ModelBundle:
+    """Charge un modèle au format à fichier unique, tableaux projetés en mémoire"""
+    path = os.path.join(Config.BUNDLE_DIR, manifest['bundle_file'])
+    if not os.path.exists(path):
+        raise ModelBundleError(f"Fichier du modèle introuvable: {path}")
+    if manifest.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+        raise ModelBundleError(f"Format de modèle {manifest['format_version']} non supporté")
+
+    expected_size = manifest.get('bundle_bytes')
+    if expected_size is not None and os.path.getsize(path) != expected_size:
+        raise ModelBundleError(f"Fichier '{path}' tronqué ou remplacé (taille différente du manifeste)")
+    expected = manifest.get('checksums', {}).get('bundle')
+    if Config.BUNDLE_VERIFY_CHECKSUM and expected and _file_checksum(path) != expected:
+        raise ModelBundleError(f"Fichier '{path}' incohérent avec le manifeste {manifest.get('version')}")
+
+    # Lecture seule partagée : seuls les tableaux de la forêt plate sont projetés ;
+    # un classifieur incrémental doit rester modifiable par partial_fit
+    mmap_mode = 'r' if manifest.get('classifier_kind') == 'flat_forest' else None
+    data = joblib.load(path, mmap_mode=mmap_mode)
+
+    return ModelBundle(
+        vectorizer=data['vectorizer'],
+        classifier=data['classifier'],
+        label_encoder=data['label_encoder'],
+        version=manifest.get('version'),
+        trained_at=manifest.get('trained_at')
+    )
+
+def load_bundle() -> ModelBundle:
+    """Charge le modèle sauvegardé en vérifiant sa cohérence"""
+    manifest = read_manifest()
+    if manifest and manifest.get('bundle_file'):
+        return _load_single_file(manifest)
+
+    paths = _artifact_paths()
+    if not all(os.path.exists(path) for path in paths.values()):
+        raise ModelBundleError("Fichiers du modèle introuvables")
+
+    if manifest:
+        for name, path in paths.items():
+            expected = manifest.get('checksums', {}).get(name)
+            if Config.BUNDLE_VERIFY_CHECKSUM and expected and _file_checksum(path) != expected:
+                raise ModelBundleError(
+                    f"Fichier '{path}' incohérent avec le manifeste {manifest.get('version')}"
+                )
+        version, trained_at = manifest.get('version'), manifest.get('trained_at')
+    else:
+        # Ancien format sans manifeste : la version est dérivée de la date du fichier
+        version = datetime.fromtimestamp(
+            os.path.getmtime(Config.MODEL_PATH)
+        ).strftime('%Y%m%d%H%M%S%f')
+        trained_at = None
+
+    return ModelBundle(
+        vectorizer=joblib.load(paths['vectorizer']),
+        classifier=joblib.load(paths['classifier']),
+        label_encoder=joblib.load(paths['label_encoder']),
+        version=version,
+        trained_at=trained_at
+    )
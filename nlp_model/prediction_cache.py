@@ -0,0 +1,85 @@
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    def __init__(self, max_size: int = Config.PREDICTION_CACHE_SIZE,
+                 ttl: float = Config.PREDICTION_CACHE_TTL):
+        """Cache LRU avec expiration des prédictions, indexé par texte prétraité et version du modèle"""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(model_version: str, processed_text: str) -> str:
+        """Construit la clé de cache ; changer de modèle change toutes les clés"""
+        digest = hashlib.sha1(processed_text.encode('utf-8')).hexdigest()
+        return f"{model_version}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne une copie de la prédiction en cache, ou None"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, prediction = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Copie pour que l'appelant puisse enrichir la réponse sans altérer le cache
+        return copy.deepcopy(prediction)
+
+    def put(self, key: str, prediction: Dict[str, Any]):
+        """Ajoute une prédiction, en évinçant la moins récemment utilisée si nécessaire"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(prediction))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from model_bundle import ModelBundle
+from text_preprocessor import TextPreprocessor
+
+logger = logging.getLogger(__name__)
+
+# Champs lus pour décider si un ticket doit être reclassé
+RECLASSIFY_FIELDS = ['titre', 'description', 'categorie_modifiee', 'model_version', 'text_hash']
+
+def text_hash(processed_text: str) -> str:
+    """Empreinte du texte prétraité, enregistrée avec la prédiction"""
+    return hashlib.sha1(processed_text.encode('utf-8')).hexdigest()
+
+class RateLimiter:
+    def __init__(self, max_per_second: float):
+        """Limite le débit moyen d'opérations Firestore (lectures et écritures)"""
+        self.max_per_second = max_per_second
+        self._started = time.monotonic()
+        self._operations = 0
+
+    def consume(self, operations: int):
+        """Comptabilise des opérations et attend si le débit dépasse la limite"""
+        self._operations += operations
+        if self.max_per_second <= 0:
+            return
+        ahead = self._operations / self.max_per_second - (time.monotonic() - self._started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+def load_checkpoint(path: str = Config.RECLASSIFY_CHECKPOINT_PATH) -> Optional[Dict[str, Any]]:
+    """Charge le point de reprise de la dernière reclassification"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_checkpoint(checkpoint: Dict[str, Any], path: str = Config.RECLASSIFY_CHECKPOINT_PATH):
+    """Sauvegarde le point de reprise (écriture atomique)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def _new_checkpoint(model_version: str) -> Dict[str, Any]:
+    return {
+        'model_version': model_version,
+        'start_after': None,
+        'completed': False,
+        'started_at': datetime.now().isoformat(),
+        'finished_at': None,
+        'scanned': 0,
+        'updated': 0,
+        'skipped_unchanged': 0,
+        'skipped_manual': 0
+    }
+
+def _plan_updates(tickets: List[Dict[str, Any]], bundle: ModelBundle,
+                  preprocessor: TextPreprocessor, checkpoint: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Prédit les tickets dont le texte ou la version du modèle ont changé"""
+    candidates = []
+    for ticket in tickets:
+        if ticket.get('categorie_modifiee'):
+            # Catégorie corrigée par un humain : ne jamais l'écraser
+            checkpoint['skipped_manual'] += 1
+            continue
+        candidates.append(ticket)
+
+    if not candidates:
+        return {}
+
+    texts = [f"{ticket.get('titre', '')} {ticket.get('description', '')}" for ticket in candidates]
+    processed_texts = preprocessor.preprocess_batch(texts)
+
+    to_score, hashes = [], []
+    for ticket, processed in zip(candidates, processed_texts):
+        digest = text_hash(processed)
+        if ticket.get('model_version') == bundle.version and ticket.get('text_hash') == digest:
+            checkpoint['skipped_unchanged'] += 1
+            continue
+        to_score.append((ticket, processed))
+        hashes.append(digest)
+
+    if not to_score:
+        return {}
+
+    # Une seule passe du modèle pour tout le lot
+    predictions = bundle.engine.predict([processed for _, processed in to_score])
+    updates = {}
+    for (ticket, _), digest, prediction in zip(to_score, hashes, predictions):
+        updates[ticket['id']] = {
+            'categorie': prediction['predicted_category'],
+            'confidence': prediction['confidence'],
+            'needs_human_review': prediction['needs_human_review'],
+            'keywords': prediction['keywords'],
+            'model_version': bundle.version,
+            'text_hash': digest
+        }
+    return updates
+
+def run_reclassification(connector, bundle: ModelBundle,
+                         preprocessor: TextPreprocessor = None,
+                         chunk_size: int = Config.RECLASSIFY_CHUNK_SIZE,
+                         max_ops_per_second: float = Config.RECLASSIFY_MAX_OPS_PER_SECOND,
+                         checkpoint_path: str = Config.RECLASSIFY_CHECKPOINT_PATH,
+                         on_chunk: Callable[[Dict[str, Any]], Any] = None) -> Dict[str, Any]:
+    """Reclasse les tickets stockés avec le modèle fourni, par lots et avec reprise.
+
+    Les tickets sont parcourus par identifiant ; après chaque lot écrit, le dernier
+    identifiant est enregistré dans le point de reprise. Un job interrompu reprend
+    où il s'était arrêté tant que la version du modèle n'a pas changé.
+    """
+    preprocessor = preprocessor or TextPreprocessor()
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint and checkpoint.get('model_version') == bundle.version:
+        if checkpoint.get('completed'):
+            logger.info(f"Tickets déjà reclassés avec le modèle {bundle.version}")
+            return checkpoint
+        logger.info(f"Reprise de la reclassification après le ticket {checkpoint['start_after']}")
+    else:
+        checkpoint = _new_checkpoint(bundle.version)
+
+    limiter = RateLimiter(max_ops_per_second)
+    while True:
+        page = connector.get_tickets_page(chunk_size, checkpoint['start_after'], RECLASSIFY_FIELDS)
+        tickets = page['tickets']
+        limiter.consume(len(tickets))
+        if not tickets:
+            break
+
+        updates = _plan_updates(tickets, bundle, preprocessor, checkpoint)
+        if updates:
+            connector.update_tickets(updates)
+            limiter.consume(len(updates))
+
+        checkpoint['scanned'] += len(tickets)
+        checkpoint['updated'] += len(updates)
+        checkpoint['start_after'] = tickets[-1]['id']
+        save_checkpoint(checkpoint, checkpoint_path)
+        if on_chunk:
+            on_chunk(checkpoint)
+
+        if page['next_start_after'] is None:
+            break
+
+    checkpoint['completed'] = True
+    checkpoint['finished_at'] = datetime.now().isoformat()
+    save_checkpoint(checkpoint, checkpoint_path)
+    logger.info(f"Reclassification terminée avec le modèle {bundle.version}: "
+                f"{checkpoint['updated']} mis à jour sur {checkpoint['scanned']} tickets")
+    return checkpoint
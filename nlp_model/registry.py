@@ -0,0 +1,33 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Un seul client de stockage et un seul classifieur par processus : l'API, le
+# planificateur et les scripts partagent le même modèle en mémoire
+_connector = None
+_classifier = None
+_connector_lock = threading.Lock()
+_classifier_lock = threading.Lock()
+
+def get_firebase_connector():
+    """Retourne le client de stockage du processus (Config.STORAGE_BACKEND), créé au premier appel"""
+    global _connector
+    with _connector_lock:
+        if _connector is None:
+            from storage import create_storage
+            _connector = create_storage()
+        return _connector
+
+def get_classifier(auto_load: bool = True):
+    """Retourne le classifieur du processus, créé au premier appel.
+
+    auto_load n'a d'effet qu'à la création : False laisse l'appelant charger
+    le modèle quand il le souhaite (load_or_create_model).
+    """
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            from ticket_classifier import TicketClassifier
+            _classifier = TicketClassifier(auto_load=auto_load, firebase_connector=get_firebase_connector())
+        return _classifier
@@ -7,16 +7,20 @@ import os
 import sys
 import logging
 import argparse
+import importlib.util
 import subprocess
 import time
 from pathlib import Path
 
+# Origine du rapport de démarrage
+STARTED = time.perf_counter()
+
 # Ajouter le répertoire courant au path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Les modules lourds (sklearn, pandas, firebase_admin, fastapi) sont importés
+# par les fonctions des modes qui en ont besoin
 from config import Config
-from ticket_classifier import TicketClassifier
-from training_scheduler import TrainingScheduler
 
 # Configuration du logging
 logging.basicConfig(
@@ -37,21 +41,28 @@ def create_directories():
         Path(directory).mkdir(exist_ok=True)
         logger.info(f"Dossier créé/vérifié: {directory}")
 
-def check_dependencies():
-    """Vérifie que toutes les dépendances sont installées"""
-    try:
-        import sklearn
-        import pandas
-        import numpy
-        import firebase_admin
-        import fastapi
-        import uvicorn
-        logger.info("Toutes les dépendances sont installées")
-        return True
-    except ImportError as e:
-        logger.error(f"Dépendance manquante: {e}")
+# Dépendances nécessaires à chaque mode (firebase_admin seulement si Firestore est le stockage)
+MODEL_DEPENDENCIES = ['sklearn', 'pandas', 'numpy', 'joblib'] + (
+    ['firebase_admin'] if Config.STORAGE_BACKEND == 'firebase' else []
+)
+MODE_DEPENDENCIES = {
+    'api': ['fastapi', 'uvicorn'] + MODEL_DEPENDENCIES,
+    'scheduler': ['schedule'] + MODEL_DEPENDENCIES,
+    'test': MODEL_DEPENDENCIES,
+    'init': MODEL_DEPENDENCIES,
+    'full': ['fastapi', 'uvicorn', 'schedule'] + MODEL_DEPENDENCIES
+}
+
+def check_dependencies(mode: str = 'full'):
+    """Vérifie que les dépendances du mode sont installées (sans les importer)"""
+    missing = [name for name in MODE_DEPENDENCIES[mode] if importlib.util.find_spec(name) is None]
+    if missing:
+        logger.error(f"Dépendances manquantes: {', '.join(missing)}")
         logger.info("Installez les dépendances avec: pip install -r requirements.txt")
         return False
+    
+    logger.info(f"Dépendances du mode {mode} installées")
+    return True
 
 def start_api_server():
     """Lance le serveur API"""
@@ -72,6 +83,7 @@ def start_training_scheduler():
     """Lance le planificateur d'entraînement"""
     logger.info("Démarrage du planificateur d'entraînement...")
     try:
+        from training_scheduler import TrainingScheduler
         scheduler = TrainingScheduler()
         scheduler.run_scheduler()
     except Exception as e:
@@ -81,7 +93,8 @@ def test_model():
     """Teste le modèle avec des exemples"""
     logger.info("Test du modèle...")
     try:
-        classifier = TicketClassifier()
+        from registry import get_classifier
+        classifier = get_classifier()
         
         test_cases = [
             "Mon ordinateur ne démarre plus",
@@ -106,7 +119,8 @@ def initialize_model():
     """Initialise le modèle avec des données d'exemple"""
     logger.info("Initialisation du modèle...")
     try:
-        classifier = TicketClassifier()
+        from registry import get_classifier
+        classifier = get_classifier()
         logger.info("Modèle initialisé avec succès")
         
         # Afficher les informations du modèle
@@ -132,9 +146,11 @@ def main():
     create_directories()
     
     # Vérifier les dépendances
-    if not check_dependencies():
+    if not check_dependencies(args.mode):
         sys.exit(1)
     
+    logger.info(f"Vérifications de démarrage terminées en {time.perf_counter() - STARTED:.3f}s")
+    
     logger.info("=== Système NLP de Classification de Tickets ===")
     logger.info(f"Mode: {args.mode}")
     logger.info(f"API Host: {args.host}")
@@ -0,0 +1,303 @@
+import argparse
+import logging
+import os
+import sqlite3
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from config import Config
+from storage import TRAINING_COLUMNS, TicketStorage
+from ticket_store import decode_ticket, encode_ticket
+
+logger = logging.getLogger(__name__)
+
+def _date_key(value: Any) -> Optional[str]:
+    """Date en UTC à largeur fixe : l'ordre des chaînes est celui des dates (colonnes indexées)"""
+    if not isinstance(value, datetime):
+        return None
+    # Date naïve : heure locale, comme le fait Firestore à l'écriture
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')
+
+class SQLiteTicketStorage(TicketStorage):
+    def __init__(self, path: str = Config.SQLITE_STORAGE_PATH):
+        """Stockage complet sur disque local (SQLite), sans Firebase.
+
+        Chaque ticket est conservé en JSON ; la catégorie et la date de
+        soumission sont recopiées dans des colonnes indexées pour que les
+        comptages, l'entraînement incrémental et les feedbacks ne parcourent
+        que les lignes concernées.
+        """
+        self.path = path
+        self.connected = True
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._create_schema()
+        logger.info(f"Stockage SQLite ouvert: {path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par opération : le stockage est utilisé depuis plusieurs threads
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+    def _create_schema(self):
+        with closing(self._connect()) as connection, connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS tickets (
+                    id TEXT PRIMARY KEY,
+                    categorie TEXT,
+                    date_soumission TEXT,
+                    data TEXT NOT NULL
+                )
+            ''')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_tickets_date ON tickets (date_soumission)')
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_tickets_categorie ON tickets (categorie)')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS prediction_feedback (
+                    id TEXT PRIMARY KEY,
+                    ticket_id TEXT NOT NULL,
+                    feedback_date TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            ''')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_feedback_date ON prediction_feedback (feedback_date)'
+            )
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS model_metadata (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            ''')
+
+    def _ticket_row(self, ticket: Dict[str, Any]):
+        return (ticket['id'], ticket.get('categorie'), _date_key(ticket.get('dateSoumission')),
+                encode_ticket(ticket))
+
+    def upsert_tickets(self, tickets: Iterable[Dict[str, Any]]) -> int:
+        """Crée ou remplace des tickets (avec leur identifiant) dans une seule transaction"""
+        rows = [self._ticket_row(ticket) for ticket in tickets]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO tickets (id, categorie, date_soumission, data) VALUES (?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def get_all_tickets(self) -> List[Dict[str, Any]]:
+        """Retourne tous les tickets"""
+        with closing(self._connect()) as connection:
+            return [decode_ticket(row[0]) for row in connection.execute('SELECT data FROM tickets ORDER BY id')]
+
+    def get_tickets_page(self, limit: int, start_after: Optional[str] = None,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Page de tickets ordonnée par identifiant (parcours de la clé primaire)"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                'SELECT data FROM tickets WHERE id > ? ORDER BY id LIMIT ?',
+                (start_after or '', limit + 1)
+            ).fetchall()
+        page = [self._project(decode_ticket(row[0]), fields) for row in rows]
+
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {
+            'tickets': page,
+            'count': len(page),
+            'next_start_after': page[-1]['id'] if has_more else None
+        }
+
+    def iter_tickets(self, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les tickets par pages de 500, sans garder de transaction ouverte entre deux pages"""
+        start_after = None
+        while True:
+            page = self.get_tickets_page(500, start_after, fields)
+            yield from page['tickets']
+            start_after = page['next_start_after']
+            if start_after is None:
+                return
+
+    def get_tickets_for_training(self) -> pd.DataFrame:
+        """Tickets catégorisés au format d'entraînement (index sur la catégorie)"""
+        with closing(self._connect()) as connection:
+            tickets = [decode_ticket(row[0]) for row in connection.execute(
+                "SELECT data FROM tickets WHERE categorie IS NOT NULL AND categorie != ''"
+            )]
+        df = self._tickets_to_training_frame(tickets)
+        logger.info(f"Données d'entraînement préparées: {len(df)} échantillons")
+        return df
+
+    def get_tickets_for_training_since(self, since: datetime) -> pd.DataFrame:
+        """Tickets soumis après une date (index sur la date de soumission)"""
+        with closing(self._connect()) as connection:
+            tickets = [decode_ticket(row[0]) for row in connection.execute(
+                'SELECT data FROM tickets WHERE date_soumission > ?', (_date_key(since),)
+            )]
+        df = self._tickets_to_training_frame(tickets)
+        logger.info(f"{len(df)} nouveaux tickets depuis {since.isoformat()}")
+        return df
+
+    def get_feedback_corrections_since(self, since: datetime) -> pd.DataFrame:
+        """Feedbacks postérieurs à une date, joints au texte des tickets concernés"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                'SELECT f.data, t.data FROM prediction_feedback f '
+                'JOIN tickets t ON t.id = f.ticket_id WHERE f.feedback_date > ? ORDER BY f.feedback_date',
+                (_date_key(since),)
+            ).fetchall()
+
+        corrections = []
+        for feedback_data, ticket_data in rows:
+            feedback, ticket = decode_ticket(feedback_data), decode_ticket(ticket_data)
+            if feedback.get('actual_category'):
+                corrections.append({
+                    'text': f"{ticket.get('titre', '')} {ticket.get('description', '')}",
+                    'category': feedback['actual_category'],
+                    'ticket_id': feedback['ticket_id'],
+                    'date_created': feedback['feedback_date']
+                })
+        logger.info(f"{len(corrections)} feedbacks depuis {since.isoformat()}")
+        return pd.DataFrame(corrections, columns=TRAINING_COLUMNS)
+
+    def save_prediction_feedback(self, ticket_id: str, predicted_category: str,
+                                 actual_category: str, confidence: float):
+        """Enregistre le feedback d'une prédiction"""
+        now = datetime.now(timezone.utc)
+        feedback_data = {
+            'id': uuid.uuid4().hex,
+            'ticket_id': ticket_id,
+            'predicted_category': predicted_category,
+            'actual_category': actual_category,
+            'confidence': confidence,
+            'feedback_date': now,
+            'needs_retraining': predicted_category != actual_category
+        }
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    'INSERT INTO prediction_feedback (id, ticket_id, feedback_date, data) VALUES (?, ?, ?, ?)',
+                    (feedback_data['id'], ticket_id, _date_key(now), encode_ticket(feedback_data))
+                )
+            logger.info(f"Feedback sauvegardé pour le ticket {ticket_id}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde du feedback: {e}")
+
+    def _update_fields(self, connection: sqlite3.Connection, ticket_id: str, fields: Dict[str, Any]) -> bool:
+        """Fusionne des champs dans un ticket existant (dans la transaction de l'appelant)"""
+        row = connection.execute('SELECT data FROM tickets WHERE id = ?', (ticket_id,)).fetchone()
+        if row is None:
+            return False
+        ticket = decode_ticket(row[0])
+        ticket.update(fields)
+        connection.execute(
+            'UPDATE tickets SET categorie = ?, date_soumission = ?, data = ? WHERE id = ?',
+            self._ticket_row(ticket)[1:] + (ticket_id,)
+        )
+        return True
+
+    def update_ticket_category(self, ticket_id: str, new_category: str):
+        """Met à jour la catégorie d'un ticket"""
+        try:
+            with closing(self._connect()) as connection, connection:
+                # Verrou d'écriture dès la lecture : deux mises à jour concurrentes ne s'écrasent pas
+                connection.execute('BEGIN IMMEDIATE')
+                updated = self._update_fields(connection, ticket_id, {
+                    'categorie': new_category,
+                    'categorie_modifiee': True,
+                    'date_modification': datetime.now(timezone.utc)
+                })
+            if updated:
+                logger.info(f"Catégorie mise à jour pour le ticket {ticket_id}")
+            else:
+                logger.error(f"Ticket {ticket_id} introuvable")
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour de la catégorie: {e}")
+
+    def update_tickets(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Met à jour plusieurs tickets dans une seule transaction ; retourne le nombre écrit"""
+        now = datetime.now(timezone.utc)
+        with closing(self._connect()) as connection, connection:
+            connection.execute('BEGIN IMMEDIATE')
+            written = sum(
+                self._update_fields(connection, ticket_id, {**fields, 'date_reclassification': now})
+                for ticket_id, fields in updates.items()
+            )
+        logger.info(f"{written} tickets mis à jour")
+        return written
+
+    def save_model_metadata(self, metadata: Dict[str, Any]):
+        """Enregistre les métadonnées d'un modèle entraîné"""
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    'INSERT INTO model_metadata (created_at, data) VALUES (?, ?)',
+                    (datetime.now().isoformat(), encode_ticket(metadata))
+                )
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde des métadonnées du modèle: {e}")
+
+    def get_prediction_feedback(self) -> pd.DataFrame:
+        """Retourne tous les feedbacks de prédiction"""
+        with closing(self._connect()) as connection:
+            return pd.DataFrame([
+                decode_ticket(row[0])
+                for row in connection.execute('SELECT data FROM prediction_feedback ORDER BY feedback_date')
+            ])
+
+    def get_tickets_count(self) -> int:
+        """Nombre total de tickets (-1 en cas d'erreur)"""
+        try:
+            with closing(self._connect()) as connection:
+                return connection.execute('SELECT COUNT(*) FROM tickets').fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des tickets: {e}")
+            return -1
+
+    def count_tickets_since(self, since: datetime) -> int:
+        """Nombre de tickets soumis après une date (index sur la date, -1 en cas d'erreur)"""
+        try:
+            with closing(self._connect()) as connection:
+                return connection.execute(
+                    'SELECT COUNT(*) FROM tickets WHERE date_soumission > ?', (_date_key(since),)
+                ).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des nouveaux tickets: {e}")
+            return -1
+
+def main():
+    """Alimente le stockage SQLite depuis Firestore ou avec des tickets synthétiques"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Import de tickets dans le stockage SQLite")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--from-firebase', action='store_true', help="Copie tous les tickets de Firestore")
+    source.add_argument('--synthetic', type=int, metavar='N', help="Génère N tickets synthétiques")
+    parser.add_argument('--path', default=Config.SQLITE_STORAGE_PATH, help="Fichier SQLite")
+    args = parser.parse_args()
+
+    storage = SQLiteTicketStorage(args.path)
+    if args.synthetic:
+        from synthetic_data import generate_tickets
+        imported = storage.upsert_tickets(generate_tickets(args.synthetic))
+    else:
+        from firebase_connector import FirebaseConnector
+        connector = FirebaseConnector()
+        if not connector.connected:
+            raise SystemExit("Firestore injoignable : import annulé")
+        imported, chunk = 0, []
+        for ticket in connector.iter_tickets():
+            chunk.append(ticket)
+            if len(chunk) >= 1000:
+                imported += storage.upsert_tickets(chunk)
+                chunk = []
+        imported += storage.upsert_tickets(chunk)
+        connector.close()
+
+    logger.info(f"{imported} tickets importés dans {args.path} ({storage.get_tickets_count()} au total)")
+
+if __name__ == "__main__":
+    main()
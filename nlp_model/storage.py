@@ -0,0 +1,145 @@
+import importlib
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Backends de stockage : nom -> (module, classe), importés à la demande pour
+# ne charger firebase_admin que si Firestore est utilisé
+STORAGE_BACKENDS = {
+    'firebase': ('firebase_connector', 'FirebaseConnector'),
+    'sqlite': ('sqlite_storage', 'SQLiteTicketStorage'),
+    'memory': ('memory_connector', 'InMemoryConnector')
+}
+
+TRAINING_COLUMNS = ['text', 'category', 'ticket_id', 'date_created']
+
+class TicketStorage(ABC):
+    """Stockage des tickets, feedbacks et métadonnées de modèles.
+
+    Toute l'application (API, entraînement, reclassification, planificateur)
+    passe par cette interface ; le backend est choisi par Config.STORAGE_BACKEND.
+    Les dates passées aux méthodes `*_since` portent un fuseau horaire.
+    """
+    # True quand le stockage répond ; False pour Firestore en mode local (tickets d'exemple)
+    connected = False
+    # Copie locale et écritures différées, propres à Firestore
+    ticket_store = None
+    write_buffer = None
+
+    @abstractmethod
+    def get_all_tickets(self) -> List[Dict[str, Any]]:
+        """Retourne tous les tickets"""
+
+    @abstractmethod
+    def get_tickets_page(self, limit: int, start_after: Optional[str] = None,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Page de tickets ordonnée par identifiant : {'tickets', 'count', 'next_start_after'}.
+
+        `next_start_after` est l'identifiant à passer pour obtenir la page suivante,
+        None quand tous les tickets ont été parcourus.
+        """
+
+    @abstractmethod
+    def iter_tickets(self, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les tickets sans les accumuler en mémoire"""
+
+    @abstractmethod
+    def get_tickets_for_training_since(self, since: datetime) -> pd.DataFrame:
+        """Tickets soumis après une date, au format d'entraînement"""
+
+    @abstractmethod
+    def get_feedback_corrections_since(self, since: datetime) -> pd.DataFrame:
+        """Feedbacks postérieurs à une date avec le texte des tickets concernés"""
+
+    @abstractmethod
+    def save_prediction_feedback(self, ticket_id: str, predicted_category: str,
+                                 actual_category: str, confidence: float):
+        """Enregistre le feedback d'une prédiction"""
+
+    @abstractmethod
+    def update_ticket_category(self, ticket_id: str, new_category: str):
+        """Met à jour la catégorie d'un ticket (correction humaine)"""
+
+    @abstractmethod
+    def update_tickets(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Met à jour les champs de plusieurs tickets ; retourne le nombre écrit"""
+
+    @abstractmethod
+    def save_model_metadata(self, metadata: Dict[str, Any]):
+        """Enregistre les métadonnées d'un modèle entraîné"""
+
+    @abstractmethod
+    def get_prediction_feedback(self) -> pd.DataFrame:
+        """Retourne tous les feedbacks de prédiction"""
+
+    @abstractmethod
+    def get_tickets_count(self) -> int:
+        """Nombre total de tickets (-1 en cas d'erreur)"""
+
+    @abstractmethod
+    def count_tickets_since(self, since: datetime) -> int:
+        """Nombre de tickets soumis après une date (-1 en cas d'erreur)"""
+
+    def get_tickets_for_training(self) -> pd.DataFrame:
+        """Tickets catégorisés au format d'entraînement (texte, catégorie)"""
+        df = self._tickets_to_training_frame(self.get_all_tickets())
+        logger.info(f"Données d'entraînement préparées: {len(df)} échantillons")
+        return df
+
+    def sync_ticket_store(self, force_full: bool = False) -> Dict[str, Any]:
+        """Synchronise la copie locale des tickets (sans objet hors Firestore)"""
+        return {'full': False, 'changed': 0, 'high_water_mark': None}
+
+    def flush_writes(self) -> int:
+        """Envoie les écritures différées en attente ; retourne leur nombre"""
+        return 0
+
+    def close(self):
+        """Libère les ressources du stockage"""
+
+    def _project(self, ticket: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        """Ne garde que les champs demandés (l'identifiant est toujours inclus)"""
+        if not fields:
+            return ticket
+        projected = {field: ticket[field] for field in fields if field in ticket}
+        projected['id'] = ticket['id']
+        return projected
+
+    def _tickets_to_training_frame(self, tickets: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Convertit des tickets en échantillons d'entraînement (texte, catégorie)"""
+        training_data = []
+        for ticket in tickets:
+            if 'titre' in ticket and 'description' in ticket and 'categorie' in ticket:
+                # Combiner titre et description
+                text = f"{ticket['titre']} {ticket['description']}"
+
+                training_data.append({
+                    'text': text,
+                    'category': ticket['categorie'],
+                    'ticket_id': ticket['id'],
+                    'date_created': ticket.get('dateSoumission', datetime.now())
+                })
+
+        return pd.DataFrame(training_data, columns=TRAINING_COLUMNS)
+
+def create_storage(backend: Optional[str] = None, buffered_writes: bool = True) -> TicketStorage:
+    """Crée le stockage du backend choisi, Config.STORAGE_BACKEND par défaut.
+
+    buffered_writes=False désactive l'envoi différé des écritures (Firestore),
+    pour les processus de job qui ne doivent pas envoyer celles de l'API.
+    """
+    backend = backend or Config.STORAGE_BACKEND
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Stockage inconnu: {backend} (disponibles: {', '.join(STORAGE_BACKENDS)})")
+    module_name, class_name = STORAGE_BACKENDS[backend]
+    storage_class = getattr(importlib.import_module(module_name), class_name)
+    if backend == 'firebase':
+        return storage_class(buffered_writes=buffered_writes)
+    return storage_class()
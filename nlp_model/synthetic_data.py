@@ -0,0 +1,125 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pandas as pd
+
+# Sujets et formulations par catégorie, en français et en anglais
+CATEGORY_PHRASES = {
+    "Support Technique": {
+        'fr': ["mon ordinateur ne démarre plus", "l'imprimante n'imprime rien", "écran bleu au démarrage",
+               "le poste est très lent", "installation du pilote impossible", "le disque dur est plein",
+               "la mise à jour windows échoue", "le clavier ne répond plus"],
+        'en': ["my computer will not boot", "the printer prints nothing", "blue screen at startup",
+               "the laptop is very slow", "cannot install the driver", "hard drive is full",
+               "windows update keeps failing", "keyboard stopped responding"]
+    },
+    "Assistance Générale": {
+        'fr': ["j'ai besoin d'aide pour le portail rh", "pouvez-vous m'expliquer la procédure",
+               "à qui m'adresser pour ce dossier", "besoin d'un accompagnement pour démarrer",
+               "où trouver la documentation interne", "aide pour remplir le formulaire"],
+        'en': ["i need help with the hr portal", "could you explain the procedure",
+               "who should i contact about this file", "need guidance to get started",
+               "where can i find the internal documentation", "help filling in the form"]
+    },
+    "Demande de Fonctionnalité": {
+        'fr': ["je voudrais exporter les données en excel", "serait-il possible d'ajouter un filtre",
+               "ajouter un mode sombre", "proposer un bouton de tri par date",
+               "pouvoir partager un tableau de bord", "suggestion d'amélioration de l'interface"],
+        'en': ["i would like to export data to excel", "could you add a filter option",
+               "please add a dark mode", "add a sort by date button",
+               "allow sharing a dashboard", "suggestion to improve the interface"]
+    },
+    "Signalement de Bug": {
+        'fr': ["l'application plante au clic sur sauvegarder", "message d'exception inattendu",
+               "le bouton valider ne fait rien", "la page reste blanche après connexion",
+               "les montants affichés sont faux", "plantage à l'ouverture du fichier"],
+        'en': ["the app crashes when clicking save", "unexpected exception message",
+               "the submit button does nothing", "blank page after login",
+               "displayed amounts are wrong", "crash when opening the file"]
+    },
+    "Question sur l'Utilisation": {
+        'fr': ["comment changer mon mot de passe", "comment retrouver mes anciennes demandes",
+               "comment modifier mon profil", "comment ajouter un collègue au projet",
+               "comment télécharger ma facture", "comment activer les notifications"],
+        'en': ["how do i change my password", "how can i find my previous requests",
+               "how to edit my profile", "how to add a colleague to the project",
+               "how do i download my invoice", "how to enable notifications"]
+    },
+    "Problème d'Accès / Connexion": {
+        'fr': ["je ne peux pas me connecter", "compte bloqué après plusieurs essais",
+               "le vpn refuse la connexion", "accès refusé au dossier partagé",
+               "le code de vérification n'arrive pas", "session expirée en permanence"],
+        'en': ["i cannot log in", "account locked after several attempts",
+               "vpn refuses the connection", "access denied to the shared folder",
+               "verification code never arrives", "session keeps expiring"]
+    },
+    "Demande de Remboursement": {
+        'fr': ["je souhaite être remboursé", "prélèvement en double sur ma carte",
+               "annulation de commande et remboursement", "facturé pour un service non utilisé",
+               "remboursement de mon abonnement", "erreur de montant sur le paiement"],
+        'en': ["i would like a refund", "charged twice on my card",
+               "order cancellation and refund", "billed for a service i did not use",
+               "refund my subscription", "wrong amount on the payment"]
+    },
+    "Autre": {
+        'fr': ["message étrange à l'ouverture du logiciel", "question sans rapport avec l'informatique",
+               "signaler un problème non listé", "remarque sur l'accueil du service",
+               "information à transmettre à l'équipe", "demande diverse"],
+        'en': ["strange message when opening the software", "question unrelated to it",
+               "report an issue not listed", "feedback about the service desk",
+               "information to pass on to the team", "miscellaneous request"]
+    }
+}
+
+# Formules neutres communes à toutes les catégories
+FILLERS = {
+    'fr': ["bonjour", "merci d'avance", "depuis ce matin", "c'est urgent", "cordialement",
+           "cela bloque mon travail", "plusieurs collègues sont concernés", "je reste disponible"],
+    'en': ["hello", "thanks in advance", "since this morning", "this is urgent", "regards",
+           "this blocks my work", "several colleagues are affected", "i remain available"]
+}
+
+STATUSES = ['Nouveau', 'En cours', 'Résolu']
+
+def generate_tickets(n: int, seed: int = 42, english_ratio: float = 0.3,
+                     ambiguity: float = 0.15) -> List[Dict[str, Any]]:
+    """Génère n tickets synthétiques au format Firestore (titre, description, categorie...).
+
+    Le résultat ne dépend que des paramètres : deux appels identiques donnent
+    le même corpus. ambiguity est la part de tickets dont la description
+    reprend une formulation d'une autre catégorie.
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORY_PHRASES)
+    # Dates UTC avec fuseau, comme celles que renvoie Firestore
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    tickets = []
+    for i in range(n):
+        category = rng.choice(categories)
+        language = 'en' if rng.random() < english_ratio else 'fr'
+        phrases = CATEGORY_PHRASES[category][language]
+        parts = [rng.choice(FILLERS[language]), rng.choice(phrases)]
+        if rng.random() < ambiguity:
+            parts.append(rng.choice(CATEGORY_PHRASES[rng.choice(categories)][language]))
+        parts.append(rng.choice(FILLERS[language]))
+        if rng.random() < 0.3:
+            parts.append(f"réf {rng.randint(1000, 99999)}" if language == 'fr' else f"ref {rng.randint(1000, 99999)}")
+        tickets.append({
+            'id': f"synthetic_{i:07d}",
+            'titre': rng.choice(phrases).capitalize(),
+            'description': ', '.join(parts) + '.',
+            'categorie': category,
+            'dateSoumission': start + timedelta(minutes=i),
+            'statut': rng.choice(STATUSES)
+        })
+    return tickets
+
+def generate_corpus(n: int, seed: int = 42, english_ratio: float = 0.3,
+                    ambiguity: float = 0.15) -> pd.DataFrame:
+    """Corpus d'entraînement synthétique (colonnes text, category) de n tickets"""
+    tickets = generate_tickets(n, seed, english_ratio, ambiguity)
+    return pd.DataFrame({
+        'text': [f"{ticket['titre']} {ticket['description']}" for ticket in tickets],
+        'category': [ticket['categorie'] for ticket in tickets]
+    })
@@ -138,10 +138,16 @@ def test_retrain():
     print("\n🔄 Test de réentraînement...")
     try:
         response = requests.post(f"{API_BASE_URL}/retrain")
-        if response.status_code == 200:
+        if response.status_code == 202:
             result = response.json()
-            print(f"✅ Réentraînement: {result['message']}")
-            print(f"   Nombre d'entraînements: {result['training_count']}")
+            print(f"✅ Réentraînement: {result['message']} (job {result['job_id']})")
+            
+            # Suivre l'avancement du job
+            status = requests.get(f"{API_BASE_URL}/retrain/{result['job_id']}").json()
+            while status['status'] == 'running':
+                time.sleep(1)
+                status = requests.get(f"{API_BASE_URL}/retrain/{result['job_id']}").json()
+            print(f"   Statut: {status['status']} en {status['duration_seconds']:.1f}s")
         else:
             print(f"❌ Erreur: {response.status_code}")
     except requests.exceptions.RequestException as e:
@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Stockage en mémoire sans latence : aucun test ne contacte Firestore
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+os.environ.setdefault('MEMORY_STORE_READ_LATENCY_MS', '0')
+os.environ.setdefault('MEMORY_STORE_WRITE_LATENCY_MS', '0')
+
+# Les modules de nlp_model s'importent par leur nom, comme depuis run.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from synthetic_data import generate_corpus
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Répertoire de travail jetable : models/ et data/ y sont créés"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture(scope='session')
+def training_data():
+    """Corpus synthétique français / anglais de toutes les catégories"""
+    return generate_corpus(600, seed=1)
+
+@pytest.fixture(scope='session')
+def trained_bundle(training_data):
+    """Modèle 'batch' (TF-IDF + forêt) entraîné une fois pour toute la session"""
+    from ticket_classifier import build_model_bundle
+    bundle, _, _ = build_model_bundle(training_data.copy())
+    return bundle
+
+@pytest.fixture
+def unseen_texts():
+    """Textes bruts jamais vus à l'entraînement"""
+    return generate_corpus(80, seed=2)['text'].tolist()
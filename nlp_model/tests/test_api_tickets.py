@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from memory_connector import InMemoryConnector
+
+@pytest.fixture
+def client(monkeypatch):
+    # Sans lifespan : seul le stockage est initialisé, pas le modèle
+    storage = InMemoryConnector(n_tickets=25, read_latency_ms=0, write_latency_ms=0)
+    monkeypatch.setattr(api_server, 'firebase_connector', storage)
+    return TestClient(api_server.app)
+
+def test_pages_cover_every_ticket_once(client):
+    ids, start_after = [], None
+    while True:
+        params = {'limit': 10}
+        if start_after:
+            params['start_after'] = start_after
+        page = client.get('/tickets', params=params).json()
+        assert page['count'] == len(page['tickets']) <= 10
+        ids.extend(ticket['id'] for ticket in page['tickets'])
+        start_after = page['next_start_after']
+        if start_after is None:
+            break
+        assert start_after == ids[-1]
+
+    assert len(ids) == 25
+    assert ids == sorted(set(ids))
+
+def test_last_full_page_has_no_cursor(client):
+    page = client.get('/tickets', params={'limit': 25}).json()
+    assert page['count'] == 25 and page['next_start_after'] is None
+
+def test_fields_projection(client):
+    page = client.get('/tickets', params={'limit': 3, 'fields': 'titre, categorie'}).json()
+    assert all(set(ticket) == {'id', 'titre', 'categorie'} for ticket in page['tickets'])
+
+def test_stream_returns_ndjson(client):
+    response = client.get('/tickets', params={'stream': 'true', 'fields': 'titre'})
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    tickets = [json.loads(line) for line in response.text.splitlines()]
+    assert len(tickets) == 25 and set(tickets[0]) == {'id', 'titre'}
+
+def test_limit_is_bounded(client):
+    assert client.get('/tickets', params={'limit': 0}).status_code == 422
+
+def test_storage_not_ready(monkeypatch):
+    monkeypatch.setattr(api_server, 'firebase_connector', None)
+    assert TestClient(api_server.app).get('/tickets').status_code == 503
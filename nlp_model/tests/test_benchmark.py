@@ -0,0 +1,52 @@
+import os
+
+import benchmark
+from benchmark import compare_results, run_benchmarks
+from synthetic_data import generate_corpus, generate_tickets
+
+STAGES = {'generate', 'preprocess', 'preprocess_batch', 'vectorizer_fit', 'vectorizer_transform',
+          'train_model', 'model_load', 'predict_single', 'predict_batch'}
+
+def run(stages):
+    return {'results': [{'size': 1000, 'stages': {name: {'seconds': seconds} for name, seconds in stages.items()}}]}
+
+def test_synthetic_corpus_is_deterministic():
+    assert generate_tickets(50, seed=3) == generate_tickets(50, seed=3)
+    assert generate_tickets(50, seed=3) != generate_tickets(50, seed=4)
+    corpus = generate_corpus(50, seed=3)
+    assert list(corpus.columns) == ['text', 'category'] and len(corpus) == 50
+
+def test_synthetic_tickets_use_firestore_fields():
+    tickets = generate_tickets(20)
+    assert len({ticket['id'] for ticket in tickets}) == 20
+    assert all({'titre', 'description', 'categorie', 'dateSoumission', 'statut'} <= set(ticket) for ticket in tickets)
+    dates = [ticket['dateSoumission'] for ticket in tickets]
+    assert dates == sorted(dates) and dates[0].tzinfo is not None
+
+def test_only_stages_slower_than_tolerance_are_regressions():
+    baseline = run({'train_model': 1.0, 'predict_batch': 0.10, 'model_load': 0.0})
+    current = run({'train_model': 1.1, 'predict_batch': 0.15, 'model_load': 0.5, 'generate': 9.0})
+
+    regressions = compare_results(current, baseline, tolerance=0.2)
+
+    # model_load sans durée de référence et generate absent de la référence sont ignorés
+    assert [(r['stage'], r['ratio']) for r in regressions] == [('predict_batch', 1.5)]
+
+def test_sizes_missing_from_baseline_are_ignored():
+    assert compare_results(run({'train_model': 5.0}), {'results': []}) == []
+
+def test_run_measures_every_stage(monkeypatch):
+    monkeypatch.setattr(benchmark, 'LATENCY_SAMPLES', 5)
+    monkeypatch.setattr(benchmark, 'PREDICT_BATCH_SIZE', 20)
+    monkeypatch.setattr(benchmark, 'MODEL_LOAD_REPEAT', 2)
+    cwd = os.getcwd()
+
+    results = run_benchmarks(sizes=[200], seed=1)
+
+    assert os.getcwd() == cwd
+    assert not os.path.exists('models')
+    [result] = results['results']
+    assert result['size'] == 200 and set(result['stages']) == STAGES
+    assert result['stages']['predict_single']['calls'] == 5
+    assert result['stages']['model_load']['file_bytes'] > 0
+    assert compare_results(results, results) == []
@@ -0,0 +1,31 @@
+import numpy as np
+
+from config import Config
+from model_bundle import deserialize_bundle, serialize_bundle
+from text_preprocessor import TextPreprocessor
+from ticket_classifier import build_model_bundle
+
+def served_predictions(bundle, compact, processed):
+    """Prédictions du modèle tel que l'API le charge (forêt plate compacte ou non)"""
+    return deserialize_bundle(serialize_bundle(bundle, compact)).engine.predict(processed)
+
+def labels(predictions):
+    return [prediction['predicted_category'] for prediction in predictions]
+
+def test_compact_storage_keeps_predictions(trained_bundle, unseen_texts):
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+    full = served_predictions(trained_bundle, False, processed)
+    compact = served_predictions(trained_bundle, True, processed)
+
+    assert labels(compact) == labels(full)
+    np.testing.assert_allclose([p['confidence'] for p in compact],
+                               [p['confidence'] for p in full], atol=1e-6)
+
+def test_compact_training_matches_without_leaf_cap(training_data, unseen_texts, monkeypatch):
+    # Sans borne sur les feuilles, le mode compact n'est qu'un changement de représentation
+    monkeypatch.setattr(Config, 'COMPACT_MAX_LEAF_NODES', None)
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+    full, _, _ = build_model_bundle(training_data.copy(), compact=False)
+    compact, _, _ = build_model_bundle(training_data.copy(), compact=True)
+
+    assert labels(served_predictions(compact, True, processed)) == labels(full.engine.predict(processed))
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from config import Config
+from estimators import ESTIMATOR_BACKENDS, compare_backends, make_estimator
+from model_bundle import deserialize_bundle, serialize_bundle
+from text_preprocessor import TextPreprocessor
+from ticket_classifier import build_model_bundle
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Estimateur inconnu"):
+        make_estimator(np.array([0, 1]), 'naive_bayes')
+
+def test_default_backend_comes_from_config(monkeypatch):
+    monkeypatch.setattr(Config, 'ESTIMATOR_BACKEND', 'logistic_regression')
+    assert isinstance(make_estimator(np.array([0, 0, 1, 1])), LogisticRegression)
+
+def test_svm_falls_back_when_a_category_has_one_example():
+    assert isinstance(make_estimator(np.array([0, 0, 1]), 'linear_svm'), LogisticRegression)
+
+@pytest.mark.parametrize('backend', sorted(ESTIMATOR_BACKENDS))
+def test_every_backend_serves_through_the_inference_engine(backend, training_data, unseen_texts):
+    bundle, _, _ = build_model_bundle(training_data.copy(), backend=backend)
+    served = deserialize_bundle(serialize_bundle(bundle), bundle.version)
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+
+    predictions = served.engine.predict(processed)
+
+    assert len(predictions) == len(unseen_texts)
+    for prediction in predictions:
+        assert prediction['predicted_category'] in served.engine.class_names
+        assert 0.0 <= prediction['confidence'] <= 1.0
+    probabilities = served.classifier.predict_proba(served.engine.transform(processed))
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0, atol=1e-6)
+
+def test_compare_backends_reports_each_backend(training_data):
+    results = compare_backends(training_data.copy(), backends=['logistic_regression', 'random_forest'],
+                               latency_samples=5)
+
+    assert [result['backend'] for result in results] == ['logistic_regression', 'random_forest']
+    for result in results:
+        assert result['train_samples'] + result['test_samples'] == len(training_data)
+        assert 0.0 <= result['accuracy'] <= 1.0
+        assert result['model_size_bytes'] > 0 and 'predicted' not in result
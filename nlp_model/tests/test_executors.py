@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+import executors
+from config import Config
+from executors import BoundedExecutor, ExecutorSaturatedError
+from memory_connector import InMemoryConnector
+from ticket_classifier import TicketClassifier
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor('test', max_workers=1, max_pending=1)
+    yield executor
+    executor.shutdown()
+
+def test_runs_off_the_event_loop_thread(executor):
+    async def scenario():
+        return threading.get_ident(), await executor.run(threading.get_ident)
+
+    loop_thread, worker_thread = asyncio.run(scenario())
+    assert worker_thread != loop_thread
+    assert executor.pending == 0
+
+def test_rejects_beyond_max_pending(executor):
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: None)
+        release.set()
+        return await first
+
+    assert asyncio.run(scenario()) is True
+    assert executor.get_stats() == {'max_workers': 1, 'max_pending': 1, 'pending': 0}
+
+def test_pending_is_released_on_error(executor):
+    def fail():
+        raise ValueError("échec")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+
+    asyncio.run(scenario())
+    assert executor.pending == 0
+
+@pytest.fixture
+def client(monkeypatch, trained_bundle):
+    # Sans lifespan : classifieur prêt branché directement, stockage en mémoire
+    storage = InMemoryConnector(n_tickets=0, read_latency_ms=0, write_latency_ms=0)
+    model = TicketClassifier(auto_load=False, firebase_connector=storage)
+    model.bundle = trained_bundle
+    model.ready = True
+    monkeypatch.setattr(api_server, 'firebase_connector', storage)
+    monkeypatch.setattr(api_server, 'classifier', model)
+    monkeypatch.setattr(api_server, 'micro_batcher', None)
+    return TestClient(api_server.app)
+
+def batch(size):
+    return {'tickets': [{'titre': 'Imprimante', 'description': f'bourrage papier {i}'}
+                        for i in range(size)]}
+
+def test_batch_endpoint_predicts_every_ticket(client):
+    response = client.post('/predict/batch', json=batch(3))
+
+    assert response.status_code == 200
+    assert response.json()['count'] == 3
+
+def test_batch_endpoint_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_BATCH_SIZE', 2)
+    assert client.post('/predict/batch', json=batch(3)).status_code == 413
+
+def test_saturated_inference_pool_returns_503(client, monkeypatch):
+    monkeypatch.setattr(executors.inference_executor, 'max_pending', 0)
+
+    assert client.post('/predict', json={'titre': 'VPN', 'description': 'connexion'}).status_code == 503
+    assert client.post('/predict/batch', json=batch(1)).status_code == 503
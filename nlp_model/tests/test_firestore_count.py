@@ -0,0 +1,106 @@
+import operator
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import firebase_connector
+from config import Config
+
+BASE = datetime(2026, 5, 1, 9, tzinfo=timezone.utc)
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge}
+
+class FakeQuery:
+    def __init__(self, db, filters=()):
+        self.db = db
+        self.filters = filters
+
+    def where(self, field, op, value):
+        return FakeQuery(self.db, self.filters + ((field, OPERATORS[op], value),))
+
+    def count(self, alias=None):
+        return FakeAggregation(self, alias)
+
+    def stream(self):
+        raise AssertionError("Le comptage ne doit télécharger aucun document")
+
+class FakeAggregation:
+    def __init__(self, query, alias):
+        self.query = query
+        self.alias = alias
+
+    def get(self):
+        db = self.query.db
+        db.aggregations += 1
+        if db.fail:
+            raise RuntimeError("Firestore indisponible")
+        total = sum(
+            1 for data in db.documents.values()
+            if all(field in data and compare(data[field], value)
+                   for field, compare, value in self.query.filters)
+        )
+        return [[SimpleNamespace(alias=self.alias, value=total)]]
+
+class FakeFirestore:
+    """Collection `tickets` ne répondant qu'aux agrégations COUNT()"""
+    def __init__(self, n_tickets):
+        self.documents = {f"t{i}": {'dateSoumission': BASE + timedelta(hours=i)} for i in range(n_tickets)}
+        self.aggregations = 0
+        self.fail = False
+
+    def collection(self, name):
+        assert name == 'tickets'
+        return FakeQuery(self)
+
+@pytest.fixture
+def db():
+    return FakeFirestore(7)
+
+@pytest.fixture
+def connector(monkeypatch, db):
+    monkeypatch.setattr(firebase_connector.firebase_admin, '_apps', {'[DEFAULT]': object()})
+    monkeypatch.setattr(firebase_connector.firestore, 'client', lambda: db)
+    monkeypatch.setattr(Config, 'TICKET_STORE_ENABLED', False)
+    monkeypatch.setattr(Config, 'WRITE_BUFFER_ENABLED', False)
+    monkeypatch.setattr(Config, 'COUNT_CACHE_TTL', 60)
+    connector = firebase_connector.FirebaseConnector()
+    assert connector.connected
+    return connector
+
+def test_count_uses_server_side_aggregation(connector, db):
+    assert connector.get_tickets_count() == 7
+    assert db.aggregations == 1
+
+def test_count_is_cached_for_the_ttl(connector, db, monkeypatch):
+    connector.get_tickets_count()
+    db.documents['t7'] = {'dateSoumission': BASE}
+
+    assert connector.get_tickets_count() == 7
+    assert db.aggregations == 1
+
+    monkeypatch.setattr(Config, 'COUNT_CACHE_TTL', 0)
+    assert connector.get_tickets_count() == 8
+    assert db.aggregations == 2
+
+def test_failed_count_falls_back_to_last_value(connector, db, monkeypatch):
+    monkeypatch.setattr(Config, 'COUNT_CACHE_TTL', 0)
+    connector.get_tickets_count()
+    db.fail = True
+
+    assert connector.get_tickets_count() == 7
+
+def test_failed_count_falls_back_to_local_copy(connector, db):
+    db.fail = True
+    assert connector.get_tickets_count() == -1
+
+    connector.ticket_store = SimpleNamespace(count=lambda: 5)
+    assert connector.get_tickets_count() == 5
+
+def test_count_since_filters_on_the_server(connector, db):
+    assert connector.count_tickets_since(BASE + timedelta(hours=4)) == 2
+    assert db.aggregations == 1
+
+def test_count_since_reports_errors(connector, db):
+    db.fail = True
+    assert connector.count_tickets_since(BASE) == -1
@@ -0,0 +1,49 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import flat_forest
+from flat_forest import FlatForest
+from text_preprocessor import TextPreprocessor
+
+@pytest.fixture(scope='module')
+def features(trained_bundle):
+    from synthetic_data import generate_corpus
+    texts = generate_corpus(300, seed=3)['text'].tolist()
+    return trained_bundle.vectorizer.transform(TextPreprocessor().preprocess_batch(texts))
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('rows', [1, 7, flat_forest.SKLEARN_MIN_ROWS - 1, flat_forest.SKLEARN_MIN_ROWS, 300])
+def test_probabilities_match_sklearn(trained_bundle, features, compact, rows):
+    forest = trained_bundle.classifier
+    flat = FlatForest.from_forest(forest, compact=compact)
+    X = features[:rows]
+
+    expected = forest.predict_proba(X)
+    np.testing.assert_allclose(flat.predict_proba(X), expected, atol=1e-6 if compact else 1e-12)
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+
+def test_numpy_descent_when_sklearn_trees_unavailable(trained_bundle, features):
+    flat = FlatForest.from_forest(trained_bundle.classifier)
+    flat._sklearn_trees = False
+
+    np.testing.assert_allclose(flat.predict_proba(features), trained_bundle.classifier.predict_proba(features))
+
+def test_dense_input(trained_bundle, features):
+    flat = FlatForest.from_forest(trained_bundle.classifier)
+    X = features[:100].toarray()
+    np.testing.assert_allclose(flat.predict_proba(X), trained_bundle.classifier.predict_proba(X))
+
+def test_pickle_keeps_arrays_only(trained_bundle, features):
+    flat = FlatForest.from_forest(trained_bundle.classifier)
+    flat.predict_proba(features)  # construit les arbres scikit-learn
+
+    restored = pickle.loads(pickle.dumps(flat))
+    assert restored._sklearn_trees is None
+    np.testing.assert_array_equal(restored.predict_proba(features), flat.predict_proba(features))
+
+def test_rejects_wrong_feature_count(trained_bundle, features):
+    flat = FlatForest.from_forest(trained_bundle.classifier)
+    with pytest.raises(ValueError, match='features'):
+        flat.predict_proba(features[:, :-1])
@@ -0,0 +1,64 @@
+import numpy as np
+
+from inference_engine import InferenceEngine
+from text_preprocessor import TextPreprocessor
+
+class CountingClassifier:
+    """Enveloppe un classifieur et compte les appels à predict_proba"""
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self.classes_ = classifier.classes_
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.classifier.predict_proba(X)
+
+def make_engine(bundle, top_k=3):
+    classifier = CountingClassifier(bundle.classifier)
+    return InferenceEngine(bundle.vectorizer, classifier, bundle.label_encoder, top_k=top_k), classifier
+
+def test_batch_uses_a_single_predict_proba_pass(trained_bundle, unseen_texts):
+    engine, classifier = make_engine(trained_bundle)
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+
+    predictions = engine.predict(processed)
+
+    assert classifier.calls == 1
+    assert len(predictions) == len(unseen_texts)
+
+def test_prediction_matches_classifier(trained_bundle, unseen_texts):
+    engine, _ = make_engine(trained_bundle)
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+    X = trained_bundle.vectorizer.transform(processed)
+
+    predictions = engine.predict_matrix(X, processed)
+
+    expected = trained_bundle.label_encoder.inverse_transform(trained_bundle.classifier.predict(X))
+    assert [p['predicted_category'] for p in predictions] == [str(label) for label in expected]
+    probabilities = trained_bundle.classifier.predict_proba(X)
+    np.testing.assert_allclose([p['confidence'] for p in predictions], probabilities.max(axis=1))
+
+def test_top_categories_are_sorted_and_start_with_prediction(trained_bundle, unseen_texts):
+    engine, _ = make_engine(trained_bundle, top_k=3)
+
+    for prediction in engine.predict(TextPreprocessor().preprocess_batch(unseen_texts)):
+        top = prediction['top_categories']
+        confidences = [entry['confidence'] for entry in top]
+        assert len(top) == 3
+        assert confidences == sorted(confidences, reverse=True)
+        assert top[0] == {'category': prediction['predicted_category'],
+                          'confidence': prediction['confidence']}
+
+def test_keywords_come_from_the_tfidf_row(trained_bundle):
+    engine, _ = make_engine(trained_bundle)
+    processed = TextPreprocessor().preprocess_batch(['imprimante bloquée papier imprimante', ''])
+    X = engine.transform(processed)
+
+    keywords, empty = [engine.keywords(X, row) for row in range(2)]
+
+    row = X.getrow(0)
+    names = trained_bundle.vectorizer.get_feature_names_out()
+    assert keywords and set(keywords) <= {str(names[i]) for i in row.indices}
+    assert keywords[0] == str(names[row.indices[np.argmax(row.data)]])
+    assert empty == []
@@ -0,0 +1,92 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from config import Config
+from load_test import LoadGenerator, summarize
+from memory_connector import InMemoryConnector
+from storage import create_storage
+from training_jobs import TrainingJobManager
+
+@pytest.fixture
+def storage():
+    return InMemoryConnector(n_tickets=30, read_latency_ms=0, write_latency_ms=0)
+
+def test_backend_switch(monkeypatch):
+    assert isinstance(create_storage('memory'), InMemoryConnector)
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'memory')
+    assert isinstance(create_storage(), InMemoryConnector)
+    with pytest.raises(ValueError, match="Stockage inconnu"):
+        create_storage('postgres')
+
+def test_jobs_run_in_process_with_memory_backend(monkeypatch):
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'memory')
+    assert TrainingJobManager().in_process
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'sqlite')
+    assert not TrainingJobManager().in_process
+
+def test_reads_wait_for_the_simulated_latency():
+    storage = InMemoryConnector(n_tickets=5, read_latency_ms=30, write_latency_ms=0)
+
+    started = time.perf_counter()
+    assert storage.get_tickets_count() == 5
+    assert time.perf_counter() - started >= 0.024
+
+def test_returned_tickets_are_copies(storage):
+    ticket = storage.get_all_tickets()[0]
+    ticket['categorie'] = 'modifiée'
+
+    assert storage.get_all_tickets()[0]['categorie'] != 'modifiée'
+
+def test_feedback_becomes_a_training_correction(storage):
+    since = datetime.now(timezone.utc) - timedelta(seconds=1)
+    ticket = storage.get_all_tickets()[0]
+
+    storage.save_prediction_feedback(ticket['id'], ticket['categorie'], 'Autre', 0.4)
+    storage.save_prediction_feedback('inconnu', 'Autre', 'Autre', 0.4)
+
+    corrections = storage.get_feedback_corrections_since(since)
+    assert corrections['ticket_id'].tolist() == [ticket['id']]
+    assert corrections['category'].tolist() == ['Autre']
+    assert len(storage.get_prediction_feedback()) == 2
+
+def test_updates_mark_tickets(storage):
+    first, second = [ticket['id'] for ticket in storage.get_all_tickets()[:2]]
+
+    storage.update_ticket_category(first, 'Autre')
+    assert storage.update_tickets({second: {'categorie_predite': 'Autre'}, 'inconnu': {}}) == 2
+
+    tickets = {ticket['id']: ticket for ticket in storage.get_all_tickets()}
+    assert tickets[first]['categorie'] == 'Autre' and tickets[first]['categorie_modifiee']
+    assert tickets[second]['categorie_predite'] == 'Autre' and 'date_reclassification' in tickets[second]
+    assert 'inconnu' not in tickets
+
+def test_count_since(storage):
+    dates = sorted(ticket['dateSoumission'] for ticket in storage.get_all_tickets())
+    assert storage.count_tickets_since(dates[9]) == 20
+
+def test_load_test_requests_hit_existing_tickets(monkeypatch, storage):
+    # Même graine et même nombre de tickets : les identifiants envoyés existent côté serveur
+    monkeypatch.setattr(api_server, 'firebase_connector', storage)
+    client = TestClient(api_server.app)
+    generator = LoadGenerator('http://localhost:8000', n_tickets=30, seed=42)
+    rng = random.Random(0)
+
+    for endpoint in ('feedback', 'tickets'):
+        method, path, body = generator._build_request(endpoint, rng)
+        assert client.request(method, path, json=body).status_code == 200
+    assert len(storage.get_prediction_feedback()) == 1
+
+def test_summary_counts_errors():
+    records = [('predict', 200, 0.010), ('predict', 503, 0.020), ('health', 0, 0.030), ('health', 200, 0.040)]
+
+    summary = summarize(records, duration=2.0)
+
+    assert summary['requests'] == 4 and summary['throughput_per_second'] == 2.0
+    assert summary['error_rate'] == 0.5
+    assert summary['status_codes'] == {'200': 2, '503': 1, '0': 1}
+    assert summary['latency_ms']['max'] == 40.0
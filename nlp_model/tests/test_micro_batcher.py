@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from micro_batcher import MicroBatcher
+
+class RecordingModel:
+    """Prédiction factice : enregistre chaque lot reçu, échoue sur les textes 'erreur'"""
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if any(text.startswith('erreur') for text in texts):
+            raise ValueError(f"Texte invalide dans le lot de {len(texts)}")
+        return [{'text': text, 'predicted_category': 'Autre'} for text in texts]
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_concurrent_requests_share_one_batch():
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = MicroBatcher(model, max_batch_size=16, window_ms=200)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit(f"texte {i}") for i in range(10)))
+        finally:
+            await batcher.stop()
+        return results, batcher.get_stats()
+
+    results, stats = run(scenario())
+
+    assert [result['text'] for result in results] == [f"texte {i}" for i in range(10)]
+    assert len(model.batches) == 1 and len(model.batches[0]) == 10
+    assert stats['batches_count'] == 1 and stats['average_batch_size'] == 10
+
+def test_full_batch_is_sent_without_waiting():
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = MicroBatcher(model, max_batch_size=4, window_ms=10_000)
+        await batcher.start()
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(f"texte {i}") for i in range(8))), timeout=5)
+        finally:
+            await batcher.stop()
+
+    run(scenario())
+    assert [len(batch) for batch in model.batches] == [4, 4]
+
+def test_window_flushes_a_partial_batch():
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = MicroBatcher(model, max_batch_size=64, window_ms=20)
+        await batcher.start()
+        try:
+            first = await asyncio.wait_for(batcher.submit('seul'), timeout=5)
+            second = await asyncio.wait_for(batcher.submit('suivant'), timeout=5)
+        finally:
+            await batcher.stop()
+        return first, second
+
+    first, second = run(scenario())
+    assert (first['text'], second['text']) == ('seul', 'suivant')
+    assert model.batches == [['seul'], ['suivant']]
+
+def test_error_reaches_only_its_own_request():
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = MicroBatcher(model, max_batch_size=16, window_ms=100)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(batcher.submit('texte a'), batcher.submit('erreur b'),
+                                           batcher.submit('texte c'), return_exceptions=True)
+        finally:
+            await batcher.stop()
+        return results, batcher.get_stats()
+
+    (first, failed, last), stats = run(scenario())
+
+    assert first['text'] == 'texte a' and last['text'] == 'texte c'
+    assert isinstance(failed, ValueError) and "lot de 1" in str(failed)
+    assert stats['fallbacks_count'] == 1
+
+def test_stop_fails_pending_requests():
+    release = threading.Event()
+
+    def slow_model(texts):
+        release.wait(5)
+        return [{'text': text} for text in texts]
+
+    async def scenario():
+        batcher = MicroBatcher(slow_model, max_batch_size=2, window_ms=10_000)
+        await batcher.start()
+        # Lot en cours d'évaluation, lot en cours de collecte, requête encore en file
+        in_flight = [asyncio.ensure_future(batcher.submit(f"en cours {i}")) for i in range(2)]
+        collecting = asyncio.ensure_future(batcher.submit('en collecte'))
+        await asyncio.sleep(0.1)
+        asyncio.get_running_loop().call_later(0.1, release.set)
+        await batcher.stop()
+        return (await asyncio.gather(*in_flight, return_exceptions=True),
+                await asyncio.gather(collecting, return_exceptions=True))
+
+    finished, (stopped,) = run(scenario())
+
+    # Le lot déjà parti se termine, celui en collecte échoue au lieu d'attendre indéfiniment
+    assert [result['text'] for result in finished] == ['en cours 0', 'en cours 1']
+    assert isinstance(stopped, RuntimeError)
+
+def test_submit_requires_start():
+    with pytest.raises(RuntimeError):
+        run(MicroBatcher(RecordingModel()).submit('texte'))
+
+def test_stats_endpoint(monkeypatch):
+    client = TestClient(api_server.app)
+    monkeypatch.setattr(api_server, 'micro_batcher', None)
+    assert client.get('/batcher/stats').json() == {'enabled': False}
+
+    monkeypatch.setattr(api_server, 'micro_batcher', MicroBatcher(RecordingModel(), max_batch_size=8))
+    stats = client.get('/batcher/stats').json()
+    assert stats['enabled'] and stats['max_batch_size'] == 8 and stats['queued'] == 0
@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from config import Config
+from flat_forest import FlatForest
+from model_bundle import (ModelBundle, ModelBundleError, bundle_exists, deserialize_bundle,
+                          load_bundle, read_manifest, save_bundle, serialize_bundle)
+from text_preprocessor import TextPreprocessor
+
+def bundle_path():
+    return os.path.join(Config.BUNDLE_DIR, read_manifest()['bundle_file'])
+
+def test_round_trip(trained_bundle, unseen_texts):
+    save_bundle(trained_bundle)
+    loaded = load_bundle()
+    manifest = read_manifest()
+
+    assert bundle_exists()
+    assert loaded.version == trained_bundle.version == manifest['version']
+    assert manifest['classifier_kind'] == 'flat_forest'
+    assert manifest['bundle_bytes'] == os.path.getsize(bundle_path())
+    assert isinstance(loaded.classifier, FlatForest)
+
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+    assert loaded.engine.predict(processed) == trained_bundle.engine.predict(processed)
+
+def test_deserialize_matches_load(trained_bundle, unseen_texts):
+    served = deserialize_bundle(serialize_bundle(trained_bundle), trained_bundle.version)
+    save_bundle(trained_bundle)
+
+    processed = TextPreprocessor().preprocess_batch(unseen_texts)
+    assert served.engine.predict(processed) == load_bundle().engine.predict(processed)
+
+def test_rejects_truncated_file(trained_bundle):
+    save_bundle(trained_bundle)
+    with open(bundle_path(), 'r+b') as f:
+        f.truncate(os.path.getsize(bundle_path()) - 10)
+
+    with pytest.raises(ModelBundleError, match='tronqué'):
+        load_bundle()
+
+def test_checksum_verified_on_request(trained_bundle, monkeypatch):
+    save_bundle(trained_bundle)
+    # Même taille, contenu différent : seule la somme de contrôle le détecte
+    with open(bundle_path(), 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+
+    monkeypatch.setattr(Config, 'BUNDLE_VERIFY_CHECKSUM', True)
+    with pytest.raises(ModelBundleError, match='incohérent'):
+        load_bundle()
+
+def test_unsupported_format_version(trained_bundle):
+    save_bundle(trained_bundle)
+    manifest = read_manifest()
+    manifest['format_version'] += 1
+    with open(Config.MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ModelBundleError, match='non supporté'):
+        load_bundle()
+
+def test_keeps_recent_versions(trained_bundle, monkeypatch):
+    monkeypatch.setattr(Config, 'BUNDLE_KEEP_VERSIONS', 2)
+    for _ in range(3):
+        bundle = ModelBundle(trained_bundle.vectorizer, trained_bundle.classifier, trained_bundle.label_encoder)
+        save_bundle(bundle)
+
+    files = os.listdir(Config.BUNDLE_DIR)
+    assert len(files) == 2 and f"{bundle.version}.joblib" in files
+
+def test_bundle_is_immutable(trained_bundle):
+    with pytest.raises(AttributeError):
+        trained_bundle.classifier = None
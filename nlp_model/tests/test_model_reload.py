@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+import ticket_classifier
+from config import Config
+from memory_connector import InMemoryConnector
+from model_bundle import ModelBundle, read_manifest, save_bundle
+from ticket_classifier import TicketClassifier
+
+@pytest.fixture
+def classifier(monkeypatch):
+    classifier = TicketClassifier(auto_load=False, firebase_connector=InMemoryConnector(n_tickets=0))
+    monkeypatch.setattr(api_server, 'classifier', classifier)
+    monkeypatch.setattr(api_server, 'last_manifest_version', None)
+    return classifier
+
+def check():
+    return asyncio.run(api_server.check_model_update())
+
+def publish_version(version):
+    """Manifeste réécrit par un autre processus (nouvelle version annoncée)"""
+    manifest = read_manifest()
+    manifest['version'] = version
+    with open(Config.MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+def test_new_manifest_is_loaded_once(classifier, trained_bundle):
+    assert not check()
+
+    save_bundle(trained_bundle)
+    assert check()
+    assert classifier.model_version == trained_bundle.version and classifier.ready
+
+    assert not check()
+
+def test_rejected_version_is_not_retried(classifier, trained_bundle, monkeypatch):
+    save_bundle(trained_bundle)
+    publish_version('v2')
+    attempts = []
+
+    def failing_reload():
+        attempts.append(read_manifest()['version'])
+        return False
+
+    monkeypatch.setattr(classifier, 'reload_model', failing_reload)
+
+    assert not check()
+    assert not check()
+    assert attempts == ['v2']
+
+    # Seul un nouveau manifeste déclenche un nouvel essai
+    publish_version('v3')
+    check()
+    assert attempts == ['v2', 'v3']
+
+def test_reload_error_is_not_retried(classifier, trained_bundle, monkeypatch):
+    save_bundle(trained_bundle)
+    attempts = []
+
+    def broken_reload():
+        attempts.append(1)
+        raise OSError("Fichier du modèle illisible")
+
+    monkeypatch.setattr(classifier, 'reload_model', broken_reload)
+
+    with pytest.raises(OSError):
+        check()
+    assert not check()
+    assert len(attempts) == 1
+
+def test_training_count_follows_the_manifest(classifier, trained_bundle):
+    from model_bundle import deserialize_bundle, serialize_bundle
+
+    # Deux entraînements faits par le processus de job
+    serialized = serialize_bundle(trained_bundle)
+    assert save_bundle(deserialize_bundle(serialized, version='v1'))['training_count'] == 1
+    save_bundle(deserialize_bundle(serialized, version='v2'))
+
+    assert classifier.reload_model()
+    assert classifier.model_version == 'v2'
+    assert classifier.get_model_info()['training_count'] == 2
+
+    # Redémarrage de l'API : le compteur est relu au chargement
+    restarted = TicketClassifier(auto_load=False, firebase_connector=InMemoryConnector(n_tickets=0))
+    restarted.load_or_create_model()
+    assert restarted.training_count == 2
+
+class ConstantClassifier:
+    """Classifieur qui attribue toujours la dernière catégorie (ou échoue)"""
+    def __init__(self, classes, fail=False):
+        self.classes_ = classes
+        self.fail = fail
+
+    def predict_proba(self, X):
+        if self.fail:
+            raise ValueError("Modèle inutilisable")
+        probabilities = np.zeros((X.shape[0], len(self.classes_)))
+        probabilities[:, -1] = 1.0
+        return probabilities
+
+def constant_bundle(bundle, version, fail=False):
+    return ModelBundle(bundle.vectorizer, ConstantClassifier(bundle.classifier.classes_, fail),
+                       bundle.label_encoder, version=version)
+
+def test_bundle_is_immutable(trained_bundle):
+    with pytest.raises(AttributeError):
+        trained_bundle.classifier = None
+
+def test_swap_during_a_batch_does_not_mix_models(classifier, trained_bundle, monkeypatch):
+    classifier.bundle = trained_bundle
+    replacement = constant_bundle(trained_bundle, 'v2')
+    preprocess_batch = classifier.preprocessor.preprocess_batch
+
+    def swap_then_preprocess(texts):
+        # Un rechargement concurrent remplace le modèle au milieu du lot
+        classifier.bundle = replacement
+        return preprocess_batch(texts)
+
+    texts = ['imprimante bloquée', 'mot de passe oublié', 'écran noir']
+    expected = trained_bundle.engine.predict(preprocess_batch(texts))
+    monkeypatch.setattr(classifier.preprocessor, 'preprocess_batch', swap_then_preprocess)
+
+    predictions = classifier.predict_many(texts)
+
+    assert [p['predicted_category'] for p in predictions] == [p['predicted_category'] for p in expected]
+    # Les deux modèles ne s'accordent pas sur ce lot : un mélange serait visible
+    last_category = replacement.engine.class_names[-1]
+    assert any(p['predicted_category'] != last_category for p in predictions)
+    assert all(p['predicted_category'] == last_category for p in classifier.predict_many(texts))
+
+def test_unusable_model_is_rejected_on_reload(classifier, trained_bundle, monkeypatch):
+    classifier.bundle = trained_bundle
+    classifier.ready = True
+    save_bundle(trained_bundle)
+    publish_version('v2')
+    monkeypatch.setattr(ticket_classifier, 'load_bundle',
+                        lambda: constant_bundle(trained_bundle, 'v2', fail=True))
+
+    assert not classifier.reload_model()
+    assert classifier.bundle is trained_bundle and classifier.ready
+
+def test_reload_endpoint(classifier, trained_bundle):
+    client = TestClient(api_server.app)
+    save_bundle(trained_bundle)
+
+    first = client.post('/model/reload').json()
+    assert first['reloaded'] and first['ready']
+    assert first['model_version'] == trained_bundle.version
+
+    second = client.post('/model/reload').json()
+    assert not second['reloaded'] and second['message'] == "Modèle déjà à jour"
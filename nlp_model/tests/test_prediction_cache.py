@@ -0,0 +1,59 @@
+from memory_connector import InMemoryConnector
+from model_bundle import ModelBundle
+from prediction_cache import PredictionCache
+from ticket_classifier import TicketClassifier
+
+def test_key_depends_on_model_version_and_text():
+    key = PredictionCache.make_key('v1', 'ordinateur demarre')
+
+    assert key == PredictionCache.make_key('v1', 'ordinateur demarre')
+    assert key != PredictionCache.make_key('v2', 'ordinateur demarre')
+    assert key != PredictionCache.make_key('v1', 'ordinateur lent')
+
+def test_get_returns_a_copy():
+    cache = PredictionCache(max_size=10, ttl=0)
+    cache.put('k', {'top_categories': [{'category': 'Autre'}]})
+
+    cache.get('k')['top_categories'].append('modifié')
+    assert cache.get('k') == {'top_categories': [{'category': 'Autre'}]}
+
+def test_evicts_least_recently_used():
+    cache = PredictionCache(max_size=2, ttl=0)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    cache.get('a')
+    cache.put('c', {'n': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1} and cache.get('c') == {'n': 3}
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = PredictionCache(max_size=10, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr('prediction_cache.time.monotonic', lambda: now[0])
+    cache.put('k', {'n': 1})
+
+    now[0] += 61
+    assert cache.get('k') is None
+    assert cache.get_stats()['misses'] == 1
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(max_size=0)
+    cache.put('k', {'n': 1})
+    assert cache.get('k') is None and not cache.enabled
+
+def test_classifier_keys_on_preprocessed_text_and_model(trained_bundle):
+    classifier = TicketClassifier(auto_load=False, firebase_connector=InMemoryConnector(n_tickets=0))
+    classifier.prediction_cache = PredictionCache(max_size=100, ttl=0)
+    classifier.bundle = trained_bundle
+
+    first = classifier.predict("Mon ordinateur ne démarre plus !")
+    # Même texte après prétraitement (casse, ponctuation, mots vides) : servi par le cache
+    assert classifier.predict("mon ORDINATEUR ne démarre plus") == first
+    assert classifier.prediction_cache.get_stats()['hits'] == 1
+
+    # Nouvelle version du modèle : les anciennes entrées ne sont plus lues
+    classifier.bundle = ModelBundle(trained_bundle.vectorizer, trained_bundle.classifier,
+                                    trained_bundle.label_encoder)
+    classifier.predict("Mon ordinateur ne démarre plus !")
+    assert classifier.prediction_cache.get_stats()['hits'] == 1
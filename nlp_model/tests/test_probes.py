@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+import executors
+import registry
+import training_jobs
+from config import Config
+from executors import BoundedExecutor
+from memory_connector import InMemoryConnector
+
+def test_probes_answer_while_the_model_loads(monkeypatch):
+    # Serveur à l'écoute, composants pas encore construits
+    monkeypatch.setattr(api_server, 'classifier', None)
+    client = TestClient(api_server.app)
+
+    assert client.get('/livez').json()['status'] == 'alive'
+    readiness = client.get('/readyz')
+    assert readiness.status_code == 503
+    assert readiness.json()['status'] == 'loading' and not readiness.json()['model_loaded']
+    assert client.get('/health/deep').json()['status'] == 'degraded'
+    assert client.post('/predict', json={'titre': 'VPN', 'description': 'coupé'}).status_code == 503
+
+@pytest.fixture
+def isolated_server(monkeypatch):
+    """Démarrage complet (lifespan) sur le stockage en mémoire, sans toucher à l'état partagé des autres tests"""
+    monkeypatch.setattr(Config, 'MODEL_RELOAD_INTERVAL', 0)
+    monkeypatch.setattr(Config, 'MICRO_BATCH_ENABLED', False)
+    # Pools neufs : l'arrêt du serveur les ferme
+    monkeypatch.setattr(executors, 'inference_executor', BoundedExecutor('inference', 2, 8))
+    monkeypatch.setattr(executors, 'storage_executor', BoundedExecutor('storage', 2, 8))
+    monkeypatch.setattr(registry, '_connector', InMemoryConnector(n_tickets=50))
+    monkeypatch.setattr(registry, '_classifier', None)
+    monkeypatch.setattr(training_jobs, '_job_manager', None)
+    monkeypatch.setattr(training_jobs, '_reclassification_manager', None)
+    for name in ('classifier', 'firebase_connector', 'training_jobs', 'reclassification_jobs',
+                 'micro_batcher', 'model_watcher_task', 'components_task',
+                 'deep_health_task', 'ticket_sync_task'):
+        monkeypatch.setattr(api_server, name, None)
+    monkeypatch.setattr(api_server, 'startup_report', {**api_server.startup_report, 'steps': {}, 'error': None})
+    monkeypatch.setattr(api_server, 'deep_health', dict(api_server.deep_health))
+
+def wait_until_ready(client, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get('/readyz')
+        if response.status_code == 200:
+            return response
+        time.sleep(0.1)
+    pytest.fail("Le modèle n'est jamais devenu prêt")
+
+def test_lifespan_builds_components_in_background(isolated_server):
+    with TestClient(api_server.app) as client:
+        assert client.get('/livez').status_code == 200
+
+        readiness = wait_until_ready(client).json()
+        assert readiness['status'] == 'ready' and readiness['model_loaded']
+        assert readiness['model_version'] == api_server.classifier.model_version
+
+        report = client.get('/startup').json()
+        assert report['error'] is None
+        assert {'storage', 'model_import', 'model_load'} <= set(report['steps'])
+        assert 0 <= report['serving_after_seconds'] <= report['model_ready_after_seconds']
+        assert report['storage_ready_after_seconds'] is not None
+
+        prediction = client.post('/predict', json={'titre': 'Imprimante', 'description': 'bourrage papier'})
+        assert prediction.status_code == 200
+
+    assert executors.inference_executor._executor._shutdown
+
+def test_deep_health_reports_the_storage_check(isolated_server):
+    with TestClient(api_server.app) as client:
+        wait_until_ready(client)
+        deadline = time.monotonic() + 10
+        while api_server.deep_health['checked_at'] is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        health = client.get('/health/deep').json()
+
+    assert health['status'] == 'healthy' and health['model_ready']
+    assert health['firebase']['storage_backend'] == 'memory'
+    assert health['firebase']['firebase_connected'] and health['firebase']['tickets_count'] == 50
@@ -0,0 +1,101 @@
+import os
+from collections import Counter
+
+import pytest
+
+from reclassification import load_checkpoint, run_reclassification
+from sqlite_storage import SQLiteTicketStorage
+from synthetic_data import generate_tickets
+
+MANUAL_CATEGORY = 'Catégorie corrigée'
+
+class RecordingStorage(SQLiteTicketStorage):
+    """Stockage SQLite qui garde la trace des tickets réécrits"""
+    def __init__(self, path):
+        super().__init__(path)
+        self.written = Counter()
+
+    def update_tickets(self, updates):
+        self.written.update(list(updates))
+        return super().update_tickets(updates)
+
+class Interrupted(Exception):
+    pass
+
+@pytest.fixture
+def storage():
+    storage = RecordingStorage('data/storage.db')
+    tickets = generate_tickets(60, seed=4)
+    for ticket in tickets[::10]:
+        ticket.update(categorie=MANUAL_CATEGORY, categorie_modifiee=True)
+    storage.upsert_tickets(tickets)
+    return storage
+
+def reclassify(storage, bundle, **kwargs):
+    return run_reclassification(storage, bundle, chunk_size=10, max_ops_per_second=0,
+                                checkpoint_path='data/checkpoint.json', **kwargs)
+
+def manual_tickets(storage):
+    return [ticket for ticket in storage.get_all_tickets() if ticket.get('categorie_modifiee')]
+
+def test_full_run(storage, trained_bundle):
+    checkpoint = reclassify(storage, trained_bundle)
+
+    assert checkpoint['completed']
+    assert checkpoint['scanned'] == 60
+    assert checkpoint['updated'] == 54 and checkpoint['skipped_manual'] == 6
+    assert all(ticket['categorie'] == MANUAL_CATEGORY and 'model_version' not in ticket
+               for ticket in manual_tickets(storage))
+    assert {ticket.get('model_version') for ticket in storage.get_all_tickets()
+            if not ticket.get('categorie_modifiee')} == {trained_bundle.version}
+
+def test_interrupted_run_resumes_without_rewriting(storage, trained_bundle):
+    def interrupt_after_two_chunks(checkpoint):
+        if checkpoint['scanned'] >= 20:
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        reclassify(storage, trained_bundle, on_chunk=interrupt_after_two_chunks)
+    assert load_checkpoint('data/checkpoint.json')['start_after'] is not None
+    assert sum(storage.written.values()) == 18
+
+    checkpoint = reclassify(storage, trained_bundle)
+
+    assert checkpoint['completed'] and checkpoint['scanned'] == 60
+    assert len(storage.written) == 54
+    assert max(storage.written.values()) == 1
+    assert all(ticket['categorie'] == MANUAL_CATEGORY for ticket in manual_tickets(storage))
+
+def test_completed_run_is_not_repeated(storage, trained_bundle):
+    reclassify(storage, trained_bundle)
+    storage.written.clear()
+
+    assert reclassify(storage, trained_bundle)['completed']
+    assert not storage.written
+
+def test_tickets_already_at_model_version_are_skipped(storage, trained_bundle):
+    reclassify(storage, trained_bundle)
+    storage.written.clear()
+    # Point de reprise perdu : les tickets portent déjà la version et l'empreinte du texte
+    os.remove('data/checkpoint.json')
+
+    checkpoint = reclassify(storage, trained_bundle)
+
+    assert checkpoint['skipped_unchanged'] == 54 and checkpoint['updated'] == 0
+    assert not storage.written
+
+def test_edited_text_is_reclassified(storage, trained_bundle):
+    reclassify(storage, trained_bundle)
+    os.remove('data/checkpoint.json')
+    ticket = next(ticket for ticket in storage.get_all_tickets() if not ticket.get('categorie_modifiee'))
+    storage.upsert_tickets([{**ticket, 'description': 'Nouvelle description du problème'}])
+    storage.written.clear()
+
+    checkpoint = reclassify(storage, trained_bundle)
+
+    assert checkpoint['updated'] == 1 and list(storage.written) == [ticket['id']]
+
+def test_progress_reported_per_chunk(storage, trained_bundle):
+    scanned = []
+    reclassify(storage, trained_bundle, on_chunk=lambda checkpoint: scanned.append(checkpoint['scanned']))
+    assert scanned == [10, 20, 30, 40, 50, 60]
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sqlite_storage import SQLiteTicketStorage
+
+BASE = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+def ticket(ticket_id, hours, categorie='Autre'):
+    return {
+        'id': ticket_id,
+        'titre': f"Titre {ticket_id}",
+        'description': f"Description {ticket_id}",
+        'categorie': categorie,
+        'dateSoumission': BASE + timedelta(hours=hours)
+    }
+
+@pytest.fixture
+def storage():
+    storage = SQLiteTicketStorage('data/storage.db')
+    storage.upsert_tickets([ticket(f"t{i}", i) for i in range(5)])
+    return storage
+
+def test_high_water_mark_is_exclusive(storage):
+    mark = BASE + timedelta(hours=2)
+    assert storage.count_tickets_since(mark) == 2
+    assert sorted(storage.get_tickets_for_training_since(mark)['ticket_id']) == ['t3', 't4']
+    assert storage.count_tickets_since(BASE + timedelta(hours=4)) == 0
+
+def test_high_water_mark_compares_instants_across_timezones(storage):
+    # 14h à Paris (UTC+2) = 12h UTC : même instant que t0
+    paris = timezone(timedelta(hours=2))
+    assert storage.count_tickets_since(datetime(2026, 1, 1, 14, tzinfo=paris)) == 4
+
+    # Un ticket écrit avec un autre fuseau reste ordonné par instant
+    storage.upsert_tickets([{**ticket('t9', 0), 'dateSoumission': datetime(2026, 1, 1, 20, tzinfo=paris)}])
+    assert sorted(storage.get_tickets_for_training_since(BASE + timedelta(hours=5, minutes=30))['ticket_id']) == ['t9']
+
+def test_training_frame_keeps_dates(storage):
+    df = storage.get_tickets_for_training_since(BASE + timedelta(hours=3))
+    row = df.iloc[0]
+    assert row['text'] == 'Titre t4 Description t4'
+    assert row['date_created'] == BASE + timedelta(hours=4)
+
+def test_recategorized_ticket_keeps_its_date_index(storage):
+    storage.update_ticket_category('t4', 'Bug')
+    assert storage.count_tickets_since(BASE + timedelta(hours=3)) == 1
+    assert storage.get_tickets_for_training_since(BASE + timedelta(hours=3))['category'].tolist() == ['Bug']
+
+def test_feedback_corrections_since(storage):
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    storage.save_prediction_feedback('t1', 'Autre', 'Bug', 0.4)
+    storage.save_prediction_feedback('t2', 'Autre', '', 0.9)
+    storage.save_prediction_feedback('absent', 'Autre', 'Bug', 0.4)
+
+    corrections = storage.get_feedback_corrections_since(before)
+    # Sans catégorie corrigée ou sans ticket : ignoré
+    assert corrections[['ticket_id', 'category', 'text']].values.tolist() == [
+        ['t1', 'Bug', 'Titre t1 Description t1']
+    ]
+    assert corrections['date_created'].iloc[0] > before
+    assert storage.get_feedback_corrections_since(datetime.now(timezone.utc)).empty
+    assert len(storage.get_prediction_feedback()) == 3
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from text_preprocessor import TextPreprocessor
+
+TEXTS = [
+    "L'imprimante du 3e étage ne fonctionne plus depuis 2 jours !!",
+    "VPN: connexion impossible (erreur 809) avec le nouveau portable",
+    "The printer is jammed and the screen shows an error",
+    "",
+    None,
+    "Écran   bleu\tau démarrage ; redémarrage en boucle",
+]
+
+def test_preprocess_drops_stop_words_digits_and_short_tokens():
+    processed = TextPreprocessor().preprocess("Le ticket 42 : mon écran est noir, PC HS")
+
+    assert processed == 'écran est noir'
+
+def test_preprocess_matches_clean_text_pipeline():
+    # Le motif de tokens équivaut à clean_text suivi d'un découpage sur les espaces
+    preprocessor = TextPreprocessor()
+    for text in TEXTS[:3] + TEXTS[5:]:
+        tokens = preprocessor.clean_text(text).split()
+        expected = ' '.join(preprocessor.remove_stopwords([token for token in tokens if len(token) > 2]))
+        assert preprocessor.preprocess(text) == expected
+
+def test_batch_matches_single_text_preprocessing():
+    preprocessor = TextPreprocessor()
+
+    assert preprocessor.preprocess_batch(TEXTS) == [preprocessor.preprocess(text) for text in TEXTS]
+
+def test_batch_keeps_series_index_and_name():
+    series = pd.Series(TEXTS, index=range(10, 10 + len(TEXTS)), name='text')
+
+    processed = TextPreprocessor().preprocess_batch(series)
+
+    assert isinstance(processed, pd.Series)
+    assert processed.index.tolist() == series.index.tolist() and processed.name == 'text'
+    assert processed.tolist() == TextPreprocessor().preprocess_batch(TEXTS)
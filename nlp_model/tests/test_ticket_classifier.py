@@ -0,0 +1,26 @@
+from memory_connector import InMemoryConnector
+from ticket_classifier import TicketClassifier
+
+def make_classifier(bundle):
+    classifier = TicketClassifier(auto_load=False, firebase_connector=InMemoryConnector(n_tickets=0))
+    classifier.bundle = bundle
+    return classifier
+
+def test_predict_many_matches_predict(trained_bundle, unseen_texts):
+    texts = unseen_texts[:20] + ["", None]
+    batch = make_classifier(trained_bundle).predict_many(texts)
+
+    # Un autre classifieur : son cache ne contient pas les prédictions du lot
+    single = make_classifier(trained_bundle)
+    assert batch == [single.predict(text) for text in texts]
+
+def test_predict_many_empty_batch(trained_bundle):
+    assert make_classifier(trained_bundle).predict_many([]) == []
+
+def test_predict_many_without_model_flags_review():
+    classifier = TicketClassifier(auto_load=False, firebase_connector=InMemoryConnector(n_tickets=0))
+    predictions = classifier.predict_many(["Mon ordinateur ne démarre plus", "Remboursement"])
+
+    assert len(predictions) == 2
+    assert all(p['needs_human_review'] and p['predicted_category'] == 'Autre' and 'error' in p
+               for p in predictions)
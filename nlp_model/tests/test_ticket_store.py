@@ -0,0 +1,147 @@
+import operator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ticket_store import LocalTicketStore
+
+BASE = datetime(2026, 5, 1, 9, tzinfo=timezone.utc)
+
+OPERATORS = {'>=': operator.ge, '>': operator.gt}
+
+class FakeSnapshot:
+    def __init__(self, document_id, data):
+        self.id = document_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class FakeQuery:
+    def __init__(self, db, filters=()):
+        self.db = db
+        self.filters = filters
+
+    def where(self, field, op, value):
+        return FakeQuery(self.db, self.filters + ((field, OPERATORS[op], value),))
+
+    def stream(self):
+        self.db.queries += 1
+        for document_id, data in sorted(self.db.documents.items()):
+            if all(field in data and compare(data[field], value) for field, compare, value in self.filters):
+                self.db.read += 1
+                yield FakeSnapshot(document_id, data)
+
+class FakeFirestore:
+    """Collection `tickets` en mémoire avec filtres where() ; compte les documents lus"""
+    def __init__(self):
+        self.documents = {}
+        self.queries = 0
+        self.read = 0
+
+    def collection(self, name):
+        assert name == 'tickets'
+        return FakeQuery(self)
+
+    def put(self, document_id, hours, **fields):
+        self.documents[document_id] = {'titre': f"Ticket {document_id}", 'categorie': 'Autre',
+                                       'dateSoumission': BASE + timedelta(hours=hours), **fields}
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    for i in range(5):
+        db.put(f"t{i}", i)
+    return db
+
+@pytest.fixture
+def store():
+    return LocalTicketStore('data/tickets.db')
+
+def ids(store):
+    return sorted(ticket['id'] for ticket in store.get_all_tickets())
+
+def test_first_sync_is_full(store, db):
+    stats = store.sync(db)
+
+    assert stats['full'] and stats['changed'] == 5
+    assert store.get_high_water_mark() == BASE + timedelta(hours=4)
+    assert ids(store) == ['t0', 't1', 't2', 't3', 't4']
+
+def test_incremental_sync_reads_only_changes(store, db):
+    store.sync(db)
+    db.read = 0
+    db.put('t5', 5)
+    db.documents['t1']['date_modification'] = BASE + timedelta(hours=6)
+
+    stats = store.sync(db)
+
+    assert not stats['full']
+    assert stats['changed'] == 3  # t1, t5 et t4 (à la date exacte du marqueur)
+    assert db.read == 3
+    assert store.get_high_water_mark() == BASE + timedelta(hours=6)
+    assert ids(store) == ['t0', 't1', 't2', 't3', 't4', 't5']
+    page = store.get_tickets_page(10)['tickets']
+    assert next(ticket for ticket in page if ticket['id'] == 't1')['date_modification'] == BASE + timedelta(hours=6)
+
+def test_ticket_with_same_date_as_mark_is_not_skipped(store, db):
+    store.sync(db)
+    # Écrit après la synchronisation, mais horodaté à la même date que le marqueur
+    db.put('t4bis', 4)
+
+    stats = store.sync(db)
+
+    assert 't4bis' in ids(store)
+    assert stats['changed'] == 2
+    assert store.get_high_water_mark() == BASE + timedelta(hours=4)
+
+def test_ticket_matching_several_dates_is_counted_once(store, db):
+    store.sync(db)
+    db.read = 0
+    db.put('t9', 8, date_modification=BASE + timedelta(hours=8), date_reclassification=BASE + timedelta(hours=8))
+
+    stats = store.sync(db)
+
+    # t9 répond aux trois requêtes, t4 (date du marqueur) à une seule
+    assert db.read == 4
+    assert stats['changed'] == 2 and store.count() == 6
+
+def test_naive_dates_are_local_time(store, db):
+    db.documents = {}
+    naive = datetime(2026, 5, 1, 12)
+    db.documents['n1'] = {'titre': 'Naïf', 'dateSoumission': naive}
+
+    store.sync(db)
+
+    assert store.get_high_water_mark() == naive.astimezone()
+
+def test_pages_and_projection(store, db):
+    store.sync(db)
+
+    first = store.get_tickets_page(2, fields=['titre'])
+    assert [ticket['id'] for ticket in first['tickets']] == ['t0', 't1']
+    assert set(first['tickets'][0]) == {'id', 'titre'}
+    assert first['next_start_after'] == 't1'
+
+    last = store.get_tickets_page(3, start_after='t1')
+    assert [ticket['id'] for ticket in last['tickets']] == ['t2', 't3', 't4']
+    assert last['next_start_after'] is None
+
+def test_connector_reads_the_local_copy(monkeypatch, db):
+    import firebase_connector
+
+    monkeypatch.setattr(firebase_connector.firebase_admin, '_apps', {'[DEFAULT]': object()})
+    monkeypatch.setattr(firebase_connector.firestore, 'client', lambda: db)
+    monkeypatch.setattr(firebase_connector.Config, 'TICKET_STORE_ENABLED', True)
+    monkeypatch.setattr(firebase_connector.Config, 'WRITE_BUFFER_ENABLED', False)
+    connector = firebase_connector.FirebaseConnector()
+
+    connector.sync_ticket_store()
+    queries = db.queries
+
+    page = connector.get_tickets_page(3, fields=['titre'])
+    assert [ticket['id'] for ticket in page['tickets']] == ['t0', 't1', 't2']
+    assert [ticket['id'] for ticket in connector.iter_tickets()] == ['t0', 't1', 't2', 't3', 't4']
+    assert len(connector.get_all_tickets()) == 5
+    # Synchronisation récente : aucune requête Firestore
+    assert db.queries == queries
@@ -0,0 +1,124 @@
+import threading
+import time
+
+from training_jobs import RECLASSIFICATION_STAGES, TRAINING_STAGES, TrainingJobManager
+
+# Cibles au niveau du module : un processus 'spawn' les réimporte par leur nom
+
+def _succeed(progress_queue):
+    progress_queue.put(('progress', 'training'))
+    progress_queue.put(('done', {'trained': True, 'samples': 3}))
+
+def _fail(progress_queue):
+    progress_queue.put(('error', "Données illisibles"))
+
+def _exit_silently(progress_queue):
+    return
+
+def _hang(progress_queue):
+    progress_queue.put(('progress', 'training'))
+    time.sleep(60)
+
+_release = threading.Event()
+_halfway = threading.Event()
+
+def _report_items(progress_queue):
+    progress_queue.put(('progress', 'reclassifying'))
+    progress_queue.put(('items', (50, 200)))
+    _halfway.set()
+    _release.wait(30)
+    progress_queue.put(('done', {'trained': False, 'scanned': 200}))
+
+def _hang_in_thread(progress_queue):
+    _release.wait(30)
+
+def _run(manager):
+    job = manager.submit()
+    return manager.wait(job['job_id'], timeout=30)
+
+def test_success_notifies_listeners():
+    manager = TrainingJobManager(target=_succeed, in_process=True)
+    notified = []
+    manager.add_listener(notified.append)
+
+    job = _run(manager)
+
+    assert job['status'] == 'succeeded'
+    assert job['stage'] == 'done' and job['progress'] == TRAINING_STAGES['done']
+    assert job['result'] == {'trained': True, 'samples': 3}
+    assert [notified_job['job_id'] for notified_job in notified] == [job['job_id']]
+
+def test_error_payload_fails_the_job():
+    manager = TrainingJobManager(target=_fail, in_process=True)
+    notified = []
+    manager.add_listener(notified.append)
+
+    job = _run(manager)
+
+    assert job['status'] == 'failed' and job['error'] == "Données illisibles"
+    assert job['finished_at'] is not None and notified == []
+
+def test_worker_exiting_without_result_fails():
+    job = _run(TrainingJobManager(target=_exit_silently, in_process=True))
+    assert job['status'] == 'failed'
+    assert job['error'].startswith("Processus training terminé")
+
+def test_spawn_failure_fails_the_job():
+    # Une lambda ne peut pas être transmise à un processus 'spawn'
+    manager = TrainingJobManager(target=lambda progress_queue: None, in_process=False)
+
+    job = _run(manager)
+
+    assert job['status'] == 'failed'
+    assert job['error'].startswith("Erreur du processus training")
+    assert not manager.is_training()
+
+def test_timeout_stops_the_process():
+    manager = TrainingJobManager(target=_hang, timeout=2, in_process=False)
+
+    started = time.monotonic()
+    job = _run(manager)
+
+    assert job['status'] == 'failed' and job['error'].startswith("Délai dépassé (2s)")
+    assert time.monotonic() - started < 20
+    # Un nouveau job peut être lancé
+    assert not manager.is_training()
+
+def test_timeout_in_thread_mode():
+    manager = TrainingJobManager(target=_hang_in_thread, timeout=1, in_process=True)
+    try:
+        job = _run(manager)
+    finally:
+        _release.set()
+
+    assert job['status'] == 'failed' and job['error'].startswith("Délai dépassé")
+
+def test_one_job_at_a_time():
+    _release.clear()
+    manager = TrainingJobManager(target=_hang_in_thread, in_process=True)
+    try:
+        first, second = manager.submit(), manager.submit()
+        assert second['job_id'] == first['job_id']
+    finally:
+        _release.set()
+    assert manager.wait(first['job_id'], timeout=30)['status'] == 'failed'
+
+def test_items_advance_progress_within_stage():
+    _release.clear()
+    manager = TrainingJobManager(target=_report_items, stages=RECLASSIFICATION_STAGES,
+                                 name='reclassification', in_process=True)
+    job = manager.submit()
+    try:
+        assert _halfway.wait(10)
+        deadline = time.monotonic() + 10
+        while manager.get_job(job['job_id'])['processed'] is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        running = manager.get_job(job['job_id'])
+    finally:
+        _release.set()
+
+    # 'reclassifying' couvre 0.1 -> 1.0 : un quart des tickets traités
+    assert running['stage'] == 'reclassifying'
+    assert (running['processed'], running['total']) == (50, 200)
+    assert running['progress'] == 0.325
+    assert manager.wait(job['job_id'], timeout=30)['progress'] == 1.0
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import training_scheduler
+from config import Config
+from training_scheduler import TrainingScheduler
+
+class CountingStorage:
+    """Stockage qui ne sait que compter les tickets récents"""
+    def __init__(self, count):
+        self.count = count
+        self.since = []
+
+    def count_tickets_since(self, since):
+        self.since.append(since)
+        return self.count
+
+@pytest.fixture
+def storage():
+    return CountingStorage(0)
+
+@pytest.fixture
+def scheduler(monkeypatch, storage):
+    monkeypatch.setattr(training_scheduler, 'get_firebase_connector', lambda: storage)
+    monkeypatch.setattr(training_scheduler, 'get_training_job_manager', lambda: None)
+    monkeypatch.setattr(Config, 'RETRAIN_THRESHOLD', 10)
+    scheduler = TrainingScheduler()
+    scheduler.last_training_date = datetime.now() - timedelta(hours=1)
+    return scheduler
+
+def test_new_tickets_are_counted_since_last_training(scheduler, storage):
+    storage.count = 4
+
+    assert scheduler.check_new_tickets() == 4
+    assert scheduler.new_tickets_count == 4
+    # Date locale explicite : pas de date naïve lue comme UTC par Firestore
+    assert storage.since == [scheduler.last_training_date.astimezone()]
+    assert storage.since[0].tzinfo is not None
+
+def test_count_error_keeps_previous_count(scheduler, storage):
+    storage.count = 4
+    scheduler.check_new_tickets()
+    storage.count = -1
+
+    assert scheduler.check_new_tickets() == 4
+
+def test_retrain_threshold(scheduler, storage):
+    storage.count = 9
+    assert not scheduler.should_retrain()
+
+    storage.count = 10
+    assert scheduler.should_retrain()
+
+def test_retrain_after_a_week_without_new_tickets(scheduler):
+    scheduler.last_training_date = datetime.now() - timedelta(days=8)
+    assert scheduler.should_retrain(new_tickets=0)
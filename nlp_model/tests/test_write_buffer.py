@@ -0,0 +1,166 @@
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip('firebase_admin')
+
+import write_buffer
+from write_buffer import SERVER_TIMESTAMP, WriteBehindBuffer
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.operations = []
+        self.refs = []
+
+    def set(self, ref, data):
+        self.operations.append(('set', ref, data))
+
+    def update(self, ref, data):
+        self.operations.append(('update', ref, data))
+
+    def commit(self):
+        if self.db.errors:
+            raise self.db.errors.pop(0)
+        for _, ref, _ in self.operations:
+            if ref in self.db.rejected:
+                raise self.db.rejected[ref]
+        self.db.commits.append(self.operations)
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+
+    def document(self, document_id):
+        return f"{self.name}/{document_id}"
+
+class FakeFirestore:
+    """Client Firestore minimal : enregistre les commits.
+
+    errors : erreurs levées par les prochains commits, une par commit ;
+    rejected : document -> erreur levée par tout commit qui le contient.
+    """
+    def __init__(self, errors=None, rejected=None):
+        self.commits = []
+        self.errors = list(errors or [])
+        self.rejected = dict(rejected or {})
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+    @property
+    def written(self):
+        return [operation for commit in self.commits for operation in commit]
+
+@pytest.fixture
+def make_buffer(monkeypatch):
+    # Envois déclenchés par les tests uniquement, pas par le thread d'envoi
+    monkeypatch.setattr(WriteBehindBuffer, '_flush_loop', lambda self: None)
+
+    def make(db, **kwargs):
+        return WriteBehindBuffer(db, path='data/write_buffer.db', **kwargs)
+    return make
+
+def test_writes_are_spooled_until_flushed(make_buffer):
+    db = FakeFirestore()
+    buffer = make_buffer(db)
+    document_id = buffer.add('prediction_feedback', {'ticket_id': 't1'})
+    buffer.update('tickets', 't1', {'categorie': 'Autre'})
+
+    assert db.commits == [] and buffer.pending_count() == 2
+    # Relu par un autre processus (ou après redémarrage)
+    assert make_buffer(FakeFirestore()).pending_count() == 2
+
+    assert buffer.flush() == 2
+    assert db.written == [
+        ('set', f'prediction_feedback/{document_id}', {'ticket_id': 't1'}),
+        ('update', 'tickets/t1', {'categorie': 'Autre'})
+    ]
+    assert buffer.pending_count() == 0 and buffer._pending == 0
+
+def test_flush_in_ordered_batches(make_buffer):
+    db = FakeFirestore()
+    buffer = make_buffer(db, max_batch_size=3)
+    for i in range(7):
+        buffer.update('tickets', f't{i}', {'n': i})
+
+    assert buffer.flush() == 7
+    assert [len(commit) for commit in db.commits] == [3, 3, 1]
+    assert [operation[2]['n'] for operation in db.written] == list(range(7))
+
+def test_server_timestamp_placeholder(make_buffer):
+    from firebase_admin import firestore
+
+    db = FakeFirestore()
+    buffer = make_buffer(db)
+    buffer.update('tickets', 't1', {'date_modification': SERVER_TIMESTAMP})
+    buffer.flush()
+
+    assert db.written[0][2]['date_modification'] is firestore.SERVER_TIMESTAMP
+
+def test_transient_error_keeps_writes_for_retry(make_buffer):
+    db = FakeFirestore(errors=[ConnectionError('Firestore injoignable')])
+    buffer = make_buffer(db)
+    buffer.update('tickets', 't1', {'n': 1})
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+    assert buffer.pending_count() == 1 and buffer.failed_commits == 1
+    # Réservation rendue : le prochain essai (de ce processus ou d'un autre) renvoie l'écriture
+    assert make_buffer(db).flush() == 1
+    assert db.written == [('update', 'tickets/t1', {'n': 1})]
+
+def test_permanent_error_drops_only_the_faulty_write(make_buffer):
+    exceptions = pytest.importorskip('google.api_core.exceptions')
+    db = FakeFirestore(rejected={'tickets/t2': exceptions.NotFound('t2')})
+    buffer = make_buffer(db)
+    for i in range(1, 4):
+        buffer.update('tickets', f't{i}', {'n': i})
+
+    assert buffer.flush() == 2
+    assert [operation[1] for operation in db.written] == ['tickets/t1', 'tickets/t3']
+    assert buffer.dropped == 1 and buffer.pending_count() == 0
+
+def test_one_flusher_at_a_time(make_buffer):
+    db = FakeFirestore()
+    first, second = make_buffer(db), make_buffer(db)
+    for i in range(4):
+        first.update('tickets', f't{i}', {'n': i})
+
+    assert first._claim_pending()
+    # Lot réservé par le premier tampon : le second n'envoie rien, même pas la suite
+    assert second.flush() == 0
+    first._release()
+    assert second.flush() == 4
+    assert first.flush() == 0
+    assert len(db.written) == 4
+
+def test_stale_claim_is_taken_over(make_buffer):
+    db = FakeFirestore()
+    crashed, survivor = make_buffer(db), make_buffer(db)
+    crashed.update('tickets', 't1', {'n': 1})
+    crashed._claim_pending()
+
+    with sqlite3.connect('data/write_buffer.db') as connection:
+        connection.execute('UPDATE pending_writes SET claimed_at = ?',
+                           (time.time() - write_buffer.CLAIM_LEASE_SECONDS - 1,))
+
+    assert survivor.flush() == 1
+
+def test_job_processes_write_directly(monkeypatch, make_buffer):
+    import firebase_connector
+    from storage import create_storage
+
+    monkeypatch.setattr(firebase_connector.firebase_admin, '_apps', {'[DEFAULT]': object()})
+    monkeypatch.setattr(firebase_connector.firestore, 'client', FakeFirestore)
+    monkeypatch.setattr(firebase_connector.Config, 'TICKET_STORE_ENABLED', False)
+    monkeypatch.setattr(firebase_connector.Config, 'WRITE_BUFFER_ENABLED', True)
+
+    api_storage = create_storage('firebase')
+    assert isinstance(api_storage.write_buffer, WriteBehindBuffer)
+    # Un processus de job ne réserve jamais les écritures en attente de l'API
+    assert create_storage('firebase', buffered_writes=False).write_buffer is None
@@ -1,50 +1,64 @@
 import re
 import string
-from typing import List
+from typing import List, Union
 import logging
 
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Mots vides en français et anglais
+STOP_WORDS = frozenset({
+    'le', 'la', 'les', 'un', 'une', 'des', 'ce', 'ces', 'cette', 'mon', 'ma', 'mes',
+    'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'notre', 'votre', 'leur', 'leurs',
+    'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles', 'me', 'te', 'se',
+    'lui', 'leur', 'moi', 'toi', 'soi', 'eux', 'elles', 'ceci', 'cela', 'ça',
+    'qui', 'que', 'quoi', 'dont', 'où', 'quand', 'comment', 'pourquoi',
+    'et', 'ou', 'mais', 'donc', 'car', 'ni', 'or', 'puis', 'ensuite',
+    'de', 'du', 'des', 'à', 'au', 'aux', 'en', 'dans', 'sur', 'sous', 'avec',
+    'sans', 'par', 'pour', 'vers', 'depuis', 'jusqu', 'pendant', 'avant', 'après',
+    'être', 'avoir', 'faire', 'dire', 'aller', 'voir', 'savoir', 'pouvoir',
+    'vouloir', 'devoir', 'falloir', 'valoir', 'paraître', 'sembler', 'rester',
+    'devenir', 'rendre', 'tenir', 'venir', 'sortir', 'partir', 'arriver',
+    'entrer', 'monter', 'descendre', 'passer', 'tourner', 'retourner',
+    'comme', 'ainsi', 'alors', 'donc', 'puis', 'ensuite', 'alors', 'donc',
+    'bien', 'mal', 'mieux', 'pire', 'plus', 'moins', 'très', 'trop', 'assez',
+    'peu', 'beaucoup', 'trop', 'trop', 'trop', 'trop', 'trop', 'trop',
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'between', 'among', 'within',
+    'without', 'against', 'toward', 'towards', 'upon', 'across', 'behind',
+    'beneath', 'beside', 'beyond', 'inside', 'outside', 'under', 'over',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
+    'can', 'must', 'shall', 'this', 'that', 'these', 'those', 'i', 'you',
+    'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours',
+    'his', 'hers', 'ours', 'theirs', 'myself', 'yourself', 'himself',
+    'herself', 'itself', 'ourselves', 'yourselves', 'themselves'
+})
+
+# Mots spécifiques au domaine des tickets
+DOMAIN_STOP_WORDS = frozenset({
+    'ticket', 'problème', 'aide', 'support', 'demande', 'question',
+    'erreur', 'bug', 'fonctionnalité', 'système', 'application'
+})
+
+ALL_STOP_WORDS = STOP_WORDS | DOMAIN_STOP_WORDS
+
+# Un token est une suite de caractères de mot hors chiffres : équivaut à la
+# suppression de la ponctuation puis des chiffres faite par clean_text
+TOKEN_PATTERN = re.compile(r'[^\W\d]+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+DIGITS_PATTERN = re.compile(r'\d+')
+SPACES_PATTERN = re.compile(r'\s+')
+
 class TextPreprocessor:
     def __init__(self):
         """Initialise le préprocesseur de texte"""
-        # Mots vides en français et anglais
-        self.stop_words = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'ce', 'ces', 'cette', 'mon', 'ma', 'mes',
-            'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'notre', 'votre', 'leur', 'leurs',
-            'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles', 'me', 'te', 'se',
-            'lui', 'leur', 'moi', 'toi', 'soi', 'eux', 'elles', 'ceci', 'cela', 'ça',
-            'qui', 'que', 'quoi', 'dont', 'où', 'quand', 'comment', 'pourquoi',
-            'et', 'ou', 'mais', 'donc', 'car', 'ni', 'or', 'puis', 'ensuite',
-            'de', 'du', 'des', 'à', 'au', 'aux', 'en', 'dans', 'sur', 'sous', 'avec',
-            'sans', 'par', 'pour', 'vers', 'depuis', 'jusqu', 'pendant', 'avant', 'après',
-            'être', 'avoir', 'faire', 'dire', 'aller', 'voir', 'savoir', 'pouvoir',
-            'vouloir', 'devoir', 'falloir', 'valoir', 'paraître', 'sembler', 'rester',
-            'devenir', 'rendre', 'tenir', 'venir', 'sortir', 'partir', 'arriver',
-            'entrer', 'monter', 'descendre', 'passer', 'tourner', 'retourner',
-            'comme', 'ainsi', 'alors', 'donc', 'puis', 'ensuite', 'alors', 'donc',
-            'bien', 'mal', 'mieux', 'pire', 'plus', 'moins', 'très', 'trop', 'assez',
-            'peu', 'beaucoup', 'trop', 'trop', 'trop', 'trop', 'trop', 'trop',
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'between', 'among', 'within',
-            'without', 'against', 'toward', 'towards', 'upon', 'across', 'behind',
-            'beneath', 'beside', 'beyond', 'inside', 'outside', 'under', 'over',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
-            'can', 'must', 'shall', 'this', 'that', 'these', 'those', 'i', 'you',
-            'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-            'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours',
-            'his', 'hers', 'ours', 'theirs', 'myself', 'yourself', 'himself',
-            'herself', 'itself', 'ourselves', 'yourselves', 'themselves'
-        }
-        
-        # Mots spécifiques au domaine des tickets
-        self.domain_stop_words = {
-            'ticket', 'problème', 'aide', 'support', 'demande', 'question',
-            'erreur', 'bug', 'fonctionnalité', 'système', 'application'
-        }
-        self.stop_words.update(self.domain_stop_words)
+        # Ensembles figés partagés par toutes les instances
+        self.stop_words = ALL_STOP_WORDS
+        self.domain_stop_words = DOMAIN_STOP_WORDS
     
     def clean_text(self, text: str) -> str:
         """Nettoie le texte en supprimant les caractères spéciaux et normalisant"""
@@ -55,11 +69,11 @@ class TextPreprocessor:
         text = text.lower()
         
         # Supprimer les caractères spéciaux et chiffres
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\d+', ' ', text)
+        text = PUNCTUATION_PATTERN.sub(' ', text)
+        text = DIGITS_PATTERN.sub(' ', text)
         
         # Supprimer les espaces multiples
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = SPACES_PATTERN.sub(' ', text).strip()
         
         return text
     
@@ -70,26 +84,39 @@ class TextPreprocessor:
     def preprocess(self, text: str) -> str:
         """Prétraite complètement un texte"""
         try:
-            # Nettoyer le texte
-            cleaned_text = self.clean_text(text)
-            
-            # Tokeniser (séparer par espaces)
-            tokens = cleaned_text.split()
+            if not text or not isinstance(text, str):
+                return ""
             
-            # Supprimer les mots vides
-            tokens = self.remove_stopwords(tokens)
-            
-            # Filtrer les tokens trop courts
-            tokens = [token for token in tokens if len(token) > 2]
-            
-            # Rejoindre en texte
-            processed_text = ' '.join(tokens)
-            
-            return processed_text
+            # Tokenisation, filtrage des mots vides et des tokens trop courts en une passe
+            stop_words = self.stop_words
+            return ' '.join([
+                token for token in TOKEN_PATTERN.findall(text.lower())
+                if len(token) > 2 and token not in stop_words
+            ])
         except Exception as e:
             logger.error(f"Erreur lors du prétraitement: {e}")
             return text
     
+    def preprocess_batch(self, texts: Union[pd.Series, List[str]]) -> Union[pd.Series, List[str]]:
+        """Prétraite un lot de textes (Series pandas ou liste)"""
+        values = texts.tolist() if isinstance(texts, pd.Series) else list(texts)
+        
+        findall = TOKEN_PATTERN.findall
+        stop_words = self.stop_words
+        processed = []
+        for text in values:
+            if not text or not isinstance(text, str):
+                processed.append("")
+                continue
+            processed.append(' '.join([
+                token for token in findall(text.lower())
+                if len(token) > 2 and token not in stop_words
+            ]))
+        
+        if isinstance(texts, pd.Series):
+            return pd.Series(processed, index=texts.index, name=texts.name)
+        return processed
+    
     def extract_keywords(self, text: str, top_k: int = 10) -> List[str]:
         """Extrait les mots-clés les plus importants d'un texte"""
         try:
@@ -2,7 +2,6 @@ import joblib
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
 from sklearn.preprocessing import LabelEncoder
@@ -12,45 +11,145 @@ import os
 from datetime import datetime
 
 from config import Config
+from estimators import make_estimator
 from text_preprocessor import TextPreprocessor
-from firebase_connector import FirebaseConnector
+from model_bundle import ModelBundle, save_bundle, load_bundle, bundle_exists, read_manifest
+from prediction_cache import PredictionCache
+from registry import get_firebase_connector
 
 logger = logging.getLogger(__name__)
 
+def make_vectorizer() -> TfidfVectorizer:
+    """Vectoriseur TF-IDF (non entraîné) du mode 'batch'.
+
+    Calcul en float64 dans tous les modes : un TF-IDF calculé en float32 donne
+    des valeurs légèrement différentes, qui changent la prédiction des tickets
+    proches d'un seuil de coupure des arbres.
+    """
+    return TfidfVectorizer(
+        max_features=Config.MAX_FEATURES,
+        ngram_range=Config.N_GRAM_RANGE,
+        stop_words='english'
+    )
+
+def build_model_bundle(training_data: pd.DataFrame, preprocessor: TextPreprocessor = None,
+                       backend: str = None, compact: bool = None) -> Tuple[ModelBundle, Any, Any]:
+    """Entraîne un nouveau modèle complet sans toucher au modèle actif.
+
+    Estimateur Config.ESTIMATOR_BACKEND et mode Config.COMPACT_MODEL par défaut.
+    """
+    preprocessor = preprocessor or TextPreprocessor()
+    compact = Config.COMPACT_MODEL if compact is None else compact
+    
+    # Prétraiter les textes
+    training_data['processed_text'] = preprocessor.preprocess_batch(training_data['text'])
+    
+    # Encoder les catégories
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(training_data['category'])
+    
+    # Vectoriser les textes
+    vectorizer = make_vectorizer()
+    X = vectorizer.fit_transform(training_data['processed_text'])
+    if compact:
+        # Les arbres convertissent les features en float32 avant de les comparer : la
+        # conversion faite ici, après le calcul en float64, ne change pas le modèle et
+        # divise par deux la matrice d'entraînement
+        X = X.astype(np.float32)
+    
+    # Entraîner le classifieur
+    classifier = make_estimator(y, backend, compact)
+    classifier.fit(X, y)
+    
+    return ModelBundle(vectorizer, classifier, label_encoder), X, y
+
 class TicketClassifier:
-    def __init__(self):
-        """Initialise le classifieur de tickets"""
+    def __init__(self, auto_load: bool = True, firebase_connector=None):
+        """Initialise le classifieur de tickets (auto_load=False : chargement différé via load_or_create_model).
+        
+        Sans connecteur fourni, le client de stockage partagé du processus est utilisé.
+        """
         self.preprocessor = TextPreprocessor()
-        self.vectorizer = None
-        self.classifier = None
-        self.label_encoder = None
-        self.firebase_connector = FirebaseConnector()
+        # Modèle actif, remplacé en bloc par une seule affectation
+        self.bundle = None
+        self.prediction_cache = PredictionCache()
+        self.firebase_connector = firebase_connector or get_firebase_connector()
+        # Entraînements cumulés, relus dans le manifeste du modèle chargé
         self.training_count = 0
+        # Passe à True une fois le modèle chargé (ou entraîné) et préchauffé
+        self.ready = False
         
         # Créer les dossiers nécessaires
         os.makedirs('models', exist_ok=True)
         os.makedirs('data', exist_ok=True)
         
         # Charger ou créer le modèle
-        self.load_or_create_model()
+        if auto_load:
+            self.load_or_create_model()
+    
+    @property
+    def classifier(self):
+        return self.bundle.classifier if self.bundle else None
+    
+    @property
+    def vectorizer(self):
+        return self.bundle.vectorizer if self.bundle else None
+    
+    @property
+    def label_encoder(self):
+        return self.bundle.label_encoder if self.bundle else None
+    
+    @property
+    def engine(self):
+        return self.bundle.engine if self.bundle else None
+    
+    @property
+    def model_version(self):
+        return self.bundle.version if self.bundle else None
     
     def load_or_create_model(self):
         """Charge un modèle existant ou en crée un nouveau"""
+        loaded = False
         try:
-            if (os.path.exists(Config.MODEL_PATH) and 
-                os.path.exists(Config.VECTORIZER_PATH) and 
-                os.path.exists(Config.ENCODER_PATH)):
-                
-                self.classifier = joblib.load(Config.MODEL_PATH)
-                self.vectorizer = joblib.load(Config.VECTORIZER_PATH)
-                self.label_encoder = joblib.load(Config.ENCODER_PATH)
-                logger.info("Modèle chargé avec succès")
+            if bundle_exists():
+                self.bundle = load_bundle()
+                self._refresh_training_count()
+                loaded = True
+                logger.info(f"Modèle {self.model_version} chargé avec succès")
             else:
                 logger.info("Création d'un nouveau modèle")
                 self.create_initial_model()
         except Exception as e:
             logger.error(f"Erreur lors du chargement du modèle: {e}")
             self.create_initial_model()
+        
+        if not self.warm_up() and loaded:
+            # Modèle sauvegardé inutilisable (version de scikit-learn différente, fichier
+            # incohérent...) : repartir du modèle initial plutôt que rester indisponible
+            logger.warning("Modèle sauvegardé inutilisable, création d'un nouveau modèle")
+            self.create_initial_model()
+            self.warm_up()
+    
+    def _warm_up_bundle(self, bundle: ModelBundle) -> bool:
+        """Exécute une première prédiction sur un modèle ; False s'il ne sait pas prédire"""
+        try:
+            bundle.engine.predict(self.preprocessor.preprocess_batch(["Je ne peux pas me connecter"]))
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors du préchauffage du modèle {bundle.version}: {e}")
+            return False
+    
+    def warm_up(self) -> bool:
+        """Exécute une première prédiction pour que les requêtes suivantes ne paient pas l'initialisation"""
+        bundle = self.bundle
+        if not bundle:
+            logger.error("Préchauffage impossible: modèle non initialisé")
+            return False
+        
+        self.ready = self._warm_up_bundle(bundle)
+        if self.ready:
+            logger.info("Modèle préchauffé, prêt à servir")
+        return self.ready
     
     def create_initial_model(self):
         """Crée un modèle initial avec des données d'exemple"""
@@ -114,30 +213,15 @@ class TicketClassifier:
                 logger.warning("Aucune donnée d'entraînement fournie")
                 return
             
-            # Prétraiter les textes
-            training_data['processed_text'] = training_data['text'].apply(
-                self.preprocessor.preprocess
-            )
-            
-            # Encoder les catégories
-            self.label_encoder = LabelEncoder()
-            y = self.label_encoder.fit_transform(training_data['category'])
-            
-            # Vectoriser les textes
-            self.vectorizer = TfidfVectorizer(
-                max_features=Config.MAX_FEATURES,
-                ngram_range=Config.N_GRAM_RANGE,
-                stop_words='english'
-            )
-            X = self.vectorizer.fit_transform(training_data['processed_text'])
-            
-            # Entraîner le classifieur
-            self.classifier = RandomForestClassifier(
-                n_estimators=100,
-                random_state=42,
-                n_jobs=-1
-            )
-            self.classifier.fit(X, y)
+            if Config.MODEL_MODE == 'incremental':
+                from incremental_model import build_incremental_bundle
+                bundle, X, y = build_incremental_bundle(training_data, self.preprocessor)
+            else:
+                bundle, X, y = build_model_bundle(training_data, self.preprocessor)
+            
+            # Remplacer le modèle actif en une seule affectation : les prédictions en
+            # cours gardent l'ancien modèle complet, les suivantes voient le nouveau
+            self.bundle = bundle
             
             # Sauvegarder le modèle
             self.save_model()
@@ -146,60 +230,89 @@ class TicketClassifier:
             self.evaluate_model(X, y)
             
             self.training_count += 1
+            self._refresh_training_count()
             logger.info(f"Modèle entraîné avec succès (entraînement #{self.training_count})")
             
         except Exception as e:
             logger.error(f"Erreur lors de l'entraînement: {e}")
     
+    def reload_model(self) -> bool:
+        """Recharge le modèle sauvegardé (entraîné ailleurs) sans redémarrage.
+        
+        Le nouveau modèle est préchauffé avant d'être activé : s'il ne sait pas
+        prédire, le modèle actif est conservé. Un rechargement réussi rend le
+        service prêt, y compris après un échec au démarrage.
+        """
+        # Éviter de désérialiser le modèle s'il n'a pas changé
+        manifest = read_manifest()
+        if self.bundle and manifest and manifest.get('version') == self.bundle.version:
+            logger.info(f"Modèle {self.bundle.version} déjà actif")
+            return False
+        
+        candidate = load_bundle()
+        if not self._warm_up_bundle(candidate):
+            logger.error(f"Modèle {candidate.version} rejeté, le modèle {self.model_version} reste actif")
+            return False
+        
+        self.bundle = candidate
+        self.ready = True
+        self._refresh_training_count()
+        logger.info(f"Modèle {self.bundle.version} rechargé")
+        return True
+    
+    def _refresh_training_count(self):
+        """Relit le nombre d'entraînements dans le manifeste du modèle actif,
+        entraînements faits dans un autre processus compris"""
+        manifest = read_manifest()
+        if manifest and manifest.get('version') == self.model_version and 'training_count' in manifest:
+            self.training_count = manifest['training_count']
+    
     def predict(self, text: str) -> Dict[str, Any]:
         """Prédit la catégorie d'un ticket"""
+        return self.predict_many([text])[0]
+    
+    def predict_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Prédit la catégorie d'un lot de tickets en une seule passe du modèle"""
         try:
-            if not self.classifier or not self.vectorizer or not self.label_encoder:
+            # Une seule lecture de la référence : tout le lot utilise le même modèle
+            bundle = self.bundle
+            if not bundle:
                 raise ValueError("Modèle non initialisé")
+            engine, model_version = bundle.engine, bundle.version
             
-            # Prétraiter le texte
-            processed_text = self.preprocessor.preprocess(text)
-            
-            # Vectoriser
-            X = self.vectorizer.transform([processed_text])
+            if not texts:
+                return []
             
-            # Prédire
-            prediction = self.classifier.predict(X)[0]
-            probabilities = self.classifier.predict_proba(X)[0]
-            
-            # Obtenir la catégorie prédite
-            predicted_category = self.label_encoder.inverse_transform([prediction])[0]
+            # Prétraiter les textes
+            processed_texts = self.preprocessor.preprocess_batch(texts)
             
-            # Obtenir la confiance
-            confidence = float(np.max(probabilities))
+            # Servir depuis le cache les textes déjà vus avec ce modèle
+            keys = [PredictionCache.make_key(model_version, processed) for processed in processed_texts]
+            predictions = [self.prediction_cache.get(key) for key in keys]
+            misses = [i for i, prediction in enumerate(predictions) if prediction is None]
             
-            # Obtenir les top 3 catégories
-            top_indices = np.argsort(probabilities)[-3:][::-1]
-            top_categories = []
-            for idx in top_indices:
-                category = self.label_encoder.inverse_transform([idx])[0]
-                prob = float(probabilities[idx])
-                top_categories.append({
-                    'category': category,
-                    'confidence': prob
-                })
+            if misses:
+                # Une seule vectorisation et une seule évaluation de la forêt pour les textes restants ;
+                # les mots-clés sont lus sur les mêmes lignes TF-IDF que celles vues par le modèle
+                miss_texts = [processed_texts[i] for i in misses]
+                X = engine.transform(miss_texts)
+                computed = engine.predict_matrix(X, miss_texts)
+                for i, prediction in zip(misses, computed):
+                    self.prediction_cache.put(keys[i], prediction)
+                    predictions[i] = prediction
             
-            return {
-                'predicted_category': predicted_category,
-                'confidence': confidence,
-                'top_categories': top_categories,
-                'needs_human_review': confidence < Config.MIN_CONFIDENCE_THRESHOLD
-            }
+            return predictions
             
         except Exception as e:
             logger.error(f"Erreur lors de la prédiction: {e}")
-            return {
+            return [{
                 'predicted_category': 'Autre',
                 'confidence': 0.0,
                 'top_categories': [],
                 'needs_human_review': True,
+                'keywords': [],
                 'error': str(e)
-            }
+            } for _ in texts]
     
     def evaluate_model(self, X, y):
         """Évalue les performances du modèle"""
@@ -219,9 +332,7 @@ class TicketClassifier:
     def save_model(self):
         """Sauvegarde le modèle entraîné"""
         try:
-            joblib.dump(self.classifier, Config.MODEL_PATH)
-            joblib.dump(self.vectorizer, Config.VECTORIZER_PATH)
-            joblib.dump(self.label_encoder, Config.ENCODER_PATH)
+            save_bundle(self.bundle)
             logger.info("Modèle sauvegardé avec succès")
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde: {e}")
@@ -229,10 +340,14 @@ class TicketClassifier:
     def retrain_with_new_data(self):
         """Réentraîne le modèle avec les nouvelles données de Firebase"""
         try:
+            if Config.MODEL_MODE == 'incremental':
+                self.update_incremental()
+                return
+            
             # Récupérer les données de Firebase
             training_data = self.firebase_connector.get_tickets_for_training()
             
-            if len(training_data) > 10:  # Minimum de données pour l'entraînement
+            if len(training_data) > Config.MIN_TRAINING_SAMPLES:
                 logger.info(f"Réentraînement avec {len(training_data)} tickets")
                 self.train_model(training_data)
             else:
@@ -241,12 +356,33 @@ class TicketClassifier:
         except Exception as e:
             logger.error(f"Erreur lors du réentraînement: {e}")
     
+    def update_incremental(self):
+        """Applique au modèle incrémental les tickets et feedbacks arrivés depuis la dernière mise à jour"""
+        from incremental_model import run_incremental_update, save_incremental_state
+        
+        bundle, stats, state = run_incremental_update(
+            self.firebase_connector, self.bundle, self.preprocessor
+        )
+        if bundle is None:
+            # Rien d'applicable : l'état avance quand même pour ne pas relire les mêmes données
+            save_incremental_state(state)
+            logger.info("Aucune nouvelle donnée pour la mise à jour incrémentale")
+            return
+        
+        self.bundle = bundle
+        self.save_model()
+        save_incremental_state(state)
+        self.training_count += 1
+        self._refresh_training_count()
+        logger.info(f"Mise à jour incrémentale appliquée: {stats}")
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Retourne les informations sur le modèle"""
         return {
             'training_count': self.training_count,
-            'last_training': datetime.now().isoformat(),
+            'last_training': self.bundle.trained_at if self.bundle else datetime.now().isoformat(),
             'categories': list(self.label_encoder.classes_) if self.label_encoder else [],
             'total_tickets': self.firebase_connector.get_tickets_count(),
+            'model_version': self.model_version,
             'model_path': Config.MODEL_PATH
         } 
\ No newline at end of file
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Champs Firestore utilisés comme marqueur de modification
+SYNC_DATE_FIELDS = ('dateSoumission', 'date_modification', 'date_reclassification')
+
+def _encode_value(value: Any) -> Any:
+    """Sérialise les types Firestore non JSON (dates, références...)"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    return str(value)
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if '__datetime__' in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+def encode_ticket(ticket: Dict[str, Any]) -> str:
+    return json.dumps(ticket, default=_encode_value, ensure_ascii=False)
+
+def decode_ticket(data: str) -> Dict[str, Any]:
+    return json.loads(data, object_hook=_decode_object)
+
+class LocalTicketStore:
+    def __init__(self, path: str = Config.TICKET_STORE_PATH):
+        """Copie locale (SQLite) de la collection `tickets`, synchronisée par incréments"""
+        self.path = path
+        self._sync_lock = threading.Lock()
+        self.last_sync = 0.0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par opération : le store est utilisé depuis plusieurs threads
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+    def _create_schema(self):
+        with closing(self._connect()) as connection, connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS tickets (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    synced_at TEXT NOT NULL
+                )
+            ''')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+
+    def _get_state(self, key: str) -> Optional[datetime]:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT value FROM sync_state WHERE key = ?', (key,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def _set_state(self, connection: sqlite3.Connection, key: str, value: datetime):
+        connection.execute(
+            'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+            (key, value.isoformat())
+        )
+
+    def get_high_water_mark(self) -> Optional[datetime]:
+        """Date de modification la plus récente déjà synchronisée"""
+        return self._get_state('high_water_mark')
+
+    def upsert_tickets(self, tickets: Iterable[Dict[str, Any]],
+                       high_water_mark: Optional[datetime] = None,
+                       replace_all: bool = False) -> int:
+        """Enregistre des tickets (et le nouveau marqueur) dans une seule transaction"""
+        now = datetime.now().isoformat()
+        rows = [(ticket['id'], encode_ticket(ticket), now) for ticket in tickets]
+        with closing(self._connect()) as connection, connection:
+            if replace_all:
+                connection.execute('DELETE FROM tickets')
+            connection.executemany(
+                'INSERT OR REPLACE INTO tickets (id, data, synced_at) VALUES (?, ?, ?)',
+                rows
+            )
+            if high_water_mark:
+                self._set_state(connection, 'high_water_mark', high_water_mark)
+            if replace_all:
+                self._set_state(connection, 'last_full_sync', datetime.now().astimezone())
+        return len(rows)
+
+    def sync(self, db, force_full: bool = False) -> Dict[str, Any]:
+        """Récupère depuis Firestore les seuls tickets créés ou modifiés depuis la dernière synchronisation.
+
+        Les suppressions et les modifications qui ne touchent pas `date_modification`
+        ne sont pas vues par la synchronisation incrémentale : une resynchronisation
+        complète a lieu toutes les TICKET_STORE_FULL_SYNC_HOURS heures.
+        """
+        with self._sync_lock:
+            started = time.monotonic()
+            high_water_mark = self.get_high_water_mark()
+            last_full_sync = self._get_state('last_full_sync')
+            full = (force_full or high_water_mark is None or last_full_sync is None or
+                    (datetime.now().astimezone() - last_full_sync).total_seconds()
+                    > Config.TICKET_STORE_FULL_SYNC_HOURS * 3600)
+
+            tickets_ref = db.collection('tickets')
+            if full:
+                queries = [tickets_ref]
+            else:
+                # Bornes inclusives : un ticket à la date exacte du marqueur est simplement réécrit
+                queries = [tickets_ref.where(field, '>=', high_water_mark) for field in SYNC_DATE_FIELDS]
+
+            # Dédoublonnage par identifiant : un ticket peut répondre à plusieurs requêtes
+            changed = {}
+            for query in queries:
+                for doc in query.stream():
+                    ticket = doc.to_dict()
+                    ticket['id'] = doc.id
+                    changed[doc.id] = ticket
+
+            new_mark = high_water_mark
+            for ticket in changed.values():
+                for field in SYNC_DATE_FIELDS:
+                    value = ticket.get(field)
+                    if isinstance(value, datetime):
+                        if value.tzinfo is None:
+                            value = value.astimezone()
+                        if new_mark is None or value > new_mark:
+                            new_mark = value
+
+            self.upsert_tickets(changed.values(), new_mark, replace_all=full)
+
+            self.last_sync = time.time()
+
+            stats = {
+                'full': full,
+                'changed': len(changed),
+                'high_water_mark': new_mark.isoformat() if new_mark else None,
+                'duration_seconds': round(time.monotonic() - started, 3)
+            }
+            logger.info(f"Synchronisation des tickets: {stats}")
+            return stats
+
+    def sync_if_stale(self, db) -> Optional[Dict[str, Any]]:
+        """Synchronise si la dernière synchronisation date de plus de TICKET_STORE_SYNC_INTERVAL secondes"""
+        if time.time() - self.last_sync < Config.TICKET_STORE_SYNC_INTERVAL:
+            return None
+        return self.sync(db)
+
+    def get_tickets_page(self, limit: int, start_after: Optional[str] = None,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Page de la copie locale ordonnée par identifiant, comme FirebaseConnector.get_tickets_page"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                'SELECT data FROM tickets WHERE id > ? ORDER BY id LIMIT ?',
+                (start_after or '', limit + 1)
+            ).fetchall()
+        page = [decode_ticket(row[0]) for row in rows]
+        if fields:
+            page = [{**{field: ticket[field] for field in fields if field in ticket}, 'id': ticket['id']}
+                    for ticket in page]
+
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {
+            'tickets': page,
+            'count': len(page),
+            'next_start_after': page[-1]['id'] if has_more else None
+        }
+
+    def get_all_tickets(self) -> List[Dict[str, Any]]:
+        """Retourne tous les tickets de la copie locale"""
+        with closing(self._connect()) as connection:
+            return [decode_ticket(row[0]) for row in connection.execute('SELECT data FROM tickets')]
+
+    def count(self) -> int:
+        """Nombre de tickets de la copie locale"""
+        with closing(self._connect()) as connection:
+            return connection.execute('SELECT COUNT(*) FROM tickets').fetchone()[0]
@@ -0,0 +1,406 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Étapes d'un entraînement et avancement associé
+TRAINING_STAGES = {
+    'starting': 0.0,
+    'loading_data': 0.1,
+    'training': 0.3,
+    'saving': 0.9,
+    'done': 1.0
+}
+
+# Étapes d'une reclassification des tickets stockés
+RECLASSIFICATION_STAGES = {
+    'starting': 0.0,
+    'loading_model': 0.05,
+    'reclassifying': 0.1,
+    'done': 1.0
+}
+
+def _in_child_process() -> bool:
+    """True dans un processus de job ; False quand le job tourne dans un thread du serveur"""
+    return threading.current_thread() is threading.main_thread()
+
+def _job_storage():
+    """Stockage utilisé par un job : celui du serveur en mode thread, sinon un client propre au processus.
+
+    Le client d'un processus de job n'a pas d'envoi différé : le fichier des
+    écritures en attente est celui de l'API, et un job arrêté en plein envoi y
+    laisserait une réservation bloquant les envois de l'API.
+    """
+    if not _in_child_process():
+        from registry import get_firebase_connector
+        return get_firebase_connector()
+    from storage import create_storage
+    return create_storage(buffered_writes=False)
+
+def _close_job_storage(connector):
+    """Libère le client créé par le processus du job (celui du serveur reste ouvert)"""
+    if connector is not None and _in_child_process():
+        connector.close()
+
+def _training_worker(progress_queue):
+    """Point d'entrée du processus d'entraînement : entraîne et sauvegarde un nouveau modèle"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    def report(stage: str):
+        progress_queue.put(('progress', stage))
+
+    connector = None
+    try:
+        # Laisser la priorité au serveur qui partage la machine
+        if Config.TRAINING_NICE and hasattr(os, 'nice') and _in_child_process():
+            os.nice(Config.TRAINING_NICE)
+
+        # Imports lourds uniquement dans le processus d'entraînement
+        from ticket_classifier import build_model_bundle
+        from model_bundle import save_bundle
+
+        connector = _job_storage()
+        if Config.MODEL_MODE == 'incremental':
+            _incremental_update(connector, progress_queue)
+            return
+
+        report('loading_data')
+        training_data = connector.get_tickets_for_training()
+
+        if len(training_data) <= Config.MIN_TRAINING_SAMPLES:
+            progress_queue.put(('done', {
+                'trained': False,
+                'samples': len(training_data),
+                'reason': "Pas assez de données pour le réentraînement"
+            }))
+            return
+
+        report('training')
+        bundle, _, _ = build_model_bundle(training_data)
+
+        report('saving')
+        save_bundle(bundle)
+
+        progress_queue.put(('done', {
+            'trained': True,
+            'samples': len(training_data),
+            'model_version': bundle.version
+        }))
+    except Exception as e:
+        progress_queue.put(('error', str(e)))
+    finally:
+        _close_job_storage(connector)
+
+def _incremental_update(connector, progress_queue):
+    """Met à jour le modèle incrémental sauvegardé avec les seules nouvelles données"""
+    from incremental_model import run_incremental_update, save_incremental_state
+    from model_bundle import bundle_exists, load_bundle, save_bundle
+
+    progress_queue.put(('progress', 'loading_data'))
+    current = load_bundle() if bundle_exists() else None
+
+    progress_queue.put(('progress', 'training'))
+    bundle, stats, state = run_incremental_update(connector, current)
+    if bundle is None:
+        # Rien d'applicable : l'état avance quand même pour ne pas relire les mêmes données
+        save_incremental_state(state)
+        progress_queue.put(('done', {
+            'trained': False,
+            'reason': "Aucune nouvelle donnée",
+            **stats
+        }))
+        return
+
+    progress_queue.put(('progress', 'saving'))
+    save_bundle(bundle)
+    save_incremental_state(state)
+
+    progress_queue.put(('done', {
+        'trained': True,
+        'model_version': bundle.version,
+        **stats
+    }))
+
+def _reclassification_worker(progress_queue):
+    """Point d'entrée du processus de reclassification : reclasse les tickets avec le modèle sauvegardé"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    connector = None
+    try:
+        if Config.TRAINING_NICE and hasattr(os, 'nice') and _in_child_process():
+            os.nice(Config.TRAINING_NICE)
+
+        from model_bundle import load_bundle
+        from reclassification import run_reclassification
+
+        progress_queue.put(('progress', 'loading_model'))
+        bundle = load_bundle()
+        connector = _job_storage()
+        # Total indicatif pour l'avancement (-1 si le comptage échoue)
+        total = connector.get_tickets_count()
+
+        def report_chunk(checkpoint: Dict[str, Any]):
+            progress_queue.put(('items', (checkpoint['scanned'], total if total > 0 else None)))
+
+        progress_queue.put(('progress', 'reclassifying'))
+        checkpoint = run_reclassification(connector, bundle, on_chunk=report_chunk)
+
+        progress_queue.put(('done', {
+            'trained': False,
+            'model_version': bundle.version,
+            **{key: checkpoint[key] for key in ('scanned', 'updated', 'skipped_unchanged', 'skipped_manual')}
+        }))
+    except Exception as e:
+        progress_queue.put(('error', str(e)))
+    finally:
+        _close_job_storage(connector)
+
+def _stop_process(process, grace: float = 5.0):
+    """Attend la sortie d'un processus de job, puis l'arrête s'il ne se termine pas"""
+    process.join(grace)
+    if isinstance(process, threading.Thread):
+        # Un thread ne s'interrompt pas : il finira seul, son résultat sera ignoré
+        return
+    if process.is_alive():
+        process.terminate()
+        process.join(5.0)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+class TrainingJobManager:
+    def __init__(self, target: Callable = _training_worker, stages: Dict[str, float] = None,
+                 name: str = 'training', timeout: Optional[float] = None,
+                 in_process: Optional[bool] = None):
+        """Lance des jobs (réentraînement par défaut) dans un processus séparé et suit leur avancement.
+        
+        Un job qui dépasse timeout secondes (Config.TRAINING_JOB_TIMEOUT par défaut,
+        0 pour aucune limite) est arrêté et marqué en échec.
+        
+        in_process (par défaut : stockage 'memory') exécute le job dans un thread
+        du processus courant : un processus séparé créerait son propre stockage en
+        mémoire et ne verrait ni les tickets ni les feedbacks reçus par l'API. Un
+        job en thread dépassant le délai est marqué en échec mais ne peut pas être
+        interrompu.
+        """
+        self.target = target
+        self.stages = stages or TRAINING_STAGES
+        self.name = name
+        self.timeout = Config.TRAINING_JOB_TIMEOUT if timeout is None else timeout
+        self.in_process = Config.STORAGE_BACKEND == 'memory' if in_process is None else in_process
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], Any]] = []
+        self._context = multiprocessing.get_context('spawn')
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], Any]):
+        """Enregistre une fonction appelée quand un nouveau modèle est disponible"""
+        self._listeners.append(callback)
+
+    def submit(self) -> Dict[str, Any]:
+        """Lance un réentraînement, ou retourne celui déjà en cours"""
+        with self._lock:
+            running = self._get_running_job()
+            if running:
+                logger.info(f"Job {self.name} {running['job_id']} déjà en cours")
+                return dict(running)
+
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'status': 'running',
+                'stage': 'starting',
+                'progress': self.stages['starting'],
+                'submitted_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'duration_seconds': None,
+                'result': None,
+                'error': None,
+                'processed': None,
+                'total': None
+            }
+            self._jobs[job['job_id']] = job
+            while len(self._jobs) > Config.TRAINING_JOBS_HISTORY:
+                self._jobs.popitem(last=False)
+
+        thread = threading.Thread(target=self._run_job, args=(job['job_id'],), daemon=True)
+        thread.start()
+        logger.info(f"Job {self.name} {job['job_id']} lancé "
+                    f"{'dans un thread du serveur' if self.in_process else 'dans un processus séparé'}")
+        return dict(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'état d'un job (étape, avancement, durée)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Retourne les jobs récents, du plus ancien au plus récent"""
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def is_training(self) -> bool:
+        with self._lock:
+            return self._get_running_job() is not None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Attend la fin d'un job et retourne son état final"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.get_job(job_id)
+            if job is None or job['status'] != 'running':
+                return job
+            if deadline and time.monotonic() > deadline:
+                return job
+            time.sleep(0.5)
+
+    def _get_running_job(self) -> Optional[Dict[str, Any]]:
+        for job in self._jobs.values():
+            if job['status'] == 'running':
+                return job
+        return None
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _advance(self, job_id: str, processed: int, total: Optional[int]):
+        """Avancement à l'intérieur de l'étape en cours, d'après les éléments traités"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(processed=processed, total=total)
+            if total:
+                start = self.stages[job['stage']]
+                end = min((value for value in self.stages.values() if value > start), default=start)
+                job['progress'] = round(start + (end - start) * min(processed / total, 1.0), 3)
+
+    def _run_job(self, job_id: str):
+        """Surveille le processus d'un job jusqu'à sa fin ; le job finit toujours 'succeeded' ou 'failed'"""
+        started = time.monotonic()
+        deadline = started + self.timeout if self.timeout else None
+        status, result, error = 'failed', None, None
+        process, timed_out = None, False
+        try:
+            if self.in_process:
+                progress_queue = queue.Queue()
+                worker = threading.Thread(
+                    target=self.target,
+                    args=(progress_queue,),
+                    name=f"{self.name}-{job_id[:8]}",
+                    daemon=True
+                )
+            else:
+                progress_queue = self._context.Queue()
+                worker = self._context.Process(
+                    target=self.target,
+                    args=(progress_queue,),
+                    name=f"{self.name}-{job_id[:8]}",
+                    daemon=True
+                )
+            worker.start()
+            process = worker
+
+            while True:
+                if deadline and time.monotonic() > deadline:
+                    timed_out = True
+                    error = f"Délai dépassé ({self.timeout:.0f}s), processus {self.name} arrêté"
+                    break
+                try:
+                    kind, payload = progress_queue.get(timeout=1.0)
+                except queue.Empty:
+                    if not process.is_alive():
+                        error = f"Processus {self.name} terminé (code {getattr(process, 'exitcode', None)})"
+                        break
+                    self._update(job_id, duration_seconds=round(time.monotonic() - started, 3))
+                    continue
+
+                if kind == 'progress':
+                    self._update(job_id, stage=payload, progress=self.stages[payload],
+                                 duration_seconds=round(time.monotonic() - started, 3))
+                elif kind == 'items':
+                    self._advance(job_id, *payload)
+                elif kind == 'done':
+                    status, result = 'succeeded', payload
+                    break
+                else:
+                    error = payload
+                    break
+        except Exception as e:
+            # Lancement impossible (spawn) ou file de progression inutilisable
+            status, error = 'failed', f"Erreur du processus {self.name}: {e}"
+        finally:
+            if process is not None:
+                # Un job hors délai est arrêté sans attendre sa sortie
+                _stop_process(process, grace=0 if timed_out else 5.0)
+            duration = round(time.monotonic() - started, 3)
+            final = {
+                'status': status,
+                'finished_at': datetime.now().isoformat(),
+                'duration_seconds': duration,
+                'result': result,
+                'error': error
+            }
+            if status == 'succeeded':
+                final.update(stage='done', progress=self.stages['done'])
+            self._update(job_id, **final)
+
+        if status == 'succeeded':
+            logger.info(f"Job {self.name} {job_id} terminé en {duration:.1f}s: {result}")
+            if result.get('trained'):
+                self._notify(self.get_job(job_id))
+        else:
+            logger.error(f"Échec du job {self.name} {job_id}: {error}")
+
+    def _notify(self, job: Dict[str, Any]):
+        """Prévient les composants qu'un nouveau modèle est sur disque"""
+        for callback in self._listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du nouveau modèle: {e}")
+
+_job_manager = None
+_reclassification_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_reclassification_job_manager() -> TrainingJobManager:
+    """Retourne le gestionnaire de reclassification des tickets du processus"""
+    global _reclassification_manager
+    with _job_manager_lock:
+        if _reclassification_manager is None:
+            _reclassification_manager = TrainingJobManager(
+                target=_reclassification_worker,
+                stages=RECLASSIFICATION_STAGES,
+                name='reclassification'
+            )
+        return _reclassification_manager
+
+def get_training_job_manager() -> TrainingJobManager:
+    """Retourne le gestionnaire de réentraînement du processus"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = TrainingJobManager()
+            if Config.RECLASSIFY_AFTER_RETRAIN:
+                # Les tickets stockés gardent sinon les catégories de l'ancien modèle
+                _job_manager.add_listener(lambda job: get_reclassification_job_manager().submit())
+        return _job_manager
@@ -1,12 +1,13 @@
 import schedule
 import time
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 import threading
 
-from ticket_classifier import TicketClassifier
-from firebase_connector import FirebaseConnector
+from registry import get_firebase_connector
+from training_jobs import get_training_job_manager
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -14,8 +15,10 @@ logger = logging.getLogger(__name__)
 class TrainingScheduler:
     def __init__(self):
         """Initialise le planificateur d'entraînement"""
-        self.classifier = TicketClassifier()
-        self.firebase_connector = FirebaseConnector()
+        # L'entraînement a lieu dans un processus séparé, le planificateur ne charge pas de modèle
+        self.training_jobs = get_training_job_manager()
+        # Client de stockage partagé avec l'API quand les deux tournent dans le même processus
+        self.firebase_connector = get_firebase_connector()
         self.last_training_date = None
         self.new_tickets_count = 0
         self.is_training = False
@@ -40,39 +43,28 @@ class TrainingScheduler:
             with open('data/last_training.txt', 'w') as f:
                 f.write(datetime.now().isoformat())
             self.last_training_date = datetime.now()
+            self.new_tickets_count = 0
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde de la date: {e}")
     
     def check_new_tickets(self) -> int:
-        """Vérifie le nombre de nouveaux tickets depuis le dernier entraînement"""
-        try:
-            # Récupérer tous les tickets
-            tickets = self.firebase_connector.get_all_tickets()
-            
-            # Compter les nouveaux tickets
-            new_tickets = 0
-            for ticket in tickets:
-                if 'dateSoumission' in ticket:
-                    ticket_date = ticket['dateSoumission']
-                    if isinstance(ticket_date, str):
-                        ticket_date = datetime.fromisoformat(ticket_date.replace('Z', '+00:00'))
-                    elif hasattr(ticket_date, 'to_pydatetime'):
-                        ticket_date = ticket_date.to_pydatetime()
-                    
-                    if ticket_date > self.last_training_date:
-                        new_tickets += 1
-            
-            self.new_tickets_count = new_tickets
-            logger.info(f"Nouveaux tickets détectés: {new_tickets}")
-            return new_tickets
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification des nouveaux tickets: {e}")
-            return 0
+        """Compte les nouveaux tickets depuis le dernier entraînement (requête filtrée côté serveur)"""
+        # Date locale explicite : Firestore interprète les dates naïves comme UTC
+        since = self.last_training_date.astimezone()
+        new_tickets = self.firebase_connector.count_tickets_since(since)
+        
+        if new_tickets < 0:
+            logger.error("Impossible de compter les nouveaux tickets, dernier comptage conservé")
+            return self.new_tickets_count
+        
+        self.new_tickets_count = new_tickets
+        logger.info(f"Nouveaux tickets détectés: {new_tickets}")
+        return new_tickets
     
-    def should_retrain(self) -> bool:
-        """Détermine si le modèle doit être réentraîné"""
-        new_tickets = self.check_new_tickets()
+    def should_retrain(self, new_tickets: Optional[int] = None) -> bool:
+        """Détermine si le modèle doit être réentraîné (new_tickets=None : nouveau comptage)"""
+        if new_tickets is None:
+            new_tickets = self.check_new_tickets()
         
         # Conditions pour le réentraînement
         conditions = [
@@ -98,13 +90,27 @@ class TrainingScheduler:
         logger.info("Début du réentraînement automatique")
         
         try:
-            # Réentraîner le modèle
-            self.classifier.retrain_with_new_data()
+            try:
+                # Feedbacks en attente envoyés avant que le job ne lise le stockage
+                self.firebase_connector.flush_writes()
+            except Exception as e:
+                logger.warning(f"Écritures différées non envoyées avant le réentraînement: {e}")
+            
+            # Réentraîner le modèle dans un processus séparé et attendre la fin
+            job = self.training_jobs.submit()
+            # Le gestionnaire arrête le processus à TRAINING_JOB_TIMEOUT ; marge pour son arrêt
+            timeout = self.training_jobs.timeout + 60 if self.training_jobs.timeout else None
+            job = self.training_jobs.wait(job['job_id'], timeout=timeout)
+            
+            if job is None or job['status'] == 'running':
+                raise RuntimeError("Réentraînement toujours en cours après le délai d'attente")
+            if job['status'] != 'succeeded':
+                raise RuntimeError(job['error'])
             
             # Sauvegarder la date
             self.save_last_training_date()
             
-            logger.info("Réentraînement automatique terminé avec succès")
+            logger.info(f"Réentraînement automatique terminé avec succès en {job['duration_seconds']:.1f}s")
             
         except Exception as e:
             logger.error(f"Erreur lors du réentraînement automatique: {e}")
@@ -164,12 +170,11 @@ class TrainingScheduler:
             'last_training_date': self.last_training_date.isoformat() if self.last_training_date else None,
             'new_tickets_count': self.new_tickets_count,
             'next_scheduled_jobs': [str(job) for job in schedule.get_jobs()],
-            'should_retrain': self.should_retrain()
+            # Dernier comptage connu : le statut ne relance pas de requête
+            'should_retrain': self.should_retrain(self.new_tickets_count)
         }
 
 if __name__ == "__main__":
-    import os
-    
     # Configuration du logging
     logging.basicConfig(
         level=logging.INFO,
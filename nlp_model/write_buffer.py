@@ -0,0 +1,279 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from ticket_store import decode_ticket, encode_ticket
+
+logger = logging.getLogger(__name__)
+
+# Valeur remplacée par l'horodatage serveur au moment du commit : la date reflète
+# l'écriture effective dans Firestore, pas la mise en file d'attente
+SERVER_TIMESTAMP = '__server_timestamp__'
+
+# Limite d'écritures par commit imposée par Firestore
+FIRESTORE_BATCH_LIMIT = 500
+
+# Durée après laquelle un lot réservé par un processus arrêté en plein envoi
+# peut être repris par un autre
+CLAIM_LEASE_SECONDS = 300
+
+def _is_permanent_error(error: Exception) -> bool:
+    """Erreur qui se reproduira à chaque nouvel essai (document absent, données invalides...)"""
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (exceptions.NotFound, exceptions.InvalidArgument,
+                              exceptions.FailedPrecondition))
+
+class WriteBehindBuffer:
+    def __init__(self, db, path: str = Config.WRITE_BUFFER_PATH,
+                 max_batch_size: int = Config.WRITE_BUFFER_MAX_BATCH,
+                 flush_interval: float = Config.WRITE_BUFFER_FLUSH_INTERVAL):
+        """Écritures Firestore différées, regroupées en commits par lot.
+
+        Chaque écriture est d'abord enregistrée dans un fichier SQLite local puis
+        envoyée par un thread dédié, dès que max_batch_size écritures attendent ou
+        toutes les flush_interval secondes. Une écriture n'est retirée du fichier
+        qu'après le commit : rien n'est perdu à l'arrêt ni pendant une coupure de
+        Firestore, les écritures restantes partent au démarrage suivant.
+
+        Plusieurs processus (API, entraînement, reclassification) partagent le
+        même fichier : un lot est réservé dans une transaction avant l'envoi, et
+        un seul processus envoie à la fois, dans l'ordre de mise en file.
+        """
+        self.db = db
+        self.path = path
+        self.max_batch_size = min(max_batch_size, FIRESTORE_BATCH_LIMIT)
+        self.flush_interval = flush_interval
+        self.flushed = 0
+        self.dropped = 0
+        self.failed_commits = 0
+        self.last_flush_at = None
+        self.last_error = None
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        # Identifiant de réservation propre à ce tampon (un pid peut être réutilisé)
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._create_schema()
+        # Écritures en attente connues de ce processus : évite un COUNT(*) par mise en file
+        self._pending_lock = threading.Lock()
+        self._pending = self.pending_count()
+
+        self._thread = threading.Thread(target=self._flush_loop, name='write-buffer', daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+    def _create_schema(self):
+        with closing(self._connect()) as connection, connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS pending_writes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    operation TEXT NOT NULL,
+                    collection TEXT NOT NULL,
+                    document_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    claimed_by TEXT,
+                    claimed_at REAL
+                )
+            ''')
+            columns = {row[1] for row in connection.execute('PRAGMA table_info(pending_writes)')}
+            if 'claimed_by' not in columns:
+                # Fichier créé avant la réservation des lots
+                connection.execute('ALTER TABLE pending_writes ADD COLUMN claimed_by TEXT')
+                connection.execute('ALTER TABLE pending_writes ADD COLUMN claimed_at REAL')
+
+    def add(self, collection: str, data: Dict[str, Any]) -> str:
+        """Met en file la création d'un document ; retourne son identifiant"""
+        # Identifiant fixé dès la mise en file : rejouer l'écriture ne crée pas de doublon
+        document_id = uuid.uuid4().hex
+        self._enqueue('set', collection, document_id, data)
+        return document_id
+
+    def update(self, collection: str, document_id: str, data: Dict[str, Any]):
+        """Met en file la mise à jour de champs d'un document existant"""
+        self._enqueue('update', collection, document_id, data)
+
+    def _enqueue(self, operation: str, collection: str, document_id: str, data: Dict[str, Any]):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT INTO pending_writes (operation, collection, document_id, data, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (operation, collection, document_id, encode_ticket(data), datetime.now().isoformat())
+            )
+        with self._pending_lock:
+            self._pending += 1
+            full = self._pending >= self.max_batch_size
+        if full:
+            self._wakeup.set()
+
+    def pending_count(self) -> int:
+        """Nombre d'écritures en attente d'envoi"""
+        with closing(self._connect()) as connection:
+            return connection.execute('SELECT COUNT(*) FROM pending_writes').fetchone()[0]
+
+    def _claim_pending(self) -> Optional[List[Tuple[int, str, str, str, Dict[str, Any]]]]:
+        """Réserve les prochaines écritures pour ce processus et les retourne.
+
+        None si un autre processus a une réservation en cours : il envoie déjà
+        les écritures précédentes, les suivantes attendront pour garder l'ordre.
+        """
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.isolation_level = None
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                busy = connection.execute(
+                    'SELECT 1 FROM pending_writes WHERE claimed_by IS NOT NULL AND claimed_by != ? '
+                    'AND claimed_at >= ? LIMIT 1', (self._owner, now - CLAIM_LEASE_SECONDS)
+                ).fetchone()
+                if busy:
+                    connection.execute('COMMIT')
+                    return None
+                connection.execute(
+                    'UPDATE pending_writes SET claimed_by = ?, claimed_at = ? WHERE seq IN '
+                    '(SELECT seq FROM pending_writes ORDER BY seq LIMIT ?)',
+                    (self._owner, now, self.max_batch_size)
+                )
+                rows = connection.execute(
+                    'SELECT seq, operation, collection, document_id, data FROM pending_writes '
+                    'WHERE claimed_by = ? ORDER BY seq', (self._owner,)
+                ).fetchall()
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return [(seq, operation, collection, document_id, decode_ticket(data))
+                for seq, operation, collection, document_id, data in rows]
+
+    def _release(self):
+        """Rend les écritures réservées et non envoyées (nouvel essai, par ce processus ou un autre)"""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'UPDATE pending_writes SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?',
+                (self._owner,)
+            )
+
+    def _remove(self, seqs: List[int]):
+        with closing(self._connect()) as connection, connection:
+            connection.executemany('DELETE FROM pending_writes WHERE seq = ?', [(seq,) for seq in seqs])
+        with self._pending_lock:
+            self._pending = max(self._pending - len(seqs), 0)
+
+    def _apply(self, batch, operation: str, collection: str, document_id: str, data: Dict[str, Any]):
+        from firebase_admin import firestore
+
+        data = {
+            key: firestore.SERVER_TIMESTAMP if value == SERVER_TIMESTAMP else value
+            for key, value in data.items()
+        }
+        ref = self.db.collection(collection).document(document_id)
+        if operation == 'update':
+            batch.update(ref, data)
+        else:
+            batch.set(ref, data)
+
+    def _commit(self, writes) -> None:
+        batch = self.db.batch()
+        for _, operation, collection, document_id, data in writes:
+            self._apply(batch, operation, collection, document_id, data)
+        batch.commit()
+
+    def flush(self) -> int:
+        """Envoie les écritures en attente par lots ; retourne le nombre d'écritures envoyées"""
+        sent = 0
+        with self._flush_lock:
+            try:
+                while True:
+                    writes = self._claim_pending()
+                    if writes is None:
+                        # Envoi en cours dans un autre processus
+                        break
+                    if not writes:
+                        with self._pending_lock:
+                            self._pending = 0
+                        break
+
+                    try:
+                        self._commit(writes)
+                        self._remove([write[0] for write in writes])
+                        sent += len(writes)
+                    except Exception as e:
+                        self.failed_commits += 1
+                        self.last_error = str(e)
+                        if not _is_permanent_error(e):
+                            # Firestore injoignable : les écritures restent sur disque pour le prochain essai
+                            self._release()
+                            raise
+                        # Un commit par lot est atomique : isoler l'écriture fautive pour ne pas bloquer la file
+                        sent += self._flush_one_by_one(writes)
+            finally:
+                if sent:
+                    self.flushed += sent
+                    self.last_flush_at = datetime.now().isoformat()
+                    logger.info(f"{sent} écritures Firestore envoyées par lots")
+        return sent
+
+    def _flush_one_by_one(self, writes) -> int:
+        sent = 0
+        for write in writes:
+            try:
+                self._commit([write])
+                sent += 1
+            except Exception as e:
+                if not _is_permanent_error(e):
+                    self._release()
+                    raise
+                self.dropped += 1
+                logger.error(f"Écriture {write[1]} {write[2]}/{write[3]} abandonnée: {e}")
+            self._remove([write[0]])
+        return sent
+
+    def _flush_loop(self):
+        """Thread d'envoi : attend le seuil de taille ou l'intervalle, recule en cas d'échec"""
+        delay = self.flush_interval
+        while not self._stopping.is_set():
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                delay = self.flush_interval
+            except Exception as e:
+                delay = min(max(delay, 1.0) * 2, 60.0)
+                logger.warning(f"Envoi des écritures différé ({self.pending_count()} en attente, "
+                               f"nouvel essai dans {delay:.0f}s): {e}")
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Arrête le thread d'envoi après une dernière tentative ; le reste est conservé sur disque"""
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"{self.pending_count()} écritures conservées pour le prochain démarrage: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne l'état du tampon d'écriture"""
+        return {
+            'pending': self.pending_count(),
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'failed_commits': self.failed_commits,
+            'last_flush_at': self.last_flush_at,
+            'last_error': self.last_error
+        }